@@ -1 +1,32 @@
 from .configence import *
+from .cache import (
+    cast_cache_info,
+    clear_instance_cache,
+    disable_cast_cache,
+    enable_cast_cache,
+    instance_cache_info,
+)
+from .sources import (
+    ConfigDocument,
+    EnvFile,
+    Environ,
+    IniFile,
+    JsonFile,
+    MappingSource,
+    SourceStack,
+    TomlFile,
+    YamlFile,
+    set_default_sources,
+    use_sources,
+)
+from .prefork import prefork_warmup
+from .memory import trace_allocations
+from .metrics import (
+    disable_metrics,
+    enable_metrics,
+    export_metrics,
+    get_metrics,
+    render_prometheus,
+)
+from .validate import validate_many
+from .snapshot import SnapshotIntegrityError
@@ -0,0 +1,56 @@
+"""configence command line tools:
+
+    python -m configence validate mypkg.settings:MyModel envs/*.env
+    python -m configence compile mypkg.settings:MyModel -o settings_compiled.py
+"""
+
+from typing import List, Optional
+
+import typer
+
+from .compiler import compile_model
+from .validate import import_model, to_json_line, validate_many
+
+app = typer.Typer(help="configence command line tools.")
+
+
+@app.callback()
+def main():
+    """configence command line tools."""
+
+
+@app.command()
+def validate(
+    model: str = typer.Argument(..., help="The Configence class, as 'package.module:ClassName'."),
+    env_files: List[str] = typer.Argument(..., help="The environment files (.env / .ini / .toml / .json / .yaml)."),
+    prefix: Optional[str] = typer.Option(None, help="The prefix to load the model with."),
+    processes: Optional[int] = typer.Option(None, help="Worker processes (defaults to the number of CPUs)."),
+):
+    """Validate a model against each environment file in isolation,
+    printing a JSON line per environment (exits with 1 if any is
+    invalid)."""
+    all_valid = True
+    for result in validate_many(model, env_files, prefix=prefix, processes=processes):
+        all_valid = all_valid and result["valid"]
+        typer.echo(to_json_line(result))
+    if not all_valid:
+        raise typer.Exit(code=1)
+
+
+@app.command(name="compile")
+def compile_command(
+    model: str = typer.Argument(..., help="The Configence class, as 'package.module:ClassName'."),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="The module to write (defaults to stdout)."),
+):
+    """Generate a module with a compiled (__slots__, straight-line loading)
+    version of a model."""
+    source = compile_model(import_model(model), reference=model)
+    if output is None:
+        typer.echo(source, nl=False)
+    else:
+        with open(output, "w") as f:
+            f.write(source)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,111 @@
+"""Async cast functions (see Configence.async_value and Configence.acreate).
+
+Entries with coroutine casts (e.g. resolving a secret reference or a
+hostname) are read like any other entry, and then resolved concurrently -
+after all the entries are read, and before delayed values are evaluated (so
+delays see the resolved values). Each cast has an optional timeout, and at
+most Configence.ASYNC_CONCURRENCY of them run at once.
+
+`await MyModel.acreate()` loads the instance in a worker thread, running the
+coroutines on the caller's event loop. Loading synchronously (`MyModel()`)
+runs them in a new event loop - which isn't possible inside a running one.
+"""
+
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, List, NamedTuple, Optional, Tuple
+
+from decouple import undefined
+
+
+class AsyncCast:
+    """A coroutine cast function, with a timeout (in seconds, None waits
+    forever)."""
+
+    def __init__(self, func: Callable[[Any], Awaitable], timeout: Optional[float] = None) -> None:
+        self.func = func
+        self.timeout = timeout
+
+    def needs_cast(self, value, value_type) -> bool:
+        """Raw strings are cast - as are values which aren't of the entry's
+        type yet (missing values and None defaults are not)."""
+        if value is None or value is undefined:
+            return False
+        if isinstance(value, str):
+            return True
+        return isinstance(value_type, type) and not isinstance(value, value_type)
+
+    def __repr__(self) -> str:
+        return f"AsyncCast({getattr(self.func, '__name__', self.func)!r}, timeout={self.timeout})"
+
+
+class AsyncLoad(NamedTuple):
+    """The event loop of acreate() (and its concurrency)."""
+
+    loop: asyncio.AbstractEventLoop
+    concurrency: Optional[int]
+
+
+_async_load: ContextVar[Optional[AsyncLoad]] = ContextVar("configence_async_load", default=None)
+
+# (key, cast, raw value)
+CastTask = Tuple[str, AsyncCast, Any]
+
+
+async def _await_cast(key: str, cast: AsyncCast, value):
+    try:
+        return await asyncio.wait_for(cast.func(value), cast.timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"casting {key} timed out after {cast.timeout}s") from None
+
+
+async def _cast_one(key: str, cast: AsyncCast, value, semaphore: Optional[asyncio.Semaphore]):
+    if semaphore is None:
+        return await _await_cast(key, cast, value)
+    async with semaphore:
+        return await _await_cast(key, cast, value)
+
+
+async def cast_concurrently(tasks: List[CastTask], concurrency: Optional[int] = None) -> list:
+    """Await the casts of tasks concurrently (at most concurrency at once),
+    returning their results in order. All the casts are awaited before the
+    first failure (by order) is raised."""
+    semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+    results = await asyncio.gather(
+        *(_cast_one(key, cast, value, semaphore) for key, cast, value in tasks),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+def run_casts(tasks: List[CastTask], concurrency: Optional[int] = None) -> list:
+    """Run the casts of tasks from synchronous code - on acreate()'s event
+    loop, or in a new one."""
+    load = _async_load.get()
+    if load is not None:
+        if load.concurrency is not None:
+            concurrency = load.concurrency
+        future = asyncio.run_coroutine_threadsafe(cast_concurrently(tasks, concurrency), load.loop)
+        return future.result()
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(cast_concurrently(tasks, concurrency))
+    raise RuntimeError(
+        "config entries with async casts can't be loaded synchronously inside a running "
+        "event loop - use `await ConfigClass.acreate()`"
+    )
+
+
+async def create_async(factory: Callable, concurrency: Optional[int] = None):
+    """Call factory (loading an instance) in a worker thread, with its async
+    casts run on the current event loop."""
+    token = _async_load.set(AsyncLoad(asyncio.get_running_loop(), concurrency))
+    try:
+        # the worker thread runs in a copy of the current context
+        return await asyncio.to_thread(factory)
+    finally:
+        _async_load.reset(token)
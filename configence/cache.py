@@ -0,0 +1,232 @@
+"""Process-wide caches shared by all Configence instances.
+
+The instance cache holds shared instances (see Configence.cached), keyed by
+(class, prefix, fingerprint of the inputs the instance was loaded from).
+
+The cast cache memoizes the result of casting a raw (string) value, keyed by
+(cast function, raw string), so many instances reading identical values
+(e.g. per-tenant / per-worker configs) parse each value only once.
+
+Only results which can safely be shared are cached:
+- hashable results (ints, floats, bools, enums, strings, frozen models, ...)
+  are shared as is (strings are interned)
+- lists of hashable items (e.g. from Csv) are stored as tuples, and a fresh
+  list is returned on each hit
+"""
+
+import hashlib
+import sys
+import threading
+from collections import Counter, OrderedDict, namedtuple
+from typing import Callable, Optional
+
+from .types import no_cast
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+CastCacheInfo = CacheInfo
+
+
+def _is_hashable(value) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class CastCache:
+    """Bounded LRU cache of cast results."""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cast(self, cast_func: Callable, value):
+        key = (cast_func, value)
+        with self._lock:
+            try:
+                shared, as_list = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return list(shared) if as_list else shared
+        # cast outside of the lock (casts can be slow); failures are not cached
+        result = cast_func(value)
+        self._store(key, result)
+        return result
+
+    def _store(self, key, result):
+        if isinstance(result, str):
+            shared, as_list = sys.intern(result), False
+        elif isinstance(result, list) and all(_is_hashable(item) for item in result):
+            shared, as_list = tuple(result), True
+        elif not isinstance(result, list) and _is_hashable(result):
+            shared, as_list = result, False
+        else:
+            return
+        with self._lock:
+            self._data[key] = (shared, as_list)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def info(self) -> CastCacheInfo:
+        return CastCacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_cast_cache: Optional[CastCache] = None
+
+
+def enable_cast_cache(maxsize: int = 1024) -> CastCache:
+    """Enable (or resize) the process-wide cast cache."""
+    global _cast_cache
+    if _cast_cache is None:
+        _cast_cache = CastCache(maxsize)
+    else:
+        _cast_cache.maxsize = maxsize
+    return _cast_cache
+
+
+def disable_cast_cache():
+    global _cast_cache
+    _cast_cache = None
+
+
+def get_cast_cache() -> Optional[CastCache]:
+    return _cast_cache
+
+
+def cast_cache_info() -> Optional[CastCacheInfo]:
+    """Hit / miss counters of the cast cache (None if the cache is
+    disabled)."""
+    return _cast_cache.info() if _cast_cache is not None else None
+
+
+def cached_cast(cast_func: Callable) -> Callable:
+    """Wrap cast_func to go through the cast cache (if enabled).
+
+    Only raw string values are looked up in the cache; anything else
+    (defaults, already cast values) is cast directly.
+    """
+    cache = _cast_cache
+    if cache is None or cast_func is no_cast or not _is_hashable(cast_func):
+        return cast_func
+
+    def wrapped_cast(value, *args, **kwargs):
+        if isinstance(value, str) and not args and not kwargs:
+            return cache.cast(cast_func, value)
+        return cast_func(value, *args, **kwargs)
+
+    return wrapped_cast
+
+
+class InstanceCache:
+    """Bounded LRU cache of config instances.
+
+    The fingerprint of an instance covers the raw values (or absence) of
+    all the keys read while loading it, and the inputs of the documents
+    its entries use. On lookup, the keys recorded for (class, prefix) are
+    read again from the current sources - so any change of those inputs
+    results in a new fingerprint (i.e. a miss, and a fresh instance).
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        # (class, prefix) -> the keys and documents read by the last load
+        self._inputs = {}
+        # class name -> loads of instances whose inputs changed since they were cached
+        self.reloads = Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(reads: dict, documents) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(sorted(reads.items(), key=lambda item: item[0])).encode())
+        for document in documents:
+            digest.update(repr((id(document), document.fingerprint())).encode())
+        return digest.hexdigest()
+
+    def get(self, cls, prefix, read_current: Callable, load: Callable):
+        """Get the cached instance of (cls, prefix), or load it.
+
+        Args:
+            read_current (Callable): (sources, keys) -> the current raw values of keys in sources
+            load (Callable): () -> (instance, (sources, raw values read while loading), documents used)
+        """
+        inputs = self._inputs.get((cls, prefix))
+        if inputs is not None:
+            sources, keys, documents = inputs
+            reads = read_current((sources, keys))
+            key = (cls, prefix, self.fingerprint(reads, documents))
+            with self._lock:
+                instance = self._data.get(key)
+                if instance is not None:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return instance
+        instance, (sources, reads), documents = load()
+        key = (cls, prefix, self.fingerprint(reads, documents))
+        with self._lock:
+            self.misses += 1
+            if inputs is not None:
+                self.reloads[cls.__qualname__] += 1
+            self._inputs[(cls, prefix)] = (sources, tuple(reads), tuple(documents))
+            self._data[key] = instance
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return instance
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._inputs.clear()
+            self.reloads.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_instance_cache = InstanceCache()
+
+
+def get_instance_cache() -> InstanceCache:
+    return _instance_cache
+
+
+def instance_cache_info() -> CacheInfo:
+    """Hit / miss counters of the instance cache (see Configence.cached)."""
+    return _instance_cache.info()
+
+
+def clear_instance_cache(maxsize: Optional[int] = None):
+    """Drop all cached instances (and optionally resize the cache)."""
+    _instance_cache.clear()
+    if maxsize is not None:
+        _instance_cache.maxsize = maxsize
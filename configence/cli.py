@@ -1,18 +1,32 @@
-from typing import Callable, Dict, List
+from contextlib import ExitStack
+from typing import Callable, Dict, Iterator, List, Tuple
 
 import click
 import typer
+from click.core import ParameterSource
+from .metrics import get_metrics
 from .types import ConfigenceEntry
 from typer.main import Typer
 
+# parameter sources in which the user explicitly set a value (and not just
+# got the default - which is the value already loaded into the config object)
+EXPLICIT_PARAMETER_SOURCES = {
+    ParameterSource.COMMANDLINE,
+    ParameterSource.ENVIRONMENT,
+    ParameterSource.PROMPT,
+}
+
+CLI_OVERRIDES_META_KEY = "configence.cli_overrides"
+
 
 def create_click_cli(configence_entries: Dict[str, ConfigenceEntry], callback: Callable):
+    """Options of the entries, by their CLI key."""
     cli = callback
     for key, entry in configence_entries.items():
         option_kwargs = entry.get_cli_option_kwargs()
         # make the key fit cmd-style (i.e. kebab-case)
-        adjusted_key = entry.key.lower().replace("_", "-")
-        keys = [f"--{adjusted_key}", entry.key]
+        adjusted_key = key.lower().replace("_", "-")
+        keys = [f"--{adjusted_key}", key]
         # add flag if given (i.e '-t' option)
         if entry.flags is not None:
             keys.extend(entry.flags)
@@ -26,31 +40,59 @@ def create_click_cli(configence_entries: Dict[str, ConfigenceEntry], callback: C
     return cli
 
 
+def iter_cli_entries(config_obj, cli_prefix: str = "") -> Iterator[Tuple[str, object, str, ConfigenceEntry]]:
+    """(CLI key, config object, entry name, entry) of the entries of a
+    config object - and of its groups (loading them), whose keys start with
+    the groups' prefixes."""
+    for name, entry in config_obj._entries.items():
+        yield f"{cli_prefix}{entry.key}", config_obj, name, entry
+    for name, group in config_obj._groups():
+        yield from iter_cli_entries(getattr(config_obj, name), f"{cli_prefix}{group.prefix or ''}")
+
+
 def get_cli_object_for_config_objects(
     config_objects: list,
     typer_app: Typer = None,
     help: str = None,
     on_start: Callable = None,
 ):
+    # Create a merged config-entires map (and the objects each CLI key sets)
+    entries = {}
+    targets: Dict[str, List[Tuple[object, str]]] = {}
+    for config_obj in config_objects:
+        for cli_key, target_obj, name, entry in iter_cli_entries(config_obj):
+            entries[cli_key] = entry
+            targets.setdefault(cli_key, []).append((target_obj, name))
+    target_objects = list({id(obj): obj for pairs in targets.values() for obj, _ in pairs}.values())
+
     # callback to save CLI results back to objects
     def callback(ctx, **kwargs):
         if callable(on_start):
             on_start(ctx, **kwargs)
 
-        for key, value in kwargs.items():
-            # find the confi-object which the key belongs to and ...
-            for config_obj in config_objects:
-                if key in config_obj.entries:
-                    # ... update that object with the new value
-                    setattr(config_obj, key, value)
-                    config_obj._entries[key].value = value
+        overrides = {}
+        metrics = get_metrics()
+        # all the overrides of an object are recorded as one generation of its history
+        with ExitStack() as stack:
+            for config_obj in target_objects:
+                stack.enter_context(config_obj._record_changes("cli"))
+            for key, value in kwargs.items():
+                # skip options the user didn't pass (their default is the value already loaded)
+                if ctx.get_parameter_source(key) not in EXPLICIT_PARAMETER_SOURCES:
+                    continue
+                # update the confi-objects which the key belongs to with the new value
+                for config_obj, name in targets.get(key, ()):
+                    setattr(config_obj, name, value)
+                    config_obj._entries[name].value = value
+                    config_obj._cli_overrides[name] = value
+                    overrides[key] = value
+                    if metrics is not None:
+                        metrics.cli_overrides.inc(**{"class": config_obj.__class__.__qualname__})
+        # report which keys were set by the CLI
+        ctx.meta[CLI_OVERRIDES_META_KEY] = overrides
 
     if help is not None:
         callback.__doc__ = help
-    # Create a merged config-entires map
-    entries = {}
-    for config_obj in config_objects:
-        entries.update(config_obj.entries)
     # convert to a click-cli group
     click_group = create_click_cli(entries, callback)
     # add the typer app into our click group
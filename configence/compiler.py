@@ -0,0 +1,232 @@
+"""Ahead-of-time compilation of Configence classes (see `python -m
+configence compile`).
+
+compile_model() generates the source of a plain module with a __slots__
+class loading the same values as the Configence class it was compiled from:
+every entry is read and cast by straight-line code (built-in casts inlined,
+other casts taken from the source class's entries), delayed values are
+evaluated in their resolved order, and there is no schema walking, entry
+copying or custom __setattr__ at construction time.
+
+The compiled class reads the same sources (the `sources` argument, the
+sources in context, the default sources or decouple's config). Classes using
+interpolation, or entries passing extra arguments to decouple, can't be
+compiled.
+"""
+
+import inspect
+import keyword
+import re
+from typing import List, Optional
+
+from decouple import undefined
+
+from .types import ConfigenceDelay, ConfigenceEntry, no_cast
+
+
+def format_delay(template: str, values: dict) -> str:
+    """ConfigenceDelay's str.format semantics - missing values leave the
+    template as is."""
+    try:
+        return template.format(**values)
+    except KeyError:
+        return template
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.constants: List[str] = []
+
+    def line(self, indent: int, text: str = ""):
+        self.lines.append(("    " * indent + text) if text else "")
+
+
+def _inline_casts() -> dict:
+    """Casts called directly by name in compiled modules."""
+    from .configence import cast_boolean
+
+    return {int: "int", float: "float", cast_boolean: "cast_boolean"}
+
+
+def _cast_expression(entry: ConfigenceEntry, name: str, value: str, cast_name: str) -> str:
+    """The expression casting value - mirroring Configence._safe_cast."""
+    cast = entry.cast
+    if cast is no_cast:
+        return value
+    cast_code = _inline_casts().get(cast, cast_name)
+    value_type = entry.type
+    if not inspect.isclass(value_type) or value_type is str:
+        return f"{cast_code}({value})"
+    # already typed (non str) values are passed through
+    return (
+        f"{cast_code}({value}) if isinstance({value}, str) or not isinstance({value}, _T_{name}) "
+        f"else {value}"
+    )
+
+
+def _delay_expression(
+    delay: ConfigenceDelay, name: str, delay_source: str, defined: List[str], writer: _Writer
+) -> str:
+    """The expression evaluating a delay from the values defined so far."""
+    value = delay.value
+    if isinstance(value, str):
+        writer.constants.append(f"_TEMPLATE_{name} = {value!r}")
+        known = [dependency for dependency in sorted(delay.dependencies) if dependency in defined]
+        values = ", ".join(f"{dependency!r}: self.{dependency}" for dependency in known)
+        return f"format_delay(_TEMPLATE_{name}, {{{values}}})"
+    if callable(value):
+        writer.constants.append(f"_DELAY_{name} = {delay_source}.value")
+        arguments = ", ".join(
+            f"{parameter}=self.{parameter}" if parameter in defined else f"{parameter}=undefined"
+            for parameter in inspect.getcallargs(value)
+        )
+        return f"_DELAY_{name}({arguments})"
+    return "None"
+
+
+def _used_constants(writer: _Writer) -> List[str]:
+    """The constants referenced by the code (or by other constants)."""
+    body = "\n".join(writer.lines + writer.constants)
+    return [
+        constant
+        for constant in writer.constants
+        if len(re.findall(r"\b{}\b".format(constant.split(" = ", 1)[0]), body)) > 1
+    ]
+
+
+def _check_compilable(model_cls, schema):
+    if model_cls.INTERPOLATE:
+        raise ValueError(f"{model_cls.__name__} uses interpolation - it can't be compiled")
+    if model_cls._groups():
+        raise ValueError(f"{model_cls.__name__} has groups - it can't be compiled")
+    for name, entry in schema:
+        if not name.isidentifier() or keyword.iskeyword(name):
+            raise ValueError(f"entry name {name!r} isn't a valid identifier")
+        if isinstance(entry, ConfigenceEntry) and entry.async_cast is not None:
+            raise ValueError(f"entry {name} has an async cast - it can't be compiled")
+        if isinstance(entry, ConfigenceEntry) and entry.expiry is not None:
+            raise ValueError(f"entry {name} is expiring - it can't be compiled")
+        if isinstance(entry, ConfigenceEntry) and entry.nested_delimiter is not None:
+            raise ValueError(f"entry {name} has nested fields - it can't be compiled")
+        if isinstance(entry, ConfigenceEntry) and entry.kwargs:
+            raise ValueError(
+                f"entry {name} passes extra arguments to decouple ({', '.join(entry.kwargs)}) - it can't be compiled"
+            )
+
+
+def compile_model(model_cls, reference: Optional[str] = None) -> str:
+    """Generate the source of a module with a compiled version of
+    model_cls.
+
+    Args:
+        model_cls (Type[Configence]): the class to compile (importable by the generated module).
+        reference (str, optional): "package.module:ClassName" of the class. Defaults to its module and qualified name.
+    """
+    from .configence import Configence
+
+    if reference is None:
+        reference = f"{model_cls.__module__}:{model_cls.__qualname__}"
+    module_name, _, qualname = reference.partition(":")
+    if "<locals>" in qualname or module_name == "__main__":
+        raise ValueError(f"{reference} can't be imported by the compiled module")
+    schema = model_cls._schema()
+    _check_compilable(model_cls, schema)
+
+    writer = _Writer()
+    names = [name for name, _ in schema]
+    # entries whose default is a delay - evaluated once all the entries are loaded
+    delayed_defaults = []
+    defined: List[str] = []
+
+    writer.line(2, "source = resolve_config(sources)")
+    writer.line(2, "get = raw_getter(source)")
+    writer.line(2, 'p = "" if prefix is None else prefix')
+    for name, entry in schema:
+        if isinstance(entry, ConfigenceDelay):
+            # the delay's value - unless the key is set in the sources (as is)
+            expression = _delay_expression(entry, name, f"_ENTRIES[{name!r}]", defined, writer)
+            writer.line(2, "try:")
+            writer.line(3, f"self.{name} = get(p + {name!r})")
+            writer.line(2, "except KeyError:")
+            writer.line(3, f"self.{name} = {expression}")
+            defined.append(name)
+            continue
+
+        cast_name = f"_CAST_{name}"
+        writer.constants.append(f"{cast_name} = _ENTRIES[{name!r}].cast")
+        writer.constants.append(f"_T_{name} = _ENTRIES[{name!r}].type")
+        writer.line(2, "try:")
+        writer.line(3, f"raw = get(p + {entry.key!r})")
+        writer.line(2, "except KeyError:")
+        default = entry.default
+        casts_dicts = getattr(entry.cast, "__name__", None) == "cast_pydantic_by_model"
+        if entry.document is not None:
+            writer.constants.append(f"_ENTRY_{name} = _ENTRIES[{name!r}]")
+            writer.line(3, f"default = _ENTRY_{name}.get_default(source)")
+            writer.line(3, "if default is undefined:")
+            writer.line(4, f"raise UndefinedValueError(p + {entry.key!r} + NOT_FOUND)")
+            condition = "isinstance(default, (str, dict))" if casts_dicts else "isinstance(default, str)"
+            cast_default = _cast_expression(entry, name, "default", cast_name)
+            writer.line(3, f"self.{name} = ({cast_default}) if {condition} else default")
+        elif default is undefined:
+            writer.line(3, f"raise UndefinedValueError(p + {entry.key!r} + NOT_FOUND)")
+        elif isinstance(default, ConfigenceDelay):
+            writer.constants.append(f"_DEFAULT_{name} = _ENTRIES[{name!r}].default")
+            writer.line(3, f"self.{name} = _DEFAULT_{name}")
+            delayed_defaults.append((name, default))
+        elif isinstance(default, str) or (casts_dicts and isinstance(default, dict)):
+            writer.constants.append(f"_DEFAULT_{name} = _ENTRIES[{name!r}].default")
+            writer.line(3, f"self.{name} = {_cast_expression(entry, name, f'_DEFAULT_{name}', cast_name)}")
+        else:
+            # used as is (shared, like in the dynamic path)
+            writer.constants.append(f"_DEFAULT_{name} = _ENTRIES[{name!r}].default")
+            writer.line(3, f"self.{name} = _DEFAULT_{name}")
+        writer.line(2, "else:")
+        writer.line(3, f"self.{name} = {_cast_expression(entry, name, 'raw', cast_name)}")
+        defined.append(name)
+
+    for name, delay in delayed_defaults:
+        expression = _delay_expression(
+            delay, f"{name}_DEFAULT", f"_ENTRIES[{name!r}].default", names, writer
+        )
+        writer.line(2, f"if self.{name} is _DEFAULT_{name}:")
+        writer.line(3, f"self.{name} = {expression}")
+    if model_cls.on_load is not Configence.on_load:
+        writer.line(2, "_Source.on_load(self)")
+
+    class_name = qualname.rsplit(".", 1)[-1]
+    source = [
+        f'"""Compiled from {reference} (by `python -m configence compile`) - do',
+        'not edit."""',
+        "",
+        "from decouple import UndefinedValueError, undefined",
+        "",
+        "from configence.compiler import format_delay",
+        "from configence.sources import raw_getter, resolve_config",
+        "from configence.configence import cast_boolean",
+        f"from {module_name} import {qualname.split('.')[0]} as _Source",
+        "",
+    ]
+    if "." in qualname:
+        source.append(f"_Source = _Source.{qualname.split('.', 1)[1]}")
+    source.extend([
+        "_ENTRIES = dict(_Source._schema())",
+        'NOT_FOUND = " not found. Declare it as envvar or define a default value."',
+        *_used_constants(writer),
+        "",
+        "",
+        f"class {class_name}:",
+        f'    """{model_cls.__name__}, compiled."""',
+        "",
+        f"    __slots__ = {tuple(names)!r}",
+        "",
+        "    def __init__(self, prefix=None, sources=None):",
+        *writer.lines,
+        "",
+        "    def __repr__(self):",
+        "        values = \", \".join(f\"{name}={getattr(self, name)!r}\" for name in self.__slots__)",
+        f'        return f"{class_name}({{values}})"',
+        "",
+    ])
+    return "\n".join(source)
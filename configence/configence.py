@@ -9,12 +9,47 @@ import json
 import logging
 import string
 from collections import OrderedDict
-from functools import partial, wraps
-from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+from enum import Enum
+from contextlib import nullcontext
+from functools import lru_cache, partial, wraps
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Type, TypeVar, Union
 
 from decouple import Csv, UndefinedValueError, config, text_type, undefined
-from .types import ConfigenceDelay, ConfigenceEntry, no_cast
+from .types import ConfigenceDelay, ConfigenceEntry, ConfigenceGroup, no_cast
+from .aio import AsyncCast, create_async, run_casts
+from .cache import cached_cast, get_instance_cache
+from .sources import (
+    ConfigDocument,
+    MappingSource,
+    RecordingSource,
+    raw_getter,
+    read_raw_values,
+    record_reads,
+    resolve_config,
+    source_keys,
+    use_sources,
+)
+from .interpolation import Interpolator
+from .expiring import Expiry, Refresher, get_refresh_scheduler
+from .environ import format_env_file, serialize_csv, serialize_patterns, serialize_value
+from .fingerprint import combine, entry_digest, format_digest, replace_digest
+from .history import History, PersistentMap
+from .memory import MemoryReport, get_allocation_trace, memory_report
+from .metrics import get_metrics
+from .nested import assemble, scan_prefixes
+from .tracking import track_access
+from .snapshot import SnapshotSource, read_snapshot, snapshot_mapping, write_snapshot
 from .cli import get_cli_object_for_config_objects
+from .matchers import (
+    CidrMatcher,
+    GlobMatcher,
+    RegexMatcher,
+    cast_cidrs,
+    cast_globs,
+    cast_regex,
+)
+from .flags import FeatureFlag, cast_flag
 from pydantic import BaseModel, ValidationError
 from typer import Typer
 
@@ -45,6 +80,59 @@ def cast_boolean(value):
         raise UndefinedValueError(f"{value} - is not a valid boolean")
 
 
+@lru_cache(maxsize=None)
+def cast_enum(enum_type: Type[Enum], case_sensitive: bool = True):
+    """Parse an entry as a member of enum_type, by value or by name.
+
+    The lookup table is built once per enum (and case sensitivity), so
+    each parse is a single dict lookup. Values take precedence over names.
+    """
+    table = {}
+    for name, member in enum_type.__members__.items():
+        table[name] = member
+    for member in enum_type:
+        table[str(member.value)] = member
+        table[member] = member
+        try:
+            table[member.value] = member
+        except TypeError:
+            # unhashable values can still be matched by their str()
+            pass
+    folded = {
+        key.lower(): member
+        for key, member in table.items()
+        if isinstance(key, str)
+    }
+    choices = ", ".join(
+        f"{member.value!r} ({name})" for name, member in enum_type.__members__.items()
+    )
+
+    def cast_enum_by_table(value):
+        try:
+            return table[value]
+        except (KeyError, TypeError):
+            pass
+        if not case_sensitive and isinstance(value, str):
+            member = folded.get(value.lower())
+            if member is not None:
+                return member
+        raise ValueError(
+            f"{value!r} is not a valid {enum_type.__name__}, valid choices are: {choices}"
+        )
+
+    return cast_enum_by_table
+
+
+class CsvList(Csv):
+    """decouple's Csv, which also accepts already split values (e.g. lists
+    from structured config files)."""
+
+    def __call__(self, value):
+        if isinstance(value, (list, tuple)):
+            return self.post_process(self.cast(item) for item in value)
+        return super().__call__(value)
+
+
 def cast_pydantic(model: BaseModel):
     def cast_pydantic_by_model(value):
         if isinstance(value, str):
@@ -80,6 +168,14 @@ def ignore_confi_delay_cast(cast_func):
     return wrapped_cast
 
 
+def compile_default(default, cast_func):
+    """Cast a (non delayed) default value once - when the entry is declared,
+    instead of on every load."""
+    if default is undefined or default is None or isinstance(default, ConfigenceDelay):
+        return default
+    return cast_func(default)
+
+
 def load_conf_if_none(variable, conf):
     if variable is None:
         return conf
@@ -95,15 +191,37 @@ ValueT = TypeVar("ValueT")
 class Configence:
     """Interface to create typed configuration entries."""
 
-    def __init__(self, prefix=None, is_model=True) -> None:
+    # opt-in ${KEY} interpolation of raw values (can also be set per instance)
+    INTERPOLATE = False
+    # number of value generations kept for rollback() (0 disables the history)
+    HISTORY_SIZE = 0
+    # count reads of values (see access_counts, unused_entries, unknown_keys, hot_keys)
+    TRACK_ACCESS = False
+    # number of async casts awaited at once (see async_value)
+    ASYNC_CONCURRENCY = 10
+
+    def __init__(self, prefix=None, is_model=True, sources=None, interpolate=None) -> None:
         """
 
         Args:
             prefix (str, optional): Prefix to add to all env-var keys. Defaults to self.ENV_PREFIX (which defaults to "").
             is_model (bool, optional): Should Configence.<type> return a ConfigenceEntry (the default, True) or should it evaluate env settings immediately and return a value (False)
+            sources (SourceStack, optional): Where to read values from (a SourceStack, or any decouple `config` compatible callable). Defaults to the default sources (see set_default_sources), or decouple's `config`.
+            interpolate (bool, optional): Replace ${KEY} references in raw values with the values of other keys. Defaults to self.INTERPOLATE (which defaults to False).
         """
+        metrics = get_metrics()
+        started = perf_counter() if metrics is not None else 0.0
+        trace = get_allocation_trace()
+        # the allocations of the instance loading this one (see trace_allocations)
+        outer_allocations = trace.begin() if trace is not None else None
         self._is_model = is_model
         self._prefix = prefix
+        self._sources = sources
+        # the decouple `config` compatible callable to read values from
+        self._config = resolve_config(sources)
+        self._interpolate = self.INTERPOLATE if interpolate is None else interpolate
+        # resolves ${KEY} references (memoized for the duration of the load)
+        self._interpolator: Optional[Interpolator] = None
         # counter of created entries (to track order)
         self._counter = 0
         # entries to be evaluated
@@ -112,32 +230,59 @@ class Configence:
         self._delayed_entries: Dict[str, ConfigenceDelay] = OrderedDict()
         # entries with delayed defaults (in addition to being referenced by self._entries)
         self._delayed_defaults: Dict[str, ConfigenceEntry] = OrderedDict()
+        # values explicitly set from the command line
+        self._cli_overrides: Dict[str, Any] = {}
+        # names of entries whose current value was evaluated from a ConfigenceDelay
+        self._delayed_values: Set[str] = set()
+        # names of entries shared with other instances (see replace), copied on write
+        self._shared_entries: Optional[Set[str]] = None
+        # per-entry digests and their combination (see fingerprint) - computed on first use
+        self._entry_digests: Optional[Dict[str, int]] = None
+        self._fingerprint: int = 0
+        # serialized values (see to_environ) - by entry name, and assembled by prefix
+        self._environ_values: Dict[str, Optional[str]] = {}
+        self._environ_by_prefix: Dict[str, Dict[str, str]] = {}
+        # generations of values (see rollback) - started once loaded
+        self._history: Optional[History] = None
+        # the raw values async entries were resolved from, and their results (see async_value)
+        self._async_raw: Dict[str, Tuple[Any, Any]] = {}
+        # the shared values of expiring entries (see expiring)
+        self._refreshers: Dict[str, Refresher] = {}
+        # allocations while loading each entry - if loaded inside trace_allocations()
+        self._allocations: Optional[Dict[str, Tuple[int, int]]] = None
+        # reads of each value (see TRACK_ACCESS) - counted once loaded
+        self._access_counts: Optional[Dict[str, int]] = None
+        # keys of nested fields by their entry's whole key + delimiter (see _nested_fields) - scanned on first use
+        self._nested_keys: Optional[Dict[str, List[str]]] = None
 
         # get members by creation order
-        members = sorted(
-            inspect.getmembers(self, self._is_entry), key=self._get_entry_index
-        )
+        members = self._schema()
+        if self._interpolate:
+            self._interpolator = self._create_interpolator(members)
+        # delayed entries depending on async / expiring entries - evaluated once those are resolved
+        deferred = self._deferred_delays()
         # eval class entries into values (by order of definition - same order as in the config class lines)
         for name, entry in members:
-            # unwrap delayed entries
-            if isinstance(entry, ConfigenceDelay):
-                # For delayed entries, create a ConfigenceEntry with the evaluated value
-                evaluated_value = entry.eval(self)
-                entry = ConfigenceEntry(
-                    name,  # Use name as key for delayed entries
-                    default=evaluated_value,
-                    index=entry.index
-                )
+            if name not in deferred:
+                self._load_member(name, entry, trace)
 
-            if isinstance(entry, ConfigenceEntry):
-                self._entries[name] = entry
-                # save delayed
-                if isinstance(entry.default, ConfigenceDelay):
-                    self._delayed_defaults[name] = entry
-                # eval, and save the value into the class instance
-                value = self._eval_and_save_entry(name, entry)
-                # save the value into the entry to be used as default for CLI
-                entry.value = value
+        # await async casts (concurrently) and fetch expiring values - before delayed values are evaluated
+        async_names = self._async_entries()
+        if async_names:
+            self._resolve_async({name: self._entries[name].value for name in async_names})
+        expiring_names = self._expiring_entries()
+        if expiring_names:
+            self._fetch_expiring({name: self._entries[name].value for name in expiring_names})
+        if deferred:
+            for name, entry in members:
+                if name in deferred:
+                    self._load_member(name, entry, trace)
+            # back in order of definition
+            self._entries = type(self._entries)(
+                (name, self._entries[name]) for name, _ in members if name in self._entries
+            )
+        if trace is not None:
+            self._allocations = trace.end(outer_allocations)
 
         # load (all calls inside should produce a real value)
         self._is_model = False
@@ -150,9 +295,560 @@ class Configence:
                 evaluated_value = default.eval(self)
                 setattr(self, name, evaluated_value)
                 entry.value = evaluated_value
+                self._delayed_values.add(name)
 
+        # values loaded later (e.g. from the CLI) are not interpolated
+        self._interpolator = None
+        self._nested_keys = None
+        if self.TRACK_ACCESS:
+            # reads made once loaded (including by on_load) are counted
+            self._access_counts = dict.fromkeys(self._entries, 0)
+            track_access(type(self))
         self.on_load()
         self._is_model = is_model
+        if self.HISTORY_SIZE:
+            self._history = History(
+                self.HISTORY_SIZE,
+                PersistentMap((name, entry.value) for name, entry in self._entries.items()),
+            )
+        if metrics is not None:
+            class_name = self.__class__.__qualname__
+            metrics.instances_created.inc(**{"class": class_name})
+            metrics.load_duration.observe(perf_counter() - started, **{"class": class_name})
+
+    def _create_interpolator(self, members=()) -> Interpolator:
+        entries_by_key = {
+            entry.key: entry
+            for _, entry in members
+            if isinstance(entry, ConfigenceEntry)
+        }
+
+        def lookup(name):
+            # the (prefixed) key in the sources, then the entry's default,
+            # then the key as is in the sources
+            whole_key = self._prefix_key(name)
+            try:
+                return self._config(whole_key)
+            except UndefinedValueError:
+                pass
+            entry = entries_by_key.get(name)
+            if entry is not None:
+                default = entry.get_default(self._config)
+                if isinstance(default, (str, int, float)):
+                    return default
+            if whole_key != name:
+                try:
+                    return self._config(name)
+                except UndefinedValueError:
+                    pass
+            raise KeyError(name)
+
+        return Interpolator(lookup)
+
+    def _warmup(self):
+        """Load anything still loaded lazily, and compact the instance's
+        internal storage (see prefork_warmup)."""
+        for entry in self._entries.values():
+            # parse shared documents now - and not in each forked worker
+            if entry.document is not None:
+                entry.document.read(self._config)
+        self._interpolator = None
+        # plain dicts are smaller than OrderedDicts (and keep the order as well)
+        self._entries = dict(self._entries)
+        self._delayed_entries = dict(self._delayed_entries)
+        self._delayed_defaults = dict(self._delayed_defaults)
+        # load groups now - and not in each forked worker
+        for name, _ in self._groups():
+            getattr(self, name)._warmup()
+
+    @classmethod
+    def _schema(cls) -> List[Tuple[str, Union[ConfigenceEntry, ConfigenceDelay]]]:
+        """The class's entries (name, entry) by creation order - collected
+        once per class."""
+        schema = cls.__dict__.get("_configence_schema")
+        if schema is None:
+            schema = sorted(
+                inspect.getmembers(
+                    cls, lambda member: isinstance(member, (ConfigenceEntry, ConfigenceDelay))
+                ),
+                key=lambda member: member[1].index,
+            )
+            cls._configence_schema = schema
+        return schema
+
+    @classmethod
+    def _async_entries(cls) -> List[str]:
+        """Names of the class's entries with async casts - collected once
+        per class."""
+        names = cls.__dict__.get("_configence_async_entries")
+        if names is None:
+            names = [
+                name
+                for name, entry in cls._schema()
+                if isinstance(entry, ConfigenceEntry) and entry.async_cast is not None
+            ]
+            cls._configence_async_entries = names
+        return names
+
+    @classmethod
+    def _deferred_delays(cls) -> Set[str]:
+        """Names of the class's delayed entries depending (directly or
+        transitively) on async / expiring entries - collected once per
+        class."""
+        names = cls.__dict__.get("_configence_deferred_delays")
+        if names is None:
+            names = set()
+            resolved = set(cls._async_entries()) | set(cls._expiring_entries())
+            if resolved:
+                for name, entry in cls._schema():
+                    if isinstance(entry, ConfigenceDelay) and not entry.dependencies.isdisjoint(resolved):
+                        names.add(name)
+                        resolved.add(name)
+            cls._configence_deferred_delays = names
+        return names
+
+    def _load_member(self, name: str, entry: Union[ConfigenceEntry, ConfigenceDelay], trace=None):
+        """Evaluate a class entry into its value."""
+        if trace is not None:
+            trace.start()
+        # unwrap delayed entries
+        evaluated_value = undefined
+        if isinstance(entry, ConfigenceDelay):
+            self._delayed_entries[name] = entry
+            # For delayed entries, create a ConfigenceEntry with the evaluated value
+            evaluated_value = entry.eval(self)
+            entry = ConfigenceEntry(
+                name,  # Use name as key for delayed entries
+                default=evaluated_value,
+                index=entry.index
+            )
+
+        if isinstance(entry, ConfigenceEntry):
+            # a per-instance copy - sharing the entry's metadata, but holding its own value
+            entry = entry.copy()
+            self._entries[name] = entry
+            # save delayed
+            if isinstance(entry.default, ConfigenceDelay):
+                self._delayed_defaults[name] = entry
+            # eval, and save the value into the class instance
+            value = self._eval_and_save_entry(name, entry)
+            # save the value into the entry to be used as default for CLI
+            entry.value = value
+            if value is evaluated_value:
+                self._delayed_values.add(name)
+        if trace is not None:
+            trace.stop(name)
+
+    def _resolve_async(self, values: Dict[str, Any]) -> List[str]:
+        """Await the async casts of entries (by name: the value read) and
+        set their results - returning the names of the cast entries."""
+        names, tasks = [], []
+        for name, value in values.items():
+            entry = self._entries[name]
+            if entry.async_cast.needs_cast(value, entry.type):
+                names.append(name)
+                tasks.append((self._prefix_key(entry.key), entry.async_cast, value))
+        if tasks:
+            raws = [raw for _, _, raw in tasks]
+            for name, raw, value in zip(names, raws, run_casts(tasks, self.ASYNC_CONCURRENCY)):
+                setattr(self, name, value)
+                self._async_raw[name] = (raw, value)
+        return names
+
+    @classmethod
+    def _expiring_entries(cls) -> List[str]:
+        """Names of the class's expiring entries - collected once per
+        class."""
+        names = cls.__dict__.get("_configence_expiring_entries")
+        if names is None:
+            names = [
+                name
+                for name, entry in cls._schema()
+                if isinstance(entry, ConfigenceEntry) and entry.expiry is not None
+            ]
+            cls._configence_expiring_entries = names
+        return names
+
+    def _fetch_expiring(self, values: Dict[str, Any]) -> List[str]:
+        """Set the current values of expiring entries (by name: the raw
+        value read), fetched by - and subscribed to - their shared
+        refreshers. Returns the names of the fetched entries."""
+        scheduler = get_refresh_scheduler()
+        names = []
+        for name, raw in values.items():
+            previous = self._refreshers.pop(name, None)
+            if previous is not None:
+                previous.unsubscribe(self, name)
+            if raw is None or raw is undefined:
+                continue
+            refresher = scheduler.refresher(self._entries[name].expiry, raw)
+            setattr(self, name, refresher.value)
+            refresher.subscribe(self, name)
+            self._refreshers[name] = refresher
+            names.append(name)
+        return names
+
+    def refresh(self, *names: str) -> Dict[str, bool]:
+        """Refresh expiring values now (all of them by default) - for all
+        the instances sharing them. Failed refreshes keep the last good
+        value.
+
+        Returns:
+            Dict[str, bool]: whether each value was refreshed
+        """
+        if not names:
+            names = tuple(self._refreshers)
+        return {name: self._refreshers[name].refresh() for name in names}
+
+    @classmethod
+    async def acreate(cls, *args, concurrency: Optional[int] = None, **kwargs):
+        """Create an instance from async code: the async casts of its
+        entries (see async_value) are awaited concurrently on the running
+        event loop, while the rest of the load runs in a worker thread.
+
+        Args:
+            concurrency (int, optional): Number of async casts awaited at once. Defaults to ASYNC_CONCURRENCY.
+        """
+        return await create_async(partial(cls, *args, **kwargs), concurrency)
+
+    @classmethod
+    def _groups(cls) -> List[Tuple[str, ConfigenceGroup]]:
+        """The class's groups (name, group) by creation order - collected
+        once per class."""
+        groups = cls.__dict__.get("_configence_groups")
+        if groups is None:
+            groups = sorted(
+                inspect.getmembers(cls, lambda member: isinstance(member, ConfigenceGroup)),
+                key=lambda member: member[1].index,
+            )
+            cls._configence_groups = groups
+        return groups
+
+    def _loaded_groups(self) -> List[Tuple[str, "Configence"]]:
+        """The groups loaded so far (name, child)."""
+        return [
+            (name, self.__dict__[name]) for name, _ in self._groups() if name in self.__dict__
+        ]
+
+    def _load_groups(self) -> List["Configence"]:
+        """Load all the groups (recursively) - returning this instance and
+        all its groups' instances."""
+        instances = [self]
+        for name, _ in self._groups():
+            instances.extend(getattr(self, name)._load_groups())
+        return instances
+
+    @classmethod
+    def from_mapping(cls, mapping: Dict[str, Any], *args, **kwargs):
+        """Create an instance from a mapping of raw strings or already typed
+        values (by env-var key, i.e. including the prefix), without reading
+        env-vars, .env / .ini files or the default sources.
+
+        Missing keys fall back to the entries' defaults. Extra args are
+        passed to the class's constructor.
+        """
+        with use_sources(MappingSource(mapping)):
+            return cls(*args, **kwargs)
+
+    def save_snapshot(self, path: str, secret: Optional[Union[str, bytes]] = None) -> str:
+        """Save the values of this instance into a checksummed snapshot file
+        (see from_snapshot).
+
+        Returns:
+            str: the snapshot's checksum
+        """
+        return write_snapshot(self, path, secret)
+
+    @classmethod
+    def from_snapshot(cls, path: str, *args, secret: Optional[Union[str, bytes]] = None, **kwargs):
+        """Create an instance from a snapshot file (see save_snapshot).
+
+        The snapshot is verified against its checksum (keyed with secret, if
+        given - raising SnapshotIntegrityError on mismatch). If it was taken
+        with the current schema of the class, it is trusted - and model()
+        values are built without pydantic validation; otherwise values are
+        loaded with full validation. Values missing from the snapshot are
+        read from the usual sources. Extra args are passed to the class's
+        constructor.
+        """
+        values, trusted = read_snapshot(cls, path, secret)
+        mapping = snapshot_mapping(cls, values, trusted, kwargs.get("prefix"))
+        # set as the context's sources (like from_mapping) - so classes with their own __init__ work as well
+        fallback = resolve_config(kwargs.pop("sources", None))
+        with use_sources(SnapshotSource(mapping, fallback)):
+            return cls(*args, **kwargs)
+
+    def replace(self, **overrides) -> "Configence":
+        """Create a copy of this instance with some values changed.
+
+        The copy shares the unchanged values and the entries' metadata with
+        this instance; only the overridden values (raw strings or typed
+        values) are cast, and only delayed values depending (directly or
+        transitively) on them are re-evaluated. on_load() is not called
+        again.
+        """
+        unknown = set(overrides).difference(self._entries)
+        if unknown:
+            raise AttributeError(
+                "{} has no config entries: {}".format(
+                    self.__class__.__name__, ", ".join(sorted(unknown))
+                )
+            )
+        clone = object.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        # both instances share all entries now - until they are written to
+        self._shared_entries = set(self._entries)
+        clone._shared_entries = set(self._entries)
+        clone._entries = type(self._entries)(self._entries)
+        clone._delayed_values = set(self._delayed_values)
+        clone._cli_overrides = dict(self._cli_overrides)
+        if self._entry_digests is not None:
+            clone._entry_digests = dict(self._entry_digests)
+        if self._history is not None:
+            clone._history = self._history.copy()
+        clone._environ_values = dict(self._environ_values)
+        clone._environ_by_prefix = {}
+        clone._async_raw = dict(self._async_raw)
+        clone._refreshers = dict(self._refreshers)
+        for name, refresher in clone._refreshers.items():
+            if name not in overrides:
+                refresher.subscribe(clone, name)
+        if self.TRACK_ACCESS:
+            clone._access_counts = dict.fromkeys(clone._entries, 0)
+        for name, child in self._loaded_groups():
+            clone.__dict__[name] = child.replace()
+
+        with clone._record_changes("replace"):
+            for name, raw in overrides.items():
+                entry = clone._entries[name]
+                setattr(clone, name, clone._safe_cast(entry.cast, entry.type)(raw))
+                clone._delayed_values.discard(name)
+            async_overrides = {
+                name: clone._entries[name].value
+                for name in overrides
+                if clone._entries[name].async_cast is not None
+            }
+            if async_overrides:
+                clone._resolve_async(async_overrides)
+            expiring_overrides = {
+                name: clone._entries[name].value
+                for name in overrides
+                if clone._entries[name].expiry is not None
+            }
+            if expiring_overrides:
+                clone._fetch_expiring(expiring_overrides)
+
+            clone._reevaluate_delays(overrides)
+        return clone
+
+    def _reevaluate_delays(self, changed):
+        """Re-evaluate the delayed values depending (directly or
+        transitively) on the changed entries (by order of definition)."""
+        changed = set(changed)
+        for name, delay in self._delays():
+            if name in self._delayed_values and not delay.dependencies.isdisjoint(changed):
+                setattr(self, name, delay.eval(self))
+                changed.add(name)
+
+    @property
+    def history(self) -> Optional[History]:
+        """The kept generations of values (None if HISTORY_SIZE is 0)."""
+        return self._history
+
+    def _record_changes(self, reason: str):
+        """Record all value changes made inside the block as one history
+        generation."""
+        if self._history is None:
+            return nullcontext()
+        return self._history.batch(reason)
+
+    def rollback(self, n: int = 1) -> Dict[str, Tuple[Any, Any]]:
+        """Restore the values of n generations back (dropping the newer
+        generations).
+
+        Returns:
+            Dict[str, Tuple[Any, Any]]: the restored entries - {name: (dropped value, restored value)}
+        """
+        if self._history is None:
+            raise RuntimeError(
+                f"{self.__class__.__name__} keeps no history (see HISTORY_SIZE)"
+            )
+        latest, current = self._history.rollback(n)
+        changes = latest.values.diff(current.values)
+        # restoring isn't recorded as a new generation
+        history, self._history = self._history, None
+        try:
+            for name, (_, value) in changes.items():
+                setattr(self, name, value)
+                self._cli_overrides.pop(name, None)
+        finally:
+            self._history = history
+        return changes
+
+    def fingerprint(self) -> str:
+        """A stable digest of all the config values (e.g. for cache keys).
+
+        Computed once (on first call) from per-entry digests, and then kept
+        up to date incrementally on every value change (attribute setting,
+        CLI overrides) - so it costs O(1) per call and per change.
+        """
+        if self._entry_digests is None:
+            self._entry_digests = {
+                name: entry_digest(name, entry.value)
+                for name, entry in self._entries.items()
+            }
+            self._fingerprint = combine(self._entry_digests.values())
+        return format_digest(self._fingerprint)
+
+    def _update_fingerprint(self, name: str, value: Any):
+        new_digest = entry_digest(name, value)
+        old_digest = self._entry_digests.get(name, 0)
+        self._entry_digests[name] = new_digest
+        self._fingerprint = replace_digest(self._fingerprint, old_digest, new_digest)
+
+    def _check_tracking(self):
+        if not self.TRACK_ACCESS:
+            raise RuntimeError(
+                f"{self.__class__.__name__} doesn't track access (see TRACK_ACCESS)"
+            )
+
+    def access_counts(self) -> Dict[str, int]:
+        """The number of reads of each entry's value since the load."""
+        self._check_tracking()
+        return dict(self._access_counts)
+
+    def unused_entries(self) -> List[str]:
+        """The entries whose value was never read since the load."""
+        self._check_tracking()
+        return [name for name, count in self._access_counts.items() if not count]
+
+    def hot_keys(self, min_reads: int = 1) -> List[str]:
+        """The entries read at least min_reads times, most read first - e.g.
+        to choose what to load eagerly at startup."""
+        self._check_tracking()
+        counts = [(name, count) for name, count in self._access_counts.items() if count >= min_reads]
+        counts.sort(key=lambda item: item[1], reverse=True)
+        return [name for name, _ in counts]
+
+    def unknown_keys(self) -> List[str]:
+        """The keys under this instance's prefix in its sources which match
+        no entry (e.g. typos, or leftovers of removed entries)."""
+        if not self._prefix:
+            raise ValueError(
+                f"{self.__class__.__name__} has no prefix - can't tell which keys belong to it"
+            )
+        known = {self._prefix_key(entry.key) for entry in self._entries.values()}
+        return sorted(
+            key
+            for key in source_keys(self._config)
+            if key.startswith(self._prefix) and key not in known
+        )
+
+    def to_environ(self, prefix: Optional[str] = None) -> Dict[str, str]:
+        """The values as env-vars (e.g. for subprocesses), serialized into
+        the format their entries parse - models as JSON, lists as CSV, etc.
+
+        Each value is serialized once, and only serialized again after it
+        changes. None values are left out. The entries of the groups (loading
+        them) are included under their prefixes. Async and expiring entries
+        (see async_value and expiring) are serialized into the raw values
+        they were resolved / fetched from - or left out if their values were
+        set otherwise.
+
+        Args:
+            prefix (str, optional): Prefix of the env-var keys. Defaults to this instance's prefix.
+        """
+        if prefix is None:
+            prefix = self._prefix or ""
+        environ = self._environ_by_prefix.get(prefix)
+        if environ is None:
+            environ = {}
+            for name, entry in self._entries.items():
+                if name not in self._environ_values:
+                    self._environ_values[name] = self._serialize_entry(name, entry)
+                serialized = self._environ_values[name]
+                if serialized is not None:
+                    environ[f"{prefix}{entry.key}"] = serialized
+            self._environ_by_prefix[prefix] = environ
+        environ = dict(environ)
+        for name, group in self._groups():
+            environ.update(getattr(self, name).to_environ(f"{prefix}{group.prefix or ''}"))
+        return environ
+
+    def _serialize_entry(self, name: str, entry: ConfigenceEntry) -> Optional[str]:
+        value = entry.value
+        if entry.async_cast is not None:
+            # the raw value (e.g. a secret's reference) - and not the secret
+            raw, resolved = self._async_raw.get(name, (None, undefined))
+            value = raw if value is resolved else None
+        elif entry.expiry is not None:
+            # the credential's reference - and not the fetched token
+            refresher = self._refreshers.get(name)
+            value = refresher.raw if refresher is not None and value is refresher.value else None
+        if value is None:
+            return None
+        return (entry.serialize or serialize_value)(value)
+
+    def write_env_file(self, path: str, prefix: Optional[str] = None):
+        """Write the values into a .env file (see to_environ), which loads
+        back into the same values."""
+        content = format_env_file(self.to_environ(prefix))
+        with open(path, "w") as f:
+            f.write(content)
+
+    def memory_report(self) -> MemoryReport:
+        """The memory used by the values of the entries (deep sizes, with
+        objects shared between entries counted once) - printable as a table,
+        or as structured data (see MemoryReport.to_dict).
+
+        Instances loaded inside configence.memory.trace_allocations() also
+        report the allocations made while reading and casting each entry.
+        """
+        return memory_report(self._entries, self._allocations)
+
+    def _delays(self) -> List[Tuple[str, ConfigenceDelay]]:
+        """All delayed entries and delayed defaults (name, delay) by order
+        of definition."""
+        delays = list(self._delayed_entries.items())
+        delays.extend((name, entry.default) for name, entry in self._delayed_defaults.items())
+        delays.sort(key=lambda item: item[1].index)
+        return delays
+
+    @classmethod
+    def cached(cls, prefix=None):
+        """Get a shared instance of this class (loading it only if needed).
+
+        Instances are cached in a bounded process-wide LRU (see
+        configence.cache.InstanceCache), keyed by the class, the prefix and
+        a fingerprint of the env-vars / files / documents read while
+        loading - so they are reloaded when any of those inputs change.
+        Groups are loaded along with the instance, so their inputs are
+        covered as well. The shared instance should be treated as read-only.
+        """
+        kwargs = {} if prefix is None else {"prefix": prefix}
+
+        def read_current(inputs):
+            sources, keys = inputs
+            return read_raw_values(resolve_config(sources), keys)
+
+        def load():
+            with record_reads() as recorders:
+                instance = cls(**kwargs)
+                instances = instance._load_groups()
+            reads = {}
+            for recorder in recorders:
+                reads.update(recorder.reads)
+            documents = {}
+            for loaded in instances:
+                # stop recording reads made after the load
+                while isinstance(loaded._config, RecordingSource):
+                    loaded._config = loaded._config.config
+                for entry in loaded._entries.values():
+                    if entry.document is not None:
+                        documents[id(entry.document)] = entry.document
+            return instance, (instance._sources, reads), list(documents.values())
+
+        return get_instance_cache().get(cls, prefix, read_current, load)
 
     def _is_entry(self, entry):
         res = isinstance(entry, (ConfigenceEntry, ConfigenceDelay))
@@ -164,7 +860,21 @@ class Configence:
 
     @property
     def entries(self):
-        return self._entries
+        """The entries by name - including those of the groups (loading
+        them), as "<group>.<name>"."""
+        groups = self._groups()
+        if not groups:
+            return self._entries
+        entries = dict(self._entries)
+        for name, _ in groups:
+            for child_name, entry in getattr(self, name).entries.items():
+                entries[f"{name}.{child_name}"] = entry
+        return entries
+
+    @property
+    def cli_overrides(self) -> Dict[str, Any]:
+        """The values explicitly set from the command line (by key)."""
+        return self._cli_overrides
 
     def _prefix_key(self, key):
         prefix = self._prefix
@@ -176,10 +886,54 @@ class Configence:
         return value
 
     def _eval_entry(self, entry: ConfigenceEntry):
+        if entry.nested_delimiter is not None:
+            nested_value = self._eval_nested_entry(entry)
+            if nested_value is not undefined:
+                return nested_value
         whole_key = self._prefix_key(entry.key)
-        res = self._evaluate(whole_key, entry.default, entry.cast, **entry.kwargs)
+        res = self._evaluate(
+            whole_key, entry.get_default(self._config), entry.cast, value_type=entry.type, **entry.kwargs
+        )
         return res
 
+    def _nested_fields(self, entry: ConfigenceEntry) -> List[str]:
+        """The keys of the nested fields of entry - found by a single scan
+        of the source's keys for all the nested entries."""
+        prefix = self._prefix_key(entry.key) + entry.nested_delimiter
+        if self._nested_keys is None or prefix not in self._nested_keys:
+            prefixes = {
+                self._prefix_key(nested.key) + nested.nested_delimiter
+                for _, nested in self._schema()
+                if isinstance(nested, ConfigenceEntry) and nested.nested_delimiter is not None
+            }
+            # entries not declared on the class (is_model=False)
+            prefixes.add(prefix)
+            self._nested_keys = scan_prefixes(source_keys(self._config), prefixes)
+            if isinstance(self._config, RecordingSource):
+                # keys added (or removed) later change the value as well (see cached)
+                for scanned, keys in self._nested_keys.items():
+                    self._config.record_keys(scanned, keys)
+        return self._nested_keys[prefix]
+
+    def _eval_nested_entry(self, entry: ConfigenceEntry):
+        """The model of entry assembled from its nested fields on top of
+        its (JSON) base value - or undefined if it has no nested fields."""
+        keys = self._nested_fields(entry)
+        if not keys:
+            return undefined
+        get_raw = raw_getter(self._config)
+        whole_key = self._prefix_key(entry.key)
+        try:
+            base = get_raw(whole_key)
+        except KeyError:
+            base = entry.get_default(self._config)
+            if base is undefined or isinstance(base, ConfigenceDelay):
+                base = None
+        prefix_length = len(whole_key) + len(entry.nested_delimiter)
+        fields = {key[prefix_length:]: get_raw(key) for key in keys}
+        data = assemble(entry.type, base, fields, entry.nested_delimiter)
+        return entry.type.model_validate(data)
+
     def _process(
         self,
         key,
@@ -190,40 +944,74 @@ class Configence:
         cast_from_json=no_cast,
         type: ValueT = str,
         flags: List[str] = None,
+        document: ConfigDocument = None,
+        pointer: str = None,
+        serialize: Callable = None,
+        async_cast: AsyncCast = None,
+        expiry: Expiry = None,
+        nested_delimiter: str = None,
         **kwargs,
     ) -> Union[ValueT, ConfigenceEntry]:
+        # create new entry
+        res = ConfigenceEntry(
+            key,
+            default=default,
+            description=description,
+            cast=cast,
+            cast_from_json=cast_from_json,
+            type=type,
+            index=self._counter,
+            flags=flags,
+            document=document,
+            pointer=pointer,
+            serialize=serialize,
+            async_cast=async_cast,
+            expiry=expiry,
+            nested_delimiter=nested_delimiter,
+            **kwargs,
+        )
         if self._is_model:
-            # create new entry
-            res = ConfigenceEntry(
-                key,
-                default=default,
-                description=description,
-                cast=cast,
-                cast_from_json=cast_from_json,
-                type=type,
-                index=self._counter,
-                flags=flags,
-                **kwargs,
-            )
             # track count for indexing
             self._counter += 1
             return res
 
-        whole_key = self._prefix_key(key)
-        return self._evaluate(whole_key, default, cast, **kwargs)
+        # the keys of nested fields are scanned again on each read
+        self._nested_keys = None
+        value = self._eval_entry(res)
+        if res.async_cast is not None and res.async_cast.needs_cast(value, res.type):
+            value = run_casts([(self._prefix_key(key), res.async_cast, value)], self.ASYNC_CONCURRENCY)[0]
+        if res.expiry is not None and value is not None:
+            # not refreshed - there's no instance to set the refreshed value on
+            value = get_refresh_scheduler().refresher(res.expiry, value).value
+        return value
+
+    def _evaluate(self, key, default=undefined, cast=no_cast, value_type=None, **kwargs):
+        metrics = get_metrics()
+        if metrics is None:
+            return self._evaluate_value(key, default, cast, value_type, **kwargs)
+        started = perf_counter()
+        try:
+            return self._evaluate_value(key, default, cast, value_type, **kwargs)
+        except (ValueError, TypeError):
+            # failed casts (pydantic's ValidationError is a ValueError as well)
+            metrics.validation_failures.inc(**{"class": self.__class__.__qualname__, "key": key})
+            raise
+        finally:
+            type_name = getattr(value_type, "__name__", None) or getattr(cast, "__name__", "value")
+            metrics.cast_duration.observe(perf_counter() - started, type=type_name)
 
-    def _evaluate(self, key, default=undefined, cast=no_cast, **kwargs):
-        safe_cast_func = ignore_confi_delay_cast(cast)
+    def _evaluate_value(self, key, default=undefined, cast=no_cast, value_type=None, **kwargs):
+        safe_cast_func = self._safe_cast(cast, value_type)
         # decouple expects a string don't pass actual objects to it, as it will try and cast them - instead pass undefined
         passed_default = default if isinstance(default, str) else undefined
         try:
-            res = config(key, default=passed_default, cast=safe_cast_func, **kwargs)
+            res = self._config(key, default=passed_default, cast=safe_cast_func, **kwargs)
         except UndefinedValueError:
             # return actual default if provided, if we don't have one re-raise
             if not isinstance(default, undefined.__class__):
                 # cast the default value if needed (it's a string or a dict that represents an object); otherwise use as is
                 if isinstance(default, str) or (
-                    safe_cast_func.__name__ == cast_pydantic(BaseModel).__name__
+                    getattr(cast, "__name__", None) == cast_pydantic(BaseModel).__name__
                     and isinstance(default, dict)
                 ):
                     res = safe_cast_func(default)
@@ -239,6 +1027,34 @@ class Configence:
             raise
         return res
 
+    def _safe_cast(self, cast, value_type=None):
+        """Wrap cast (in a single closure - this runs for every value
+        loaded) to:
+
+        - skip ConfigenceDelay defaults (see ignore_confi_delay_cast)
+        - interpolate ${KEY} references in raw strings (if enabled)
+        - pass through values which are already of the entry's type (e.g. typed values given to from_mapping)
+        - go through the cast cache (if enabled)
+        """
+        cast_func = cached_cast(cast)
+        interpolator = None
+        if self._interpolate:
+            interpolator = self._interpolator or self._create_interpolator()
+        if not inspect.isclass(value_type) or value_type is str:
+            value_type = None
+
+        def safe_cast_func(value):
+            if isinstance(value, ConfigenceDelay):
+                return value
+            if isinstance(value, str):
+                if interpolator is not None:
+                    value = interpolator.interpolate(value)
+            elif value_type is not None and isinstance(value, value_type):
+                return value
+            return cast_func(value)
+
+        return safe_cast_func
+
     def __repr__(self) -> str:
         return json.dumps(
             {k: str(v.value) for k, v in self.entries.items()},
@@ -299,7 +1115,35 @@ class Configence:
         super().__setattr__(name, value)
         # update entry as well (to sync with CLI, etc. )
         if not name.startswith("_") and name in self._entries:
-            self._entries[name].value = value
+            if self._shared_entries is not None and name in self._shared_entries:
+                # copy-on-write of entries shared with replace() clones
+                self._entries[name] = self._entries[name].copy()
+                self._shared_entries.discard(name)
+            entry = self._entries[name]
+            old_value = entry.value
+            entry.value = value
+            if self._entry_digests is not None:
+                self._update_fingerprint(name, value)
+            if self._history is not None:
+                self._history.record(name, old_value, value)
+            if self._environ_values:
+                self._environ_values.pop(name, None)
+                self._environ_by_prefix.clear()
+
+    def group(self, config_cls: Type["Configence"], prefix: str = None, description: str = None):
+        """A nested config class - loaded on first access, with this
+        instance's sources and prefix (followed by prefix).
+
+        Args:
+            config_cls (Type[Configence]): the nested config class.
+            prefix (str, optional): Prefix of the nested class's keys (after the parent's prefix).
+            description (str, optional): Description of the group.
+        """
+        group = ConfigenceGroup(config_cls, prefix=prefix, description=description, index=self._counter)
+        if self._is_model:
+            self._counter += 1
+            return group
+        return group.load(self)
 
     def delay(self, value):
         delayed_entry = ConfigenceDelay(value, index=self._counter)
@@ -357,15 +1201,86 @@ class Configence:
             key,
             default=default,
             description=description,
-            cast=Csv(cast=sub_cast, delimiter=delimiter, strip=strip),
+            cast=CsvList(cast=sub_cast, delimiter=delimiter, strip=strip),
             type=list,
+            serialize=serialize_csv(delimiter),
+            **kwargs,
+        )
+
+    def async_value(
+        self,
+        key,
+        cast: Callable[[Any], Awaitable],
+        default=undefined,
+        timeout: Optional[float] = None,
+        type: Type = object,
+        description=None,
+        **kwargs,
+    ) -> Any:
+        """An entry resolved by a coroutine cast (e.g. resolving a secret
+        reference) - awaited concurrently with the other async entries while
+        loading (see acreate), before delayed values are evaluated.
+
+        Args:
+            cast (Callable): coroutine function taking the raw value.
+            timeout (float, optional): Seconds to wait for the cast (raising TimeoutError). Defaults to waiting forever.
+            type (Type, optional): Type of the resolved values (values which already are of it are not cast). Defaults to object (only raw strings are cast).
+        """
+        return self._process(
+            key,
+            default=default,
+            description=description,
+            type=type,
+            async_cast=AsyncCast(cast, timeout),
+            **kwargs,
+        )
+
+    def expiring(
+        self,
+        key,
+        fetch: Callable[[Any], Any],
+        ttl: float,
+        default=undefined,
+        refresh_ahead: Optional[float] = None,
+        retry: Optional[float] = None,
+        type: Type = object,
+        description=None,
+        **kwargs,
+    ) -> Any:
+        """An expiring value (e.g. a short-lived token) fetched from the raw
+        value (e.g. a credential reference), and refreshed by a background
+        thread before it expires. Instances reading the same raw value share
+        it - it's fetched once, and refreshed values are set on all of them.
+
+        Args:
+            fetch (Callable): fetches the value from the raw value.
+            ttl (float): Seconds a fetched value is valid for.
+            refresh_ahead (float, optional): Seconds before the expiry to refresh the value. Defaults to a fifth of the ttl.
+            retry (float, optional): Seconds to wait before retrying a failed refresh (the last good value is kept meanwhile). Defaults to a tenth of the ttl.
+        """
+        return self._process(
+            key,
+            default=default,
+            description=description,
+            type=type,
+            expiry=Expiry(fetch, ttl, refresh_ahead=refresh_ahead, retry=retry),
             **kwargs,
         )
 
     def model(
-        self, key, model_type: T, default=undefined, description=None, **kwargs
+        self,
+        key,
+        model_type: T,
+        default=undefined,
+        description=None,
+        nested_delimiter: str = None,
+        **kwargs,
     ) -> T:
-        """Parse a config using a Pydantic model."""
+        """Parse a config using a Pydantic model.
+
+        Args:
+            nested_delimiter (str, optional): Set single (nested) fields by keys under the entry's key (e.g. "__": DB__POOL__SIZE sets db.pool.size), on top of the JSON value of the key itself (or the default). Defaults to None (the whole model is a single JSON value).
+        """
         x = self._process(
             key,
             description=description,
@@ -373,6 +1288,7 @@ class Configence:
             cast=cast_pydantic(model_type),
             cast_from_json=cast_pydantic(model_type),
             type=model_type,
+            nested_delimiter=nested_delimiter,
             **kwargs,
         )
         return x
@@ -383,19 +1299,103 @@ class Configence:
         enum_type: EnumT,
         default=undefined,
         description=None,
+        case_sensitive=True,
         **kwargs,
     ) -> EnumT:
+        """Parse a config into a member of enum_type (by value or by name)."""
+        cast = cast_enum(enum_type, case_sensitive)
         return self._process(
             key,
             description=description,
             default=default,
-            cast=enum_type,
-            cast_from_json=enum_type,
+            cast=cast,
+            cast_from_json=cast,
             type=enum_type,
             **kwargs,
         )
 
+    def regex(
+        self,
+        key,
+        default=undefined,
+        regex_flags=0,
+        delimiter=None,
+        description=None,
+        **kwargs,
+    ) -> RegexMatcher:
+        """Parse a regex (or a `delimiter` separated list of regexes) into a
+        precompiled RegexMatcher."""
+        cast = cast_regex(regex_flags, delimiter)
+        return self._process(
+            key,
+            description=description,
+            default=compile_default(default, cast),
+            cast=cast,
+            cast_from_json=cast,
+            type=RegexMatcher,
+            serialize=serialize_patterns(delimiter),
+            **kwargs,
+        )
+
+    def globs(
+        self,
+        key,
+        default=undefined,
+        delimiter=",",
+        case_sensitive=True,
+        description=None,
+        **kwargs,
+    ) -> GlobMatcher:
+        """Parse a list of shell-style globs into a precompiled
+        GlobMatcher."""
+        cast = cast_globs(delimiter, case_sensitive)
+        return self._process(
+            key,
+            description=description,
+            default=compile_default(default, cast),
+            cast=cast,
+            cast_from_json=cast,
+            type=GlobMatcher,
+            serialize=serialize_patterns(delimiter),
+            **kwargs,
+        )
 
+    def cidrs(
+        self, key, default=undefined, delimiter=",", description=None, **kwargs
+    ) -> CidrMatcher:
+        """Parse a list of IP networks (e.g. "10.0.0.0/8,::1/128") into a
+        precompiled CidrMatcher."""
+        cast = cast_cidrs(delimiter)
+        return self._process(
+            key,
+            description=description,
+            default=compile_default(default, cast),
+            cast=cast,
+            cast_from_json=cast,
+            type=CidrMatcher,
+            serialize=serialize_patterns(delimiter),
+            **kwargs,
+        )
+
+    def flag(self, key, default=False, salt: str = None, description=None, **kwargs) -> FeatureFlag:
+        """A feature flag - "true" / "false", a rollout percentage ("25%")
+        or JSON rules (percentage, allow / deny lists by context attribute,
+        see configence.flags), compiled once when loaded. Check it with
+        `FLAG.enabled(context)`.
+
+        Args:
+            salt (str, optional): Salt of the flag's rollout buckets (flags with the same salt roll out to the same contexts). Defaults to the key.
+        """
+        cast = cast_flag(salt if salt is not None else key)
+        return self._process(
+            key,
+            description=description,
+            default=compile_default(default, cast),
+            cast=cast,
+            cast_from_json=cast,
+            type=FeatureFlag,
+            **kwargs,
+        )
 
 
 # default parser
@@ -0,0 +1,95 @@
+"""Serializing config values back into env-var strings (see
+Configence.to_environ).
+
+Each value is serialized into the format its entry's cast parses - so the
+resulting env-vars (or .env file) load back into equal values.
+"""
+
+import json
+from enum import Enum
+from typing import Callable, Dict, Iterable, Optional
+
+from pydantic import BaseModel
+
+# characters which make decouple's (shlex based) Csv split or drop parts of an item
+_CSV_SPECIAL = set("\"'\\#")
+
+
+def _quote_csv_item(item: str, delimiter: str) -> str:
+    if any(char in _CSV_SPECIAL or char in delimiter for char in item):
+        escaped = item.replace("\\", "\\\\").replace('"', '\\"')
+        return f'"{escaped}"'
+    return item
+
+
+def serialize_csv(delimiter: str = ",") -> Callable[[Iterable], str]:
+    """Serialize a list into the format parsed by decouple's Csv."""
+
+    def serialize_csv_items(value) -> str:
+        return delimiter[0].join(
+            _quote_csv_item(serialize_value(item), delimiter) for item in value
+        )
+
+    return serialize_csv_items
+
+
+def serialize_patterns(delimiter: Optional[str] = ",") -> Callable:
+    """Serialize a matcher into its `delimiter` separated patterns (a
+    single pattern, without a delimiter)."""
+
+    def serialize_matcher_patterns(value) -> str:
+        patterns = getattr(value, "patterns", None)
+        if patterns is None:
+            # CidrMatcher
+            patterns = [str(network) for network in value.networks]
+        if delimiter is None:
+            if len(patterns) != 1:
+                raise ValueError(
+                    f"{len(patterns)} patterns can't be serialized into a single pattern - set a delimiter"
+                )
+            return patterns[0]
+        for pattern in patterns:
+            if delimiter in pattern or pattern != pattern.strip():
+                raise ValueError(f"the pattern {pattern!r} can't be serialized with the delimiter {delimiter!r}")
+        return delimiter.join(patterns)
+
+    return serialize_matcher_patterns
+
+
+def serialize_value(value) -> Optional[str]:
+    """The env-var string of a value (None for values which can't be set)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, Enum):
+        # values take precedence over names when parsed (see cast_enum)
+        return str(value.value)
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    if isinstance(value, dict):
+        return json.dumps(value)
+    if isinstance(value, (list, tuple)):
+        return serialize_csv()(value)
+    return str(value)
+
+
+def _quote_env_value(value: str) -> str:
+    # decouple's .env parser strips the value, and one pair of surrounding quotes
+    if value != value.strip() or (len(value) >= 2 and value[0] == value[-1] and value[0] in "'\""):
+        return f'"{value}"'
+    return value
+
+
+def format_env_file(environ: Dict[str, str]) -> str:
+    """The content of a .env file (loadable by decouple / EnvFile)."""
+    lines = []
+    for key, value in environ.items():
+        if "\n" in value or "\r" in value:
+            raise ValueError(f"{key} has a multi-line value, which can't be written to a .env file")
+        lines.append(f"{key}={_quote_env_value(value)}")
+    return "\n".join(lines) + "\n" if lines else ""
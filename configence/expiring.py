@@ -0,0 +1,220 @@
+"""Expiring config values, refreshed in the background (see
+Configence.expiring).
+
+An expiring entry reads a raw value from the sources (e.g. a credential
+reference), and its value is fetched from it (e.g. a short-lived token).
+The fetched value is shared by all the instances reading the same raw value
+with the same fetch function - a Refresher - and a single background
+thread re-fetches it ahead of its expiry, then sets the new value on the
+subscribed instances. Reads are plain attribute reads of the current value
+(stale-while-revalidate): a failed refresh keeps the last good value, and is
+retried.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import weakref
+from time import monotonic
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from decouple import undefined
+
+logger = logging.getLogger(__name__)
+
+
+class Expiry:
+    """How an expiring entry's value is fetched and refreshed.
+
+    Args:
+        fetch (Callable): fetches the value from the raw value.
+        ttl (float): seconds a fetched value is valid for.
+        refresh_ahead (float, optional): seconds before the expiry to refresh the value. Defaults to a fifth of the ttl.
+        retry (float, optional): seconds to wait before retrying a failed refresh. Defaults to a tenth of the ttl.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Any], Any],
+        ttl: float,
+        refresh_ahead: Optional[float] = None,
+        retry: Optional[float] = None,
+    ) -> None:
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.fetch = fetch
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead if refresh_ahead is not None else ttl / 5
+        self.retry = retry if retry is not None else ttl / 10
+
+    def __repr__(self) -> str:
+        return f"Expiry({getattr(self.fetch, '__name__', self.fetch)!r}, ttl={self.ttl})"
+
+
+class Refresher:
+    """The current value of an expiring raw value - shared by the instances
+    reading it."""
+
+    def __init__(self, expiry: Expiry, raw) -> None:
+        self.expiry = expiry
+        self.raw = raw
+        self.value = undefined
+        self.expires_at = 0.0
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error: Optional[BaseException] = None
+        # (weak reference to the instance, entry name)
+        self._subscribers: List[Tuple[weakref.ref, str]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def expired(self) -> bool:
+        return monotonic() >= self.expires_at
+
+    def refresh(self) -> bool:
+        """Fetch the value again (keeping the last good value on failure),
+        and set it on the subscribed instances."""
+        with self._lock:
+            try:
+                value = self.expiry.fetch(self.raw)
+            except Exception as err:
+                self.failures += 1
+                self.last_error = err
+                logger.warning("refreshing an expiring config value failed: %r", err)
+                return False
+            old_value, self.value = self.value, value
+            self.expires_at = monotonic() + self.expiry.ttl
+            self.refreshes += 1
+            self.last_error = None
+            subscribers = list(self._subscribers)
+        for instance_ref, name in subscribers:
+            instance = instance_ref()
+            # values set since (e.g. from the CLI) are kept
+            if instance is not None and instance._entries[name].value is old_value:
+                with instance._record_changes("refresh"):
+                    setattr(instance, name, value)
+        return True
+
+    def subscribe(self, instance, name: str):
+        with self._lock:
+            self._subscribers = [
+                (instance_ref, subscribed_name)
+                for instance_ref, subscribed_name in self._subscribers
+                if instance_ref() is not None
+            ]
+            self._subscribers.append((weakref.ref(instance), name))
+
+    def unsubscribe(self, instance, name: str):
+        with self._lock:
+            self._subscribers = [
+                (instance_ref, subscribed_name)
+                for instance_ref, subscribed_name in self._subscribers
+                if instance_ref() is not None
+                and (instance_ref() is not instance or subscribed_name != name)
+            ]
+
+    @property
+    def alive(self) -> bool:
+        """Whether any subscribed instance still exists."""
+        return any(instance_ref() is not None for instance_ref, _ in self._subscribers)
+
+    def next_refresh(self, refreshed: bool) -> float:
+        if not refreshed:
+            return monotonic() + self.expiry.retry
+        return max(self.expires_at - self.expiry.refresh_ahead, monotonic())
+
+
+class RefreshScheduler:
+    """The refreshers by (fetch function, raw value), and the background
+    thread refreshing them."""
+
+    def __init__(self) -> None:
+        self._refreshers: Dict[Tuple[Callable, Any], Refresher] = {}
+        # (due time, sequence, refresher)
+        self._queue: List[Tuple[float, int, Refresher]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _key(expiry: Expiry, raw) -> Tuple[Callable, Any]:
+        try:
+            hash(raw)
+        except TypeError:
+            raw = repr(raw)
+        return expiry.fetch, raw
+
+    def refresher(self, expiry: Expiry, raw) -> Refresher:
+        """The (shared) refresher of raw - fetching its first value now."""
+        key = self._key(expiry, raw)
+        with self._condition:
+            refresher = self._refreshers.get(key)
+            if refresher is None:
+                refresher = self._refreshers[key] = Refresher(expiry, raw)
+        if refresher.value is undefined:
+            with refresher._lock:
+                if refresher.value is undefined:
+                    # there's no last good value yet - so failures are raised
+                    refresher.value = expiry.fetch(raw)
+                    refresher.expires_at = monotonic() + expiry.ttl
+                    self._schedule(refresher, refresher.next_refresh(True))
+        return refresher
+
+    def _schedule(self, refresher: Refresher, due: float):
+        with self._condition:
+            heapq.heappush(self._queue, (due, next(self._sequence), refresher))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="configence-refresh", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def _next_due(self) -> Refresher:
+        with self._condition:
+            while True:
+                if not self._queue:
+                    self._condition.wait()
+                    continue
+                due, _, refresher = self._queue[0]
+                delay = due - monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._queue)
+                return refresher
+
+    def _run(self):
+        while True:
+            refresher = self._next_due()
+            key = self._key(refresher.expiry, refresher.raw)
+            if not refresher.alive:
+                # no instance reads it anymore
+                with self._condition:
+                    if self._refreshers.get(key) is refresher:
+                        del self._refreshers[key]
+                continue
+            refreshed = refresher.refresh()
+            with self._condition:
+                if self._refreshers.get(key) is not refresher:
+                    # dropped by clear()
+                    continue
+            self._schedule(refresher, refresher.next_refresh(refreshed))
+
+    def clear(self):
+        """Stop refreshing all the values."""
+        with self._condition:
+            self._refreshers.clear()
+            self._queue.clear()
+            self._condition.notify()
+
+    def __len__(self) -> int:
+        return len(self._refreshers)
+
+
+_scheduler = RefreshScheduler()
+
+
+def get_refresh_scheduler() -> RefreshScheduler:
+    return _scheduler
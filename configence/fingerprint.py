@@ -0,0 +1,65 @@
+"""Stable digests of configuration values.
+
+Each entry is digested separately (name + a stable serialization of its
+value), and the entry digests are combined by addition modulo 2**128 - which
+is order independent and invertible, so replacing a single value updates
+the combined digest in O(1) (subtract the old entry digest, add the new one).
+"""
+
+import hashlib
+import json
+from enum import Enum
+from typing import Any, Iterable
+
+from pydantic import BaseModel
+
+DIGEST_BITS = 128
+_MODULUS = 1 << DIGEST_BITS
+
+
+def _json_default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Enum):
+        return f"{type(value).__qualname__}.{value.name}"
+    if isinstance(value, (set, frozenset)):
+        return sorted(stable_repr(item) for item in value)
+    return repr(value)
+
+
+def stable_repr(value: Any) -> str:
+    """A serialization of value which is stable across processes (unlike
+    hash()) and across equal values."""
+    if isinstance(value, str):
+        return "s:" + value
+    if value is None or isinstance(value, (bool, int, float)):
+        return "r:" + repr(value)
+    if isinstance(value, BaseModel):
+        return f"m:{type(value).__qualname__}:" + value.model_dump_json()
+    if isinstance(value, Enum):
+        return "e:" + _json_default(value)
+    if isinstance(value, (list, tuple, dict)):
+        return "j:" + json.dumps(value, default=_json_default, sort_keys=True)
+    if isinstance(value, (set, frozenset)):
+        return "j:" + json.dumps(_json_default(value))
+    return "o:" + repr(value)
+
+
+def entry_digest(name: str, value: Any) -> int:
+    digest = hashlib.blake2b(digest_size=DIGEST_BITS // 8)
+    digest.update(name.encode())
+    digest.update(b"\0")
+    digest.update(stable_repr(value).encode())
+    return int.from_bytes(digest.digest(), "big")
+
+
+def combine(digests: Iterable[int]) -> int:
+    return sum(digests) % _MODULUS
+
+
+def replace_digest(combined: int, old: int, new: int) -> int:
+    return (combined - old + new) % _MODULUS
+
+
+def format_digest(combined: int) -> str:
+    return f"{combined:0{DIGEST_BITS // 4}x}"
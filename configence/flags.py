@@ -0,0 +1,189 @@
+"""Feature flags with precompiled rollout rules (see Configence.flag).
+
+A flag is defined by a raw value - "true" / "false", a percentage ("25%"),
+or a JSON object of rules:
+
+    {"percentage": 25, "by": "user_id", "allow": {"tenant": ["acme"]}, "deny": {"country": ["xx"]}}
+
+The rules are parsed and compiled once, when the config is loaded, into a
+single evaluator function specialized for the rules the flag uses:
+
+- deny / allow - per context attribute, a frozenset lookup of its value
+- percentage - a stable bucket (crc32 of the flag's salt and the context's
+  `by` attribute, out of 10000) - the same in every process, so a user stays
+  in (or out of) a rollout, and raising the percentage only adds users
+
+Denied contexts are disabled, then allowed contexts are enabled, then the
+percentage decides (contexts not allowed are disabled if there is an allow
+list and no percentage).
+"""
+
+import json
+import zlib
+from typing import Any, Callable, Dict, FrozenSet, Mapping, Optional, Tuple, Union
+
+from .sources import parse_json
+
+BUCKETS = 10000
+RULE_KEYS = {"enabled", "percentage", "by", "allow", "deny", "salt"}
+_TRUE = {"true", "on", "yes", "1"}
+_FALSE = {"false", "off", "no", "0"}
+
+Context = Union[Mapping[str, Any], str, int, None]
+# (attribute, values)
+AttributeRules = Tuple[Tuple[str, FrozenSet], ...]
+
+
+def _parse_definition(value) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"enabled": value}
+    if isinstance(value, (int, float)):
+        return {"percentage": value}
+    if isinstance(value, str):
+        text = value.strip()
+        lowered = text.lower()
+        if lowered in _TRUE:
+            return {"enabled": True}
+        if lowered in _FALSE:
+            return {"enabled": False}
+        if text.endswith("%"):
+            try:
+                return {"percentage": float(text[:-1])}
+            except ValueError:
+                raise ValueError(f"invalid flag percentage: {value!r}") from None
+        if text.startswith("{"):
+            value = parse_json(text)
+    if not isinstance(value, dict):
+        raise ValueError(f"invalid flag definition: {value!r}")
+    return dict(value)
+
+
+def parse_rules(value) -> Dict[str, Any]:
+    """The rules of a flag definition (a bool, a percentage, a JSON object
+    string or a dict)."""
+    rules = _parse_definition(value)
+    unknown = set(rules).difference(RULE_KEYS)
+    if unknown:
+        raise ValueError(f"unknown flag rules: {', '.join(sorted(unknown))}")
+    percentage = rules.get("percentage")
+    if percentage is not None and not 0 <= percentage <= 100:
+        raise ValueError(f"flag percentage must be between 0 and 100, got {percentage}")
+    return rules
+
+
+def _attribute_rules(rules: Optional[Dict[str, Any]]) -> AttributeRules:
+    if not rules:
+        return ()
+    compiled = []
+    for attribute, values in rules.items():
+        if isinstance(values, (str, int)):
+            values = [values]
+        # numeric ids match as ints and as strings
+        matched = set(values)
+        matched.update(str(item) for item in values)
+        matched.update(int(item) for item in values if isinstance(item, str) and item.isdigit())
+        compiled.append((attribute, frozenset(matched)))
+    return tuple(compiled)
+
+
+def _compile(
+    enabled: bool,
+    percentage: Optional[float],
+    by: str,
+    allow: AttributeRules,
+    deny: AttributeRules,
+    salt: str,
+) -> Callable[[Context], bool]:
+    """The evaluator of the rules - specialized for the rules in use."""
+    if not enabled:
+        return lambda context=None: False
+    if percentage is None and not allow and not deny:
+        return lambda context=None: True
+
+    threshold = round(percentage * BUCKETS / 100) if percentage is not None else None
+    salt_crc = zlib.crc32(f"{salt}:".encode())
+    crc32 = zlib.crc32
+    # with an allow list (and no percentage) other contexts are disabled
+    otherwise = threshold is None and not allow
+
+    def evaluate(context=None) -> bool:
+        if context.__class__ is dict or isinstance(context, Mapping):
+            get = context.get
+            for attribute, values in deny:
+                if get(attribute) in values:
+                    return False
+            for attribute, values in allow:
+                if get(attribute) in values:
+                    return True
+            if threshold is None:
+                return otherwise
+            context = get(by)
+        if context is None or threshold is None:
+            return False
+        if context.__class__ is not str:
+            context = str(context)
+        return crc32(context.encode(), salt_crc) % BUCKETS < threshold
+
+    return evaluate
+
+
+class FeatureFlag:
+    """A feature flag - see enabled()."""
+
+    def __init__(self, definition, salt: str = "") -> None:
+        rules = parse_rules(definition)
+        self.rules = rules
+        self.salt = str(rules.get("salt", salt))
+        self.percentage: Optional[float] = rules.get("percentage")
+        self.by: str = rules.get("by", "id")
+        self.allow = _attribute_rules(rules.get("allow"))
+        self.deny = _attribute_rules(rules.get("deny"))
+        # enabled(context) -> bool (the compiled evaluator, called directly)
+        self.enabled: Callable[[Context], bool] = _compile(
+            bool(rules.get("enabled", True)),
+            self.percentage,
+            self.by,
+            self.allow,
+            self.deny,
+            self.salt,
+        )
+
+    def bucket(self, key) -> int:
+        """The stable bucket (0 - 9999) of a context key."""
+        return zlib.crc32(str(key).encode(), zlib.crc32(f"{self.salt}:".encode())) % BUCKETS
+
+    @property
+    def definition(self) -> str:
+        """The flag's definition (parsed back into an equal flag)."""
+        if set(self.rules) == {"enabled"}:
+            return "true" if self.rules["enabled"] else "false"
+        return json.dumps(self.rules, sort_keys=True, separators=(",", ":"))
+
+    def __bool__(self) -> bool:
+        return self.enabled(None)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, FeatureFlag):
+            return NotImplemented
+        return self.rules == other.rules and self.salt == other.salt
+
+    def __hash__(self) -> int:
+        return hash((FeatureFlag, self.definition, self.salt))
+
+    def __str__(self) -> str:
+        return self.definition
+
+    def __repr__(self) -> str:
+        return f"FeatureFlag({self.definition!r})"
+
+
+def cast_flag(salt: str = ""):
+    """Cast a flag definition into a FeatureFlag (bucketing contexts by
+    salt - the flag's key by default)."""
+
+    def cast_flag_definition(value):
+        if isinstance(value, FeatureFlag):
+            return value
+        return FeatureFlag(value, salt)
+
+    return cast_flag_definition
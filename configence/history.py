@@ -0,0 +1,301 @@
+"""Versioned history of config values (see Configence.rollback).
+
+Each generation holds all the values of an instance in a persistent map - a
+hash array mapped trie whose updates copy only the path to the changed key,
+and share every other node with the previous generation. Values themselves
+are shared by reference, so keeping N generations costs memory
+proportional to the changes between them, not N copies of the values.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_MASK = (1 << 64) - 1
+
+
+def _hash(key) -> int:
+    return hash(key) & _HASH_MASK
+
+
+class _Leaf:
+    __slots__ = ("hash", "key", "value")
+
+    def __init__(self, hash: int, key, value) -> None:
+        self.hash = hash
+        self.key = key
+        self.value = value
+
+    def items(self):
+        yield self.key, self.value
+
+
+class _Collision:
+    """Keys with identical hashes."""
+
+    __slots__ = ("hash", "pairs")
+
+    def __init__(self, hash: int, pairs: Tuple[Tuple[Any, Any], ...]) -> None:
+        self.hash = hash
+        self.pairs = pairs
+
+    def items(self):
+        yield from self.pairs
+
+
+class _Node:
+    __slots__ = ("bitmap", "children")
+
+    def __init__(self, bitmap: int, children: tuple) -> None:
+        self.bitmap = bitmap
+        self.children = children
+
+    def items(self):
+        for child in self.children:
+            yield from child.items()
+
+
+_EMPTY = _Node(0, ())
+
+
+def _merge(a, b, shift: int) -> _Node:
+    """A node holding two leaves / collisions with different hashes."""
+    index_a = (a.hash >> shift) & _MASK
+    index_b = (b.hash >> shift) & _MASK
+    if index_a == index_b:
+        return _Node(1 << index_a, (_merge(a, b, shift + _BITS),))
+    children = (a, b) if index_a < index_b else (b, a)
+    return _Node((1 << index_a) | (1 << index_b), children)
+
+
+def _assoc(node: _Node, shift: int, hash: int, key, value) -> Tuple[_Node, bool]:
+    """(the updated copy of node, whether the key was added)."""
+    bit = 1 << ((hash >> shift) & _MASK)
+    index = bin(node.bitmap & (bit - 1)).count("1")
+    children = node.children
+    if not node.bitmap & bit:
+        children = children[:index] + (_Leaf(hash, key, value),) + children[index:]
+        return _Node(node.bitmap | bit, children), True
+    child = children[index]
+    added = False
+    if isinstance(child, _Node):
+        new_child, added = _assoc(child, shift + _BITS, hash, key, value)
+        if new_child is child:
+            return node, False
+    elif isinstance(child, _Leaf):
+        if child.hash == hash and child.key == key:
+            if child.value is value:
+                return node, False
+            new_child = _Leaf(hash, key, value)
+        elif child.hash == hash:
+            new_child, added = _Collision(hash, ((child.key, child.value), (key, value))), True
+        else:
+            new_child, added = _merge(child, _Leaf(hash, key, value), shift + _BITS), True
+    elif child.hash == hash:
+        pairs = tuple(pair for pair in child.pairs if pair[0] != key)
+        added = len(pairs) == len(child.pairs)
+        new_child = _Collision(hash, pairs + ((key, value),))
+    else:
+        new_child, added = _merge(child, _Leaf(hash, key, value), shift + _BITS), True
+    return _Node(node.bitmap, children[:index] + (new_child,) + children[index + 1:]), added
+
+
+def _diff(a, b, shift: int, changes: Dict[Any, Tuple[Any, Any]], missing):
+    # nodes shared between the two maps hold the same values
+    if a is b:
+        return
+    if isinstance(a, _Node) and isinstance(b, _Node):
+        for index in range(1 << _BITS):
+            bit = 1 << index
+            in_a, in_b = a.bitmap & bit, b.bitmap & bit
+            child_a = a.children[bin(a.bitmap & (bit - 1)).count("1")] if in_a else _EMPTY
+            child_b = b.children[bin(b.bitmap & (bit - 1)).count("1")] if in_b else _EMPTY
+            if in_a or in_b:
+                _diff(child_a, child_b, shift + _BITS, changes, missing)
+        return
+    items_a, items_b = dict(a.items()), dict(b.items())
+    for key in items_a.keys() | items_b.keys():
+        old, new = items_a.get(key, missing), items_b.get(key, missing)
+        if old is not new and old != new:
+            changes[key] = (old, new)
+
+
+class PersistentMap:
+    """An immutable mapping - set() returns an updated copy, sharing all the
+    unchanged parts with this one."""
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, items: Iterable[Tuple[Any, Any]] = ()) -> None:
+        root, size = _EMPTY, 0
+        for key, value in items:
+            root, added = _assoc(root, 0, _hash(key), key, value)
+            size += added
+        self._root = root
+        self._size = size
+
+    @classmethod
+    def _create(cls, root: _Node, size: int) -> "PersistentMap":
+        result = object.__new__(cls)
+        result._root = root
+        result._size = size
+        return result
+
+    def set(self, key, value) -> "PersistentMap":
+        root, added = _assoc(self._root, 0, _hash(key), key, value)
+        if root is self._root:
+            return self
+        return self._create(root, self._size + added)
+
+    def update(self, items: Iterable[Tuple[Any, Any]]) -> "PersistentMap":
+        result = self
+        for key, value in items:
+            result = result.set(key, value)
+        return result
+
+    def get(self, key, default=None):
+        hash = _hash(key)
+        node, shift = self._root, 0
+        while True:
+            if isinstance(node, _Node):
+                bit = 1 << ((hash >> shift) & _MASK)
+                if not node.bitmap & bit:
+                    return default
+                node = node.children[bin(node.bitmap & (bit - 1)).count("1")]
+                shift += _BITS
+            elif isinstance(node, _Leaf):
+                return node.value if node.hash == hash and node.key == key else default
+            else:
+                for pair_key, value in node.pairs:
+                    if pair_key == key:
+                        return value
+                return default
+
+    def __getitem__(self, key):
+        value = self.get(key, _EMPTY)
+        if value is _EMPTY:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _EMPTY) is not _EMPTY
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator:
+        for key, _ in self._root.items():
+            yield key
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        return self._root.items()
+
+    def diff(self, other: "PersistentMap", missing=None) -> Dict[Any, Tuple[Any, Any]]:
+        """The changes from this map to other - {key: (value here, value in
+        other)}, with `missing` standing for absent keys. Only the parts not
+        shared by both maps are compared."""
+        changes = {}
+        _diff(self._root, other._root, 0, changes, missing)
+        return changes
+
+    def __repr__(self) -> str:
+        return "PersistentMap({})".format(dict(self.items()))
+
+
+class Generation(NamedTuple):
+    """The values of an instance after a change."""
+
+    number: int
+    values: PersistentMap
+    # {name: (old value, new value)} compared to the previous generation
+    changes: Dict[str, Tuple[Any, Any]]
+    # what made the change - "load", "set", "cli", "replace"
+    reason: str
+
+
+class History:
+    """Bounded history of value generations (the oldest are dropped)."""
+
+    def __init__(self, maxsize: int, values: PersistentMap, reason: str = "load") -> None:
+        if maxsize < 1:
+            raise ValueError("history size must be at least 1")
+        self._generations = deque([Generation(0, values, {}, reason)], maxlen=maxsize)
+        # changes accumulated by an open batch (see batch)
+        self._pending: Optional[Dict[str, Tuple[Any, Any]]] = None
+
+    @property
+    def maxsize(self) -> int:
+        return self._generations.maxlen
+
+    @property
+    def current(self) -> Generation:
+        return self._generations[-1]
+
+    def __len__(self) -> int:
+        return len(self._generations)
+
+    def __iter__(self) -> Iterator[Generation]:
+        return iter(self._generations)
+
+    def __getitem__(self, index: int) -> Generation:
+        return self._generations[index]
+
+    def copy(self) -> "History":
+        """A copy of this history (sharing all the generations)."""
+        result = object.__new__(History)
+        result._generations = deque(self._generations, maxlen=self.maxsize)
+        result._pending = None
+        return result
+
+    def record(self, name: str, old, new, reason: str = "set"):
+        if self._pending is not None:
+            if name in self._pending:
+                old = self._pending[name][0]
+            self._pending[name] = (old, new)
+        else:
+            self._commit({name: (old, new)}, reason)
+
+    @contextmanager
+    def batch(self, reason: str):
+        """Record all the changes made inside the block as one generation."""
+        if self._pending is not None:
+            # nested - part of the outer batch
+            yield
+            return
+        self._pending = {}
+        try:
+            yield
+        finally:
+            changes, self._pending = self._pending, None
+            self._commit(changes, reason)
+
+    def _commit(self, changes: Dict[str, Tuple[Any, Any]], reason: str):
+        changes = {
+            name: (old, new) for name, (old, new) in changes.items() if old is not new
+        }
+        if not changes:
+            return
+        current = self.current
+        values = current.values.update((name, new) for name, (_, new) in changes.items())
+        self._generations.append(Generation(current.number + 1, values, changes, reason))
+
+    def diff(self, start: int = -2, end: int = -1) -> Dict[str, Tuple[Any, Any]]:
+        """The changes between two generations (by index - by default, the
+        previous and the current)."""
+        return self._generations[start].values.diff(self._generations[end].values)
+
+    def rollback(self, n: int = 1) -> Tuple[Generation, Generation]:
+        """Drop the last n generations - (the dropped current generation,
+        the new current one)."""
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        if n >= len(self._generations):
+            raise IndexError(
+                f"can't roll back {n} generations, only {len(self._generations) - 1} kept"
+            )
+        latest = self.current
+        for _ in range(n):
+            self._generations.pop()
+        return latest, self.current
@@ -0,0 +1,133 @@
+"""${KEY} interpolation of raw config values.
+
+References are resolved (recursively) to the raw values of other keys, each
+key is resolved at most once per load (memoized), and resolution is
+iterative - so even chains of thousands of references are resolved in
+linear time without hitting the recursion limit.
+
+"$${" escapes a literal "${". References to keys which can't be found are
+left as is (like missing keys in ConfigenceDelay strings).
+"""
+
+import re
+from typing import Callable, Dict, List, Tuple, Union
+
+REFERENCE = re.compile(r"\$(\$?)\{([^{}]+)\}")
+
+# a parsed template: literal strings and reference names (as 1-tuples)
+Template = List[Union[str, Tuple[str]]]
+
+
+class InterpolationError(ValueError):
+    pass
+
+
+class CircularReferenceError(InterpolationError):
+    pass
+
+
+def parse_template(text: str) -> Template:
+    pieces: Template = []
+    position = 0
+    for match in REFERENCE.finditer(text):
+        pieces.append(text[position : match.start()])
+        escaped, name = match.groups()
+        if escaped:
+            pieces.append("${" + name + "}")
+        else:
+            pieces.append((name.strip(),))
+        position = match.end()
+    pieces.append(text[position:])
+    return pieces
+
+
+def has_references(text: str) -> bool:
+    return "${" in text
+
+
+class Interpolator:
+    """Resolves ${KEY} references with a memoized dependency graph.
+
+    Args:
+        lookup (Callable): returns the raw (not yet interpolated) value of a
+            referenced key, or raises KeyError if there is no such key.
+    """
+
+    def __init__(self, lookup: Callable[[str], str]) -> None:
+        self._lookup = lookup
+        # resolved (fully interpolated) values by key; None if the key is missing
+        self._resolved: Dict[str, Union[str, None]] = {}
+        self._templates: Dict[str, Template] = {}
+
+    def _template(self, name: str) -> Union[Template, None]:
+        try:
+            return self._templates[name]
+        except KeyError:
+            pass
+        try:
+            raw = self._lookup(name)
+        except KeyError:
+            template = None
+        else:
+            raw = raw if isinstance(raw, str) else str(raw)
+            template = parse_template(raw) if has_references(raw) else [raw]
+        self._templates[name] = template
+        return template
+
+    def _render(self, template: Template) -> str:
+        parts = []
+        for piece in template:
+            if isinstance(piece, tuple):
+                resolved = self._resolved[piece[0]]
+                parts.append("${" + piece[0] + "}" if resolved is None else resolved)
+            else:
+                parts.append(piece)
+        return "".join(parts)
+
+    def resolve(self, name: str) -> Union[str, None]:
+        """The fully interpolated value of key name (None if missing)."""
+        if name in self._resolved:
+            return self._resolved[name]
+        # iterative depth-first resolution: [key, index of the next template
+        # piece to check] per frame; `visiting` holds the keys on the path
+        stack = [[name, 0]]
+        visiting = {name}
+        while stack:
+            frame = stack[-1]
+            current, position = frame
+            template = self._template(current) or ()
+            pending = None
+            while position < len(template):
+                piece = template[position]
+                if isinstance(piece, tuple) and piece[0] not in self._resolved:
+                    pending = piece[0]
+                    break
+                position += 1
+            frame[1] = position
+            if pending is None:
+                self._resolved[current] = (
+                    None if self._templates[current] is None else self._render(template)
+                )
+                stack.pop()
+                visiting.discard(current)
+            elif pending in visiting:
+                path = [key for key, _ in stack]
+                cycle = path[path.index(pending) :] + [pending]
+                raise CircularReferenceError(
+                    "Circular reference in config values: {}".format(" -> ".join(cycle))
+                )
+            else:
+                stack.append([pending, 0])
+                visiting.add(pending)
+        return self._resolved[name]
+
+    def interpolate(self, text: str) -> str:
+        """Replace all the ${KEY} references in text."""
+        if not has_references(text):
+            return text
+        template = parse_template(text)
+        for piece in template:
+            if isinstance(piece, tuple):
+                self.resolve(piece[0])
+        return self._render(template)
+
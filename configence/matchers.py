@@ -0,0 +1,215 @@
+"""Precompiled matchers for pattern-like configuration values.
+
+Routing regexes, trusted CIDR ranges and path globs are compiled once when
+the configuration is loaded (instead of by every caller on every use), and
+many patterns are combined into a single matcher:
+
+- RegexMatcher - all patterns are joined into one alternation
+- GlobMatcher - all globs are translated to regexes and joined into one alternation
+- CidrMatcher - all networks are collapsed into sorted, non-overlapping ranges
+  which are searched with bisect (O(log n) per lookup)
+"""
+
+import fnmatch
+import ipaddress
+import re
+import string
+from bisect import bisect_right
+from typing import Iterable, List, Union
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+
+def _split(value: str, delimiter: str, strip=string.whitespace) -> List[str]:
+    # a plain split (and not decouple's shlex based Csv) - so backslashes in
+    # regexes and globs are kept as is
+    items = (item.strip(strip) for item in value.split(delimiter))
+    return [item for item in items if item]
+
+
+# leading global inline flags, e.g. "(?i)"
+_GLOBAL_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)")
+
+
+def _scoped(pattern: str) -> str:
+    # global flags are only allowed at the start of the combined regex - so
+    # each pattern's own flags are scoped to its group (e.g. "(?i:abc)")
+    flags = _GLOBAL_FLAGS.match(pattern)
+    if flags:
+        return f"(?{flags.group(1)}:{pattern[flags.end():]})"
+    return f"(?:{pattern})"
+
+
+def _combine(patterns: Iterable[str]) -> str:
+    patterns = list(patterns)
+    if len(patterns) == 1:
+        return patterns[0]
+    return "|".join(_scoped(pattern) for pattern in patterns)
+
+
+class RegexMatcher:
+    """A set of regular expressions compiled into a single alternation.
+
+    Note: numbered groups of the individual patterns are shifted in the
+    combined regex; use named groups (with unique names) if you need to
+    extract matched parts.
+    """
+
+    def __init__(self, patterns: Iterable[str], flags: int = 0) -> None:
+        self.patterns = tuple(patterns)
+        self.flags = flags
+        # an empty set of patterns never matches
+        self.regex = re.compile(_combine(self.patterns) if self.patterns else r"(?!)", flags)
+
+    def search(self, text: str):
+        return self.regex.search(text)
+
+    def match(self, text: str):
+        return self.regex.match(text)
+
+    def fullmatch(self, text: str):
+        return self.regex.fullmatch(text)
+
+    def __contains__(self, text: str) -> bool:
+        return self.regex.search(text) is not None
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RegexMatcher):
+            return NotImplemented
+        return self.patterns == other.patterns and self.flags == other.flags
+
+    def __hash__(self) -> int:
+        return hash((RegexMatcher, self.patterns, self.flags))
+
+    def __str__(self) -> str:
+        return ",".join(self.patterns)
+
+    def __repr__(self) -> str:
+        return f"RegexMatcher({list(self.patterns)!r})"
+
+
+class GlobMatcher:
+    """A set of shell-style globs (see fnmatch) compiled into a single
+    regex."""
+
+    def __init__(self, patterns: Iterable[str], case_sensitive: bool = True) -> None:
+        self.patterns = tuple(patterns)
+        self.case_sensitive = case_sensitive
+        flags = 0 if case_sensitive else re.IGNORECASE
+        translated = (fnmatch.translate(pattern) for pattern in self.patterns)
+        self.regex = re.compile(_combine(translated) if self.patterns else r"(?!)", flags)
+
+    def match(self, path: str) -> bool:
+        return self.regex.match(path) is not None
+
+    def __contains__(self, path: str) -> bool:
+        return self.match(path)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, GlobMatcher):
+            return NotImplemented
+        return (
+            self.patterns == other.patterns
+            and self.case_sensitive == other.case_sensitive
+        )
+
+    def __hash__(self) -> int:
+        return hash((GlobMatcher, self.patterns, self.case_sensitive))
+
+    def __str__(self) -> str:
+        return ",".join(self.patterns)
+
+    def __repr__(self) -> str:
+        return f"GlobMatcher({list(self.patterns)!r})"
+
+
+class CidrMatcher:
+    """A set of IPv4 / IPv6 networks, collapsed into sorted non-overlapping
+    address ranges for O(log n) membership checks."""
+
+    def __init__(self, networks: Iterable[Union[str, IPNetwork]]) -> None:
+        self.networks = tuple(ipaddress.ip_network(net, strict=False) for net in networks)
+        # per ip-version: sorted range starts and matching range ends
+        self._ranges = {}
+        for version in (4, 6):
+            collapsed = ipaddress.collapse_addresses(
+                net for net in self.networks if net.version == version
+            )
+            bounds = [
+                (int(net.network_address), int(net.broadcast_address))
+                for net in collapsed
+            ]
+            self._ranges[version] = (
+                [start for start, _ in bounds],
+                [end for _, end in bounds],
+            )
+
+    def match(self, address: Union[str, IPAddress]) -> bool:
+        try:
+            address = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        starts, ends = self._ranges[address.version]
+        value = int(address)
+        index = bisect_right(starts, value) - 1
+        return index >= 0 and value <= ends[index]
+
+    def __contains__(self, address) -> bool:
+        return self.match(address)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CidrMatcher):
+            return NotImplemented
+        return self.networks == other.networks
+
+    def __hash__(self) -> int:
+        return hash((CidrMatcher, self.networks))
+
+    def __str__(self) -> str:
+        return ",".join(str(net) for net in self.networks)
+
+    def __repr__(self) -> str:
+        return f"CidrMatcher({[str(net) for net in self.networks]!r})"
+
+
+def cast_regex(flags: int = 0, delimiter: str = None):
+    """Cast a pattern (or a `delimiter` separated list of patterns, or a list
+    of patterns) into a RegexMatcher."""
+
+    def cast_regex_patterns(value):
+        if isinstance(value, RegexMatcher):
+            return value
+        if isinstance(value, str):
+            patterns = [value] if delimiter is None else _split(value, delimiter)
+        else:
+            patterns = list(value)
+        return RegexMatcher(patterns, flags)
+
+    return cast_regex_patterns
+
+
+def cast_globs(delimiter: str = ",", case_sensitive: bool = True):
+    """Cast a `delimiter` separated list of globs (or a list of globs) into a
+    GlobMatcher."""
+
+    def cast_glob_patterns(value):
+        if isinstance(value, GlobMatcher):
+            return value
+        patterns = _split(value, delimiter) if isinstance(value, str) else list(value)
+        return GlobMatcher(patterns, case_sensitive)
+
+    return cast_glob_patterns
+
+
+def cast_cidrs(delimiter: str = ","):
+    """Cast a `delimiter` separated list of networks (or a list of networks)
+    into a CidrMatcher."""
+
+    def cast_cidr_networks(value):
+        if isinstance(value, CidrMatcher):
+            return value
+        networks = _split(value, delimiter) if isinstance(value, str) else list(value)
+        return CidrMatcher(networks)
+
+    return cast_cidr_networks
@@ -0,0 +1,235 @@
+"""Memory usage of config values (see Configence.memory_report).
+
+Each entry's value is measured by its deep size - the sys.getsizeof() of
+every object reachable from it (classes, modules and functions excluded).
+Objects reachable from several entries are counted once in the total, and
+reported as shared (not in the entries' exclusive sizes).
+
+Allocations can also be traced (with tracemalloc) while instances are
+loaded (see trace_allocations), attributing the memory allocated - and still
+held - by reading and casting each entry, and the peak while doing so.
+"""
+
+import sys
+import threading
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+_SKIPPED_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+
+def _slot_names(cls) -> List[str]:
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        names.extend(slot for slot in slots if slot not in ("__dict__", "__weakref__"))
+    return names
+
+
+def reachable_sizes(value) -> Dict[int, int]:
+    """The size of every object reachable from value (by id)."""
+    sizes: Dict[int, int] = {}
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in sizes or isinstance(obj, _SKIPPED_TYPES):
+            continue
+        sizes[id(obj)] = sys.getsizeof(obj)
+        if isinstance(obj, _ATOMIC_TYPES):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+            continue
+        if isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+            continue
+        attributes = getattr(obj, "__dict__", None)
+        if isinstance(attributes, dict):
+            stack.append(attributes)
+        for slot in _slot_names(type(obj)):
+            try:
+                stack.append(getattr(obj, slot))
+            except AttributeError:
+                pass
+    return sizes
+
+
+def deep_sizeof(value) -> int:
+    """The size of value and of all the objects reachable from it."""
+    return sum(reachable_sizes(value).values())
+
+
+class EntryMemory(NamedTuple):
+    name: str
+    key: str
+    type: str
+    # deep size of the value
+    size: int
+    # bytes not shared with other entries
+    exclusive: int
+    # bytes allocated (and still held) / peak while loading the entry - when traced
+    allocated: Optional[int] = None
+    peak: Optional[int] = None
+
+
+def format_size(size: Optional[int]) -> str:
+    if size is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024 or unit == "MiB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class MemoryReport:
+    """Memory usage of an instance's entries (largest first)."""
+
+    def __init__(self, entries: List[EntryMemory], total: int) -> None:
+        self.entries = sorted(entries, key=lambda entry: entry.size, reverse=True)
+        # bytes of all the values (shared objects counted once)
+        self.total = total
+
+    @property
+    def traced(self) -> bool:
+        return any(entry.allocated is not None for entry in self.entries)
+
+    def by_type(self) -> Dict[str, int]:
+        """Bytes allocated while loading entries, by the entries' types /
+        casts (when traced) - or their sizes otherwise."""
+        totals: Dict[str, int] = {}
+        for entry in self.entries:
+            amount = entry.allocated if self.traced else entry.size
+            totals[entry.type] = totals.get(entry.type, 0) + (amount or 0)
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"total": self.total, "entries": [entry._asdict() for entry in self.entries]}
+
+    def format_table(self) -> str:
+        headers = ["entry", "type", "size", "exclusive"]
+        if self.traced:
+            headers += ["allocated", "peak"]
+        rows = []
+        for entry in self.entries:
+            row = [entry.name, entry.type, format_size(entry.size), format_size(entry.exclusive)]
+            if self.traced:
+                row += [format_size(entry.allocated), format_size(entry.peak)]
+            rows.append(row)
+        rows.append(["total", "", format_size(self.total), ""] + (["", ""] if self.traced else []))
+        widths = [max(len(row[index]) for row in [headers] + rows) for index in range(len(headers))]
+        lines = []
+        for row in [headers] + rows:
+            cells = [
+                cell.ljust(width) if index < 2 else cell.rjust(width)
+                for index, (cell, width) in enumerate(zip(row, widths))
+            ]
+            lines.append("  ".join(cells).rstrip())
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.format_table()
+
+
+def type_name(entry) -> str:
+    value_type = entry.type
+    if isinstance(value_type, type) and value_type is not object:
+        return value_type.__name__
+    cast = entry.cast
+    return getattr(cast, "__name__", None) or type(cast).__name__
+
+
+def memory_report(entries: Dict[str, Any], allocations: Optional[Dict[str, Tuple[int, int]]] = None) -> MemoryReport:
+    """The memory report of entries (by name) - with the allocations traced
+    while loading them, if given."""
+    reachable = {name: reachable_sizes(entry.value) for name, entry in entries.items()}
+    owners: Dict[int, int] = {}
+    for sizes in reachable.values():
+        for object_id in sizes:
+            owners[object_id] = owners.get(object_id, 0) + 1
+    total_sizes: Dict[int, int] = {}
+    rows = []
+    for name, entry in entries.items():
+        sizes = reachable[name]
+        total_sizes.update(sizes)
+        allocated, peak = (allocations or {}).get(name, (None, None))
+        rows.append(
+            EntryMemory(
+                name=name,
+                key=entry.key,
+                type=type_name(entry),
+                size=sum(sizes.values()),
+                exclusive=sum(size for object_id, size in sizes.items() if owners[object_id] == 1),
+                allocated=allocated,
+                peak=peak,
+            )
+        )
+    return MemoryReport(rows, sum(total_sizes.values()))
+
+
+class AllocationTrace:
+    """Allocations while loading each entry (see trace_allocations)."""
+
+    def __init__(self) -> None:
+        # name: (allocated, peak)
+        self.allocations: Dict[str, Tuple[int, int]] = {}
+        self._before = 0
+        # only the loading thread's instances are traced
+        self.thread_id = threading.get_ident()
+
+    def start(self):
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._before = tracemalloc.get_traced_memory()[0]
+
+    def stop(self, name: str):
+        current, peak = tracemalloc.get_traced_memory()
+        self.allocations[name] = (current - self._before, max(peak - self._before, 0))
+
+    def begin(self) -> Dict[str, Tuple[int, int]]:
+        """Attribute the allocations to a new instance (returning those of
+        the instance being loaded, if any - see end)."""
+        outer, self.allocations = self.allocations, {}
+        return outer
+
+    def end(self, outer: Dict[str, Tuple[int, int]]) -> Dict[str, Tuple[int, int]]:
+        """The allocations of the instance loaded since begin()."""
+        allocations, self.allocations = self.allocations, outer
+        return allocations
+
+
+_trace: Optional[AllocationTrace] = None
+_trace_lock = threading.RLock()
+
+
+def get_allocation_trace() -> Optional[AllocationTrace]:
+    """The active trace (None unless the current thread is tracing)."""
+    trace = _trace
+    if trace is None or trace.thread_id != threading.get_ident():
+        return None
+    return trace
+
+
+@contextmanager
+def trace_allocations():
+    """Trace (with tracemalloc) the allocations of each entry of the
+    instances loaded by the current thread inside the block - reported by
+    their memory_report()."""
+    global _trace
+    with _trace_lock:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        outer, _trace = _trace, AllocationTrace()
+        try:
+            yield _trace
+        finally:
+            _trace = outer
+            if started:
+                tracemalloc.stop()
@@ -0,0 +1,242 @@
+"""Instrumentation of config loading (counters and histograms).
+
+Metrics are disabled by default - every hook first checks get_metrics(),
+which is None until enable_metrics() is called, so the disabled cost is a
+single global lookup.
+
+Collected metrics are handed to a pluggable exporter (any callable taking
+the collected metrics) - by default render_prometheus(), which renders the
+Prometheus text exposition format (e.g. to be served on /metrics).
+"""
+
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .cache import get_cast_cache, get_instance_cache
+
+# load / cast durations are mostly (sub) milliseconds
+DEFAULT_BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0,
+)
+
+
+class Metric:
+    """Base of all metric types - values by label values."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _labels(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._labels(labels)] = value
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """(sample name, labels, value) of all the label combinations."""
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            (self.name, dict(zip(self.labelnames, label_values)), value)
+            for label_values, value in values
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._labels(labels), 0)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        self._set(value, **labels)
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._labels(labels), 0)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [count per bucket..., sum]
+                state = self._values[key] = [0] * len(self.buckets) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-1] += value
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._labels(labels))
+        return sum(state[:-1]) if state is not None else 0
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = [(key, list(state)) for key, state in self._values.items()]
+        samples = []
+        for label_values, state in values:
+            labels = dict(zip(self.labelnames, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                samples.append((f"{self.name}_bucket", {**labels, "le": le}, cumulative))
+            samples.append((f"{self.name}_sum", labels, state[-1]))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class ConfigenceMetrics:
+    """The metrics collected from configence's hooks."""
+
+    def __init__(self, exporter: Callable[[Iterable[Metric]], object] = None) -> None:
+        self.exporter = exporter if exporter is not None else render_prometheus
+        self.instances_created = Counter(
+            "configence_instances_created_total", "Config instances created.", ["class"]
+        )
+        self.load_duration = Histogram(
+            "configence_load_duration_seconds", "Time to load a config instance.", ["class"]
+        )
+        self.cast_duration = Histogram(
+            "configence_cast_duration_seconds", "Time to read and cast a value.", ["type"]
+        )
+        self.validation_failures = Counter(
+            "configence_validation_failures_total",
+            "Values which failed to cast / validate.",
+            ["class", "key"],
+        )
+        self.cli_overrides = Counter(
+            "configence_cli_overrides_total", "Values overridden from the command line.", ["class"]
+        )
+        # read from the caches on collect()
+        self.reloads = Counter(
+            "configence_reloads_total",
+            "Cached instances loaded again after their inputs changed.",
+            ["class"],
+        )
+        self.cache_hits = Gauge("configence_cache_hits", "Cache hits.", ["cache"])
+        self.cache_misses = Gauge("configence_cache_misses", "Cache misses.", ["cache"])
+        self.cache_hit_ratio = Gauge("configence_cache_hit_ratio", "Cache hit ratio.", ["cache"])
+
+    def metrics(self) -> List[Metric]:
+        return [
+            self.instances_created,
+            self.load_duration,
+            self.cast_duration,
+            self.validation_failures,
+            self.cli_overrides,
+            self.reloads,
+            self.cache_hits,
+            self.cache_misses,
+            self.cache_hit_ratio,
+        ]
+
+    def collect(self) -> List[Metric]:
+        """All the metrics (with the current cache statistics)."""
+        caches = {"instance": get_instance_cache(), "cast": get_cast_cache()}
+        for name, cache in caches.items():
+            if cache is None:
+                continue
+            self.cache_hits.set(cache.hits, cache=name)
+            self.cache_misses.set(cache.misses, cache=name)
+            self.cache_hit_ratio.set(cache.hit_rate, cache=name)
+        self.reloads.clear()
+        for class_name, count in get_instance_cache().reloads.items():
+            self.reloads._set(count, **{"class": class_name})
+        return self.metrics()
+
+    def export(self):
+        """Hand the collected metrics to the exporter (returning its
+        result)."""
+        return self.exporter(self.collect())
+
+    def clear(self):
+        for metric in self.metrics():
+            metric.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(value)
+
+
+def render_prometheus(metrics: Iterable[Metric]) -> str:
+    """Render metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for name, labels, value in metric.samples():
+            if labels:
+                rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+                name = f"{name}{{{rendered}}}"
+            lines.append(f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+_metrics: Optional[ConfigenceMetrics] = None
+
+
+def enable_metrics(exporter: Callable[[Iterable[Metric]], object] = None) -> ConfigenceMetrics:
+    """Start collecting metrics (optionally with a custom exporter)."""
+    global _metrics
+    if _metrics is None:
+        _metrics = ConfigenceMetrics(exporter)
+    elif exporter is not None:
+        _metrics.exporter = exporter
+    return _metrics
+
+
+def disable_metrics():
+    global _metrics
+    _metrics = None
+
+
+def get_metrics() -> Optional[ConfigenceMetrics]:
+    return _metrics
+
+
+def export_metrics():
+    """Export the collected metrics (None if metrics are disabled)."""
+    return _metrics.export() if _metrics is not None else None
@@ -0,0 +1,134 @@
+"""Field-by-field env mapping of model() entries (see the nested_delimiter
+argument of Configence.model).
+
+With a nested delimiter of "__", the keys under an entry's key set single
+(nested) fields of its model:
+
+    APP__DB='{"host": "db", "pool": {"size": 5}}'   # the JSON base value (optional)
+    APP__DB__POOL__SIZE=20                          # overrides db.pool.size
+
+The keys are found by a single scan of the source's keys (shared by all the
+nested entries of an instance), and assembled on top of the base value (or
+the default) into one dict, validated by a single model_validate() call.
+Key parts are matched to field names (and aliases) case-insensitively;
+parts under non-model fields (e.g. dict keys) are used as is.
+"""
+
+import copy
+import typing
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from .sources import parse_json
+
+try:
+    from types import UnionType
+except ImportError:  # pragma: no cover - python < 3.10
+    UnionType = Union
+
+
+def scan_prefixes(keys: Iterable[str], prefixes: Iterable[str]) -> Dict[str, List[str]]:
+    """The keys starting with each of prefixes (in a single pass over
+    keys)."""
+    prefixes = tuple(prefixes)
+    found: Dict[str, List[str]] = {prefix: [] for prefix in prefixes}
+    for key in keys:
+        if key.startswith(prefixes):
+            for prefix in prefixes:
+                if key.startswith(prefix):
+                    found[prefix].append(key)
+    for matched in found.values():
+        # deeper keys last - so they override their parents
+        matched.sort()
+    return found
+
+
+def _model_of(annotation) -> Optional[type]:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    if typing.get_origin(annotation) in (Union, UnionType):
+        models = [model for model in map(_model_of, typing.get_args(annotation)) if model is not None]
+        if len(models) == 1:
+            return models[0]
+    return None
+
+
+@lru_cache(maxsize=None)
+def _fields(model) -> Dict[str, Tuple[str, Any]]:
+    """The fields of a model by upper cased name and alias: (name to set,
+    annotation)."""
+    # aliased fields are validated by their alias (their name is ignored, unless populate_by_name is set)
+    by_alias = model.model_config.get("validate_by_alias", True)
+    fields = {}
+    for name, field in model.model_fields.items():
+        key = field.alias if field.alias and by_alias else name
+        fields[name.upper()] = (key, field.annotation)
+        if field.alias:
+            fields[field.alias.upper()] = (key, field.annotation)
+    return fields
+
+
+def _accepts_str(annotation) -> bool:
+    if annotation is str:
+        return True
+    if typing.get_origin(annotation) in (Union, UnionType):
+        return str in typing.get_args(annotation)
+    return False
+
+
+def _resolve(model, part: str) -> Tuple[str, Any]:
+    if model is None:
+        return part, None
+    return _fields(model).get(part.upper(), (part.lower(), None))
+
+
+def _leaf_value(value, annotation):
+    # JSON lists / objects for non-str fields (e.g. APP__DB__HOSTS='["a", "b"]')
+    if isinstance(value, str) and not _accepts_str(annotation) and value.lstrip()[:1] in ("[", "{"):
+        try:
+            return parse_json(value)
+        except ValueError:
+            pass
+    return value
+
+
+def base_data(base) -> dict:
+    """A fresh dict of the base value (a JSON string, dict or model)."""
+    if isinstance(base, BaseModel):
+        return base.model_dump(by_alias=True)
+    if isinstance(base, (str, bytes)):
+        data = parse_json(base)
+    else:
+        data = copy.deepcopy(base)
+    if not isinstance(data, dict):
+        raise ValueError(f"the base value of nested fields must be an object, got {type(data).__name__}")
+    return data
+
+
+def set_nested(data: dict, model, parts: List[str], value):
+    """Set value at the field path of parts (creating parent objects)."""
+    node = data
+    for part in parts[:-1]:
+        name, annotation = _resolve(model, part)
+        child = node.get(name)
+        if isinstance(child, BaseModel):
+            child = child.model_dump(by_alias=True)
+        elif not isinstance(child, dict):
+            child = {}
+        node[name] = child
+        node, model = child, _model_of(annotation)
+    name, annotation = _resolve(model, parts[-1])
+    node[name] = _leaf_value(value, annotation)
+
+
+def assemble(model, base, fields: Dict[str, Any], delimiter: str) -> dict:
+    """The data of model: the base value with fields (by nested key, e.g.
+    "POOL__SIZE") set on top."""
+    data = base_data(base) if base is not None else {}
+    for nested_key, value in fields.items():
+        parts = [part for part in nested_key.split(delimiter) if part]
+        if parts:
+            set_nested(data, model, parts, value)
+    return data
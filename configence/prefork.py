@@ -0,0 +1,31 @@
+"""Preparing loaded configuration for pre-fork servers (gunicorn, uwsgi,
+celery prefork, ...).
+
+Forked workers share the parent's memory pages copy-on-write, but every
+write to an object - including refcount updates and the cyclic GC marking
+objects - copies its page into the worker. prefork_warmup() loads
+everything that would otherwise be loaded lazily in each worker, compacts
+the instances, and moves all existing objects into the GC's permanent
+generation (gc.freeze), so the GC of the workers never touches them.
+
+Call it in the parent, right before forking the workers.
+"""
+
+import gc
+
+from .configence import Configence
+
+
+def prefork_warmup(*instances: Configence, freeze: bool = True) -> None:
+    """Warm up config instances before forking worker processes.
+
+    Args:
+        instances (Configence): the loaded config instances the workers will use.
+        freeze (bool, optional): call gc.freeze() after warming up. Defaults to True.
+    """
+    for instance in instances:
+        instance._warmup()
+    # collect garbage first, so it isn't frozen (and kept) forever
+    gc.collect()
+    if freeze:
+        gc.freeze()
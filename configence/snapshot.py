@@ -0,0 +1,327 @@
+"""Verified snapshots of loaded config values (see Configence.save_snapshot
+and Configence.from_snapshot).
+
+A snapshot file is a JSON header line followed by the JSON payload of the
+values:
+
+    {"checksum": "...", "class": "MyModel", "schema": "...", "version": 1}
+    {"MY_HERO": "Vegeta", "CHARACTER": {...}, ...}
+
+The checksum is a blake2b digest (keyed with a secret, if given) of the
+schema hash and the exact payload bytes. When both match, the payload is
+trusted: model() values are built without validation (see construct_model).
+When only the schema differs (the code changed since the snapshot was
+taken), the values are loaded with full validation instead.
+"""
+
+import gc
+import hashlib
+import hmac
+import json
+import typing
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from decouple import undefined
+from pydantic import BaseModel, RootModel, TypeAdapter
+
+from .sources import _lookup_config, parse_json, raw_getter
+from .types import ConfigenceEntry
+
+SNAPSHOT_VERSION = 1
+
+try:
+    from types import UnionType
+except ImportError:  # pragma: no cover - python < 3.10
+    UnionType = Union
+
+
+class SnapshotIntegrityError(ValueError):
+    """The snapshot's content doesn't match its checksum."""
+
+
+def _checksum(schema: str, payload: bytes, secret: Optional[Union[str, bytes]] = None) -> str:
+    if isinstance(secret, str):
+        secret = secret.encode()
+    digest = hashlib.blake2b(key=secret or b"", digest_size=32)
+    digest.update(schema.encode())
+    digest.update(b"\0")
+    digest.update(payload)
+    return digest.hexdigest()
+
+
+def _type_schema(value_type) -> str:
+    if isinstance(value_type, type) and issubclass(value_type, BaseModel):
+        try:
+            return json.dumps(value_type.model_json_schema(), sort_keys=True)
+        except Exception:
+            # not representable as JSON schema (e.g. arbitrary types)
+            return repr(
+                {name: repr(field.annotation) for name, field in value_type.model_fields.items()}
+            )
+    return getattr(value_type, "__qualname__", repr(value_type))
+
+
+def schema_hash(cls) -> str:
+    """A digest of a Configence class's schema (entries, keys, types and
+    the JSON schemas of its models) - computed once per class."""
+    cached = cls.__dict__.get("_configence_schema_hash")
+    if cached is None:
+        digest = hashlib.blake2b(digest_size=16)
+        for name, entry in cls._schema():
+            if isinstance(entry, ConfigenceEntry):
+                described = f"{name}:{entry.key}:{_type_schema(entry.type)}"
+            else:
+                described = f"{name}:delay"
+            digest.update(described.encode())
+            digest.update(b"\0")
+        cached = cls._configence_schema_hash = digest.hexdigest()
+    return cached
+
+
+# -- trusted model construction --
+
+_NATIVE_TYPES = (str, int, float, bool, type(None), Any)
+
+
+def _is_json_native(annotation) -> bool:
+    """Values of the annotation are the same in JSON and in python (so they
+    need no conversion)."""
+    if annotation in _NATIVE_TYPES:
+        return True
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Literal:
+        return all(isinstance(arg, (str, int, bool)) or arg is None for arg in args)
+    if origin in (list, Union, UnionType):
+        return all(_is_json_native(arg) for arg in args)
+    if origin is dict:
+        return not args or (args[0] is str and _is_json_native(args[1]))
+    return False
+
+
+def _is_model(annotation) -> bool:
+    return (
+        isinstance(annotation, type)
+        and issubclass(annotation, BaseModel)
+        and not issubclass(annotation, RootModel)
+    )
+
+
+@contextmanager
+def gc_paused():
+    """Pause the cyclic GC - parsing and building many small containers
+    triggers needless collections (none of them is garbage)."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _lazy_model_builder(model):
+    """Builds model instances (resolving the model's builder on first use -
+    so self-referencing models are supported)."""
+    builder = None
+
+    def build(value):
+        nonlocal builder
+        if builder is None:
+            builder = _model_builder(model)
+        return builder(value)
+
+    return build
+
+
+def _field_builder(annotation):
+    """A function converting a trusted JSON value of the annotation (None
+    if the value needs no conversion)."""
+    if _is_json_native(annotation):
+        return None
+    if _is_model(annotation):
+        return _lazy_model_builder(annotation)
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is list and len(args) == 1 and _is_model(args[0]):
+        build_item = _lazy_model_builder(args[0])
+        return lambda value: [build_item(item) for item in value]
+    if origin is dict and len(args) == 2 and args[0] is str and _is_model(args[1]):
+        build_item = _lazy_model_builder(args[1])
+        return lambda value: {key: build_item(item) for key, item in value.items()}
+    if origin in (Union, UnionType):
+        options = [arg for arg in args if arg is not type(None)]
+        if len(options) == 1 and _is_model(options[0]):
+            build_item = _lazy_model_builder(options[0])
+            return lambda value: None if value is None else build_item(value)
+    # anything else (datetimes, tuples, sets, ...) is converted by pydantic
+    return TypeAdapter(annotation).validate_python
+
+
+def _model_builder(model) -> Callable[[dict], Any]:
+    """A function building instances of model from trusted JSON data -
+    created once per model class."""
+    builder = model.__dict__.get("__configence_builder__")
+    if builder is not None:
+        return builder
+    fields = model.model_fields
+    converters = tuple(
+        (name, converter)
+        for name, field in fields.items()
+        for converter in [_field_builder(field.annotation)]
+        if converter is not None
+    )
+    optional = tuple((name, field) for name, field in fields.items() if not field.is_required())
+    direct = (
+        not model.__private_attributes__
+        and model.model_post_init is BaseModel.model_post_init
+        and model.model_config.get("extra") != "allow"
+    )
+    new = object.__new__
+    set_attribute = object.__setattr__
+
+    def build(values):
+        # the data is freshly parsed (and owned by the built instance)
+        for name, converter in converters:
+            if name in values:
+                values[name] = converter(values[name])
+        if not direct:
+            return model.model_construct(**values)
+        fields_set = set(values)
+        for name, field in optional:
+            if name not in values:
+                values[name] = field.get_default(call_default_factory=True)
+        # what model_construct sets - without its generic overhead
+        instance = new(model)
+        set_attribute(instance, "__dict__", values)
+        set_attribute(instance, "__pydantic_fields_set__", fields_set)
+        set_attribute(instance, "__pydantic_extra__", None)
+        set_attribute(instance, "__pydantic_private__", None)
+        return instance
+
+    setattr(model, "__configence_builder__", build)
+    return build
+
+
+def construct_model(model, data: dict):
+    """Build a model instance (recursively) from trusted JSON data - without
+    validation (like model_construct, but including nested models). The
+    data's dicts are used as the instances' storage."""
+    if isinstance(data, model):
+        return data
+    with gc_paused():
+        return _model_builder(model)(data)
+
+
+# -- snapshot files --
+
+_NOT_STORED = object()
+
+
+def _snapshot_value(value):
+    """The JSON form of a value (loadable by the entry's cast), or
+    _NOT_STORED."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Enum):
+        # values take precedence over names when parsed (see cast_enum)
+        return _snapshot_value(value.value)
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple)) and all(
+        isinstance(item, (str, int, float, bool)) for item in value
+    ):
+        return list(value)
+    return _NOT_STORED
+
+
+def dump_values(instance) -> bytes:
+    """The snapshot payload of a loaded instance (values which can't be
+    stored as JSON - e.g. matchers - and values of async / expiring entries
+    are left out, and loaded from the sources)."""
+    values = {}
+    for name, entry in instance._entries.items():
+        if entry.async_cast is not None or entry.expiry is not None:
+            # resolved / fetched from the raw value on each load
+            continue
+        stored = _snapshot_value(entry.value)
+        if stored is not _NOT_STORED:
+            values[name] = stored
+    return json.dumps(values, separators=(",", ":"), sort_keys=True).encode()
+
+
+def write_snapshot(instance, path: str, secret: Optional[Union[str, bytes]] = None) -> str:
+    payload = dump_values(instance)
+    schema = schema_hash(type(instance))
+    checksum = _checksum(schema, payload, secret)
+    header = {
+        "checksum": checksum,
+        "class": type(instance).__qualname__,
+        "schema": schema,
+        "version": SNAPSHOT_VERSION,
+    }
+    with open(path, "wb") as f:
+        f.write(json.dumps(header, sort_keys=True).encode())
+        f.write(b"\n")
+        f.write(payload)
+    return checksum
+
+
+def read_snapshot(cls, path: str, secret: Optional[Union[str, bytes]] = None) -> Tuple[Dict[str, Any], bool]:
+    """The values of a snapshot (by entry name), and whether they are
+    trusted (i.e. the snapshot was taken with the current schema).
+
+    Raises:
+        SnapshotIntegrityError: the content doesn't match the checksum (or the secret is wrong)
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    header_line, _, payload = content.partition(b"\n")
+    try:
+        header = json.loads(header_line)
+        schema, checksum = header["schema"], header["checksum"]
+    except (ValueError, KeyError, TypeError):
+        raise SnapshotIntegrityError(f"{path} is not a config snapshot") from None
+    if header.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotIntegrityError(f"{path} has an unsupported snapshot version")
+    if not hmac.compare_digest(_checksum(schema, payload, secret), str(checksum)):
+        raise SnapshotIntegrityError(f"{path} doesn't match its checksum")
+    with gc_paused():
+        values = parse_json(payload)
+    return values, schema == schema_hash(cls)
+
+
+class SnapshotSource:
+    """Values from a snapshot (by env-var key), falling back to another
+    source for keys it doesn't have."""
+
+    def __init__(self, mapping: Dict[str, Any], fallback) -> None:
+        self.mapping = mapping
+        self._fallback_get_raw = raw_getter(fallback)
+
+    def get_raw(self, key):
+        try:
+            return self.mapping[key]
+        except KeyError:
+            return self._fallback_get_raw(key)
+
+    def __call__(self, option, default=undefined, cast=undefined):
+        return _lookup_config(self.get_raw, option, default, cast)
+
+
+def snapshot_mapping(cls, values: Dict[str, Any], trusted: bool, prefix: Optional[str]) -> Dict[str, Any]:
+    """The snapshot values by env-var key (with trusted models built
+    without validation)."""
+    entries = dict(cls._schema())
+    mapping = {}
+    for name, value in values.items():
+        entry = entries.get(name)
+        if entry is None:
+            continue
+        key = entry.key if isinstance(entry, ConfigenceEntry) else name
+        if trusted and isinstance(entry, ConfigenceEntry) and _is_model(entry.type) and isinstance(value, dict):
+            value = construct_model(entry.type, value)
+        mapping[f"{prefix}{key}" if prefix is not None else key] = value
+    return mapping
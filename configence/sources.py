@@ -0,0 +1,675 @@
+"""Configuration sources beyond decouple's .env < .ini < env-vars chain.
+
+A ConfigDocument is a JSON / YAML document (read from a file, an env-var or
+given as text) which is parsed once and shared by many entries - each entry
+references its own sub-tree by a JSON pointer (RFC 6901).
+
+A SourceStack is a configurable stack of layers (e.g. defaults.toml <
+production.toml < .env < env-vars) which replaces decouple's `config` as
+the source of Configence instances.
+"""
+
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from decouple import (
+    RepositoryEnv,
+    RepositoryIni,
+    Undefined,
+    UndefinedValueError,
+    config,
+    strtobool,
+    undefined,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - optional dependency
+    yaml = None
+
+try:
+    import tomllib
+except ImportError:  # pragma: no cover - python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+def parse_json(text):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def parse_yaml(text):
+    if yaml is None:
+        raise ImportError("Parsing YAML documents requires PyYAML (pip install pyyaml)")
+    return yaml.safe_load(text)
+
+
+def parse_toml(text):
+    if tomllib is None:
+        raise ImportError("Parsing TOML files requires python>=3.11 or tomli (pip install tomli)")
+    if isinstance(text, bytes):
+        text = text.decode("utf-8")
+    return tomllib.loads(text)
+
+
+PARSERS = {
+    "json": parse_json,
+    "yaml": parse_yaml,
+    "toml": parse_toml,
+}
+
+
+def _format_from_path(path: str) -> str:
+    if path.endswith((".yaml", ".yml")):
+        return "yaml"
+    if path.endswith(".toml"):
+        return "toml"
+    return "json"
+
+
+def _unescape_pointer_token(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def resolve_pointer(document: Any, pointer: str, default=undefined):
+    """Resolve a JSON pointer (e.g. "/db/replicas/0") in a parsed document.
+
+    Returns default if the pointer does not exist (or raises KeyError if no
+    default was given).
+    """
+    if pointer == "":
+        return document
+    if not pointer.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer {pointer!r} - must start with '/'")
+    current = document
+    for token in pointer[1:].split("/"):
+        token = _unescape_pointer_token(token)
+        try:
+            if isinstance(current, list):
+                current = current[int(token)]
+            else:
+                current = current[token]
+        except (KeyError, IndexError, ValueError, TypeError):
+            if default is undefined:
+                raise KeyError(pointer)
+            return default
+    return current
+
+
+class ConfigDocument:
+    """A JSON / YAML document parsed once and shared by many config entries.
+
+    The document is read from (exactly one of) a file path, an env-var (read
+    like any other config value, i.e. from env-vars / .env / .ini) or text.
+    Files are re-parsed only if their mtime / size change, env-var documents
+    only if the raw value changes.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        env: Optional[str] = None,
+        text: Optional[str] = None,
+        format: Optional[str] = None,
+    ) -> None:
+        if sum(source is not None for source in (path, env, text)) != 1:
+            raise ValueError("ConfigDocument requires exactly one of: path, env, text")
+        self.path = path
+        self.env = env
+        self.text = text
+        if format is None:
+            format = _format_from_path(path) if path is not None else "json"
+        if format not in PARSERS:
+            raise ValueError(f"Unsupported document format {format!r}")
+        self.format = format
+        self._parse = PARSERS[format]
+        # the input the cached data was parsed from (file stats / raw text)
+        self._parsed_from = undefined
+        self._data = undefined
+        self._lock = threading.Lock()
+
+    def _current_input(self, source=None):
+        if self.path is not None:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        if self.env is not None:
+            return (source or config)(self.env, default=None)
+        return self.text
+
+    def _read(self, current_input):
+        if self.path is not None:
+            with open(self.path, "rb") as f:
+                return f.read()
+        return current_input
+
+    @property
+    def data(self):
+        """The parsed document (or None if an env-var document is not
+        set)."""
+        return self.read()
+
+    def read(self, source=None):
+        """The parsed document - reading env-var documents from source (a
+        resolved config, see resolve_config) or decouple's config."""
+        current_input = self._current_input(source)
+        if current_input == self._parsed_from:
+            return self._data
+        with self._lock:
+            if current_input != self._parsed_from:
+                raw = self._read(current_input)
+                self._data = self._parse(raw) if raw is not None else None
+                self._parsed_from = current_input
+            return self._data
+
+    def fingerprint(self, source=None):
+        """A value that changes whenever the document's input changes."""
+        return self._current_input(source)
+
+    def resolve(self, pointer: str, default=undefined, source=None):
+        """Get the sub-tree at pointer (or default if it doesn't exist)."""
+        data = self.read(source)
+        if data is None:
+            if default is undefined:
+                raise KeyError(pointer)
+            return default
+        return resolve_pointer(data, pointer, default)
+
+    def __repr__(self) -> str:
+        source = self.path or self.env or "<text>"
+        return f"ConfigDocument({source!r}, format={self.format!r})"
+
+
+def _to_source_value(value):
+    """Normalize a parsed structured value to what env-vars would hold.
+
+    Scalars become strings (so every cast works on them as it does on
+    env-vars), while lists and dicts are kept as parsed (so lists / models
+    are not re-parsed from text).
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list, str)):
+        return value
+    return str(value)
+
+
+def flatten(data: dict, uppercase: bool = True, separator: str = "_", parent: str = None):
+    """Flatten nested tables into a flat key index.
+
+    A nested table is indexed both as a whole (e.g. "DB" -> dict, for
+    model entries) and per field (e.g. "DB_HOST" -> "localhost").
+    """
+    index = {}
+    for key, value in data.items():
+        key = str(key)
+        if uppercase:
+            key = key.upper()
+        if parent is not None:
+            key = f"{parent}{separator}{key}"
+        if value is None:
+            continue
+        index[key] = _to_source_value(value)
+        if isinstance(value, dict):
+            index.update(flatten(value, uppercase, separator, key))
+    return index
+
+
+# parsed file layers shared by the whole process: layer cache key -> (stat fingerprint, index)
+_layer_cache: Dict[tuple, Tuple[Any, dict]] = {}
+_layer_cache_lock = threading.Lock()
+
+
+class Layer(ABC):
+    """A single source of raw config values in a SourceStack."""
+
+    # static layers are parsed once (per fingerprint) and merged into the
+    # stack's flat index, live layers (e.g. env-vars) are looked up directly
+    static = True
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """The layer's name (e.g. "file:<path>")."""
+
+    @abstractmethod
+    def fingerprint(self):
+        """A value that changes whenever the layer's content changes."""
+
+    @abstractmethod
+    def load(self) -> dict:
+        """The flat key index of this layer."""
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name}>"
+
+
+class FileLayer(Layer):
+    """A config file, parsed once per (path, mtime, size) in the process.
+
+    Missing files are treated as empty unless required=True.
+    """
+
+    kind = "file"
+
+    def __init__(self, path: str, required: bool = False) -> None:
+        self.path = os.path.abspath(path)
+        self.required = required
+
+    @property
+    def name(self) -> str:
+        return f"{self.kind}:{self.path}"
+
+    def fingerprint(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self.required:
+                raise
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @abstractmethod
+    def parse(self) -> dict:
+        """The flat key index of the file's content."""
+
+    def cache_key(self) -> tuple:
+        """The key of the layer's parsed index in the process-wide cache -
+        covering the options the file is parsed with."""
+        return (type(self), self.path)
+
+    def load(self) -> dict:
+        fingerprint = self.fingerprint()
+        if fingerprint is None:
+            return {}
+        cache_key = self.cache_key()
+        cached = _layer_cache.get(cache_key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        with _layer_cache_lock:
+            cached = _layer_cache.get(cache_key)
+            if cached is not None and cached[0] == fingerprint:
+                return cached[1]
+            index = self.parse()
+            _layer_cache[cache_key] = (fingerprint, index)
+            return index
+
+    def _read(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+class StructuredFile(FileLayer):
+    """A JSON / YAML / TOML file; nested tables are flattened into
+    (upper-cased, by default) "PARENT_CHILD" keys."""
+
+    def __init__(self, path: str, required: bool = False, uppercase: bool = True) -> None:
+        super().__init__(path, required)
+        self.uppercase = uppercase
+
+    def cache_key(self) -> tuple:
+        return super().cache_key() + (self.uppercase,)
+
+    def parse(self) -> dict:
+        data = PARSERS[self.kind](self._read())
+        return flatten(data or {}, uppercase=self.uppercase)
+
+
+class TomlFile(StructuredFile):
+    kind = "toml"
+
+
+class JsonFile(StructuredFile):
+    kind = "json"
+
+
+class YamlFile(StructuredFile):
+    kind = "yaml"
+
+
+class EnvFile(FileLayer):
+    """A .env file (parsed with decouple's parser)."""
+
+    kind = "env"
+
+    def parse(self) -> dict:
+        return dict(RepositoryEnv(self.path).data)
+
+
+class IniFile(FileLayer):
+    """A settings.ini file (the [settings] section, parsed with decouple's
+    parser). ini option names are case-insensitive, and are indexed upper-
+    cased."""
+
+    kind = "ini"
+
+    def parse(self) -> dict:
+        parser = RepositoryIni(self.path).parser
+        if not parser.has_section(RepositoryIni.SECTION):
+            return {}
+        # interpolated like decouple's RepositoryIni does (e.g. "100%%" -> "100%")
+        return {
+            key.upper(): value
+            for key, value in parser.items(RepositoryIni.SECTION)
+        }
+
+
+class Environ(Layer):
+    """The process env-vars (looked up live)."""
+
+    static = False
+
+    def __init__(self, environ=None) -> None:
+        self.environ = os.environ if environ is None else environ
+
+    @property
+    def name(self) -> str:
+        return "env-vars"
+
+    def fingerprint(self):
+        return None
+
+    def load(self) -> dict:
+        return self.environ
+
+
+def _lookup_config(get_raw, option, default=undefined, cast=undefined):
+    """decouple's Config.get() semantics on top of a raw lookup function."""
+    try:
+        value = get_raw(option)
+    except KeyError:
+        if isinstance(default, Undefined):
+            raise UndefinedValueError(
+                "{} not found. Declare it as envvar or define a default value.".format(option)
+            )
+        value = default
+    if isinstance(cast, Undefined):
+        return value
+    if cast is bool:
+        value = str(value)
+        return bool(value) if value == "" else bool(strtobool(value))
+    return cast(value)
+
+
+class SourceSnapshot:
+    """The merged, flat key index of a SourceStack at a point in time.
+
+    Callable like decouple's `config` (option, default=..., cast=...), so
+    it can replace it as the source of Configence instances.
+    """
+
+    def __init__(self, segments: List[Tuple[dict, Optional[dict]]], fingerprint) -> None:
+        # highest priority first: (values, provenance) per merged static
+        # segment; live layers are (mapping, None) with provenance by layer
+        self._segments = segments
+        self.fingerprint = fingerprint
+
+    def get_raw(self, key):
+        for values, provenance in self._segments:
+            if key in values:
+                return values[key]
+        raise KeyError(key)
+
+    def provenance(self, key) -> Optional[str]:
+        """The name of the layer the value of key comes from (or None)."""
+        for values, provenance in self._segments:
+            if key in values:
+                return provenance[key] if isinstance(provenance, dict) else provenance
+        return None
+
+    def keys(self):
+        seen = set()
+        for values, _ in self._segments:
+            seen.update(values.keys())
+        return seen
+
+    def __contains__(self, key) -> bool:
+        return any(key in values for values, _ in self._segments)
+
+    def __call__(self, option, default=undefined, cast=undefined):
+        return _lookup_config(self.get_raw, option, default, cast)
+
+
+class SourceStack:
+    """An ordered stack of config layers (lowest priority first), e.g.:
+
+        SourceStack(
+            TomlFile("defaults.toml"),
+            TomlFile("env/production.toml"),
+            EnvFile(".env"),
+            Environ(),
+        )
+
+    File layers are parsed once per (path, mtime, size) in the process, and
+    merged into a flat key index which is reused until one of the files
+    changes. Like decouple's `config`, a stack is callable and can be passed
+    as the `sources` of Configence instances (the CLI still overrides all
+    layers).
+    """
+
+    def __init__(self, *layers: Layer) -> None:
+        self.layers = list(layers)
+        self._snapshot: Optional[SourceSnapshot] = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> SourceSnapshot:
+        """Get the merged index (rebuilt only if a file layer changed)."""
+        fingerprint = tuple(layer.fingerprint() for layer in self.layers)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.fingerprint == fingerprint:
+            return snapshot
+        with self._lock:
+            segments = []
+            values, provenance = {}, {}
+            for layer in self.layers:
+                if layer.static:
+                    index = layer.load()
+                    values.update(index)
+                    provenance.update(dict.fromkeys(index, layer.name))
+                else:
+                    if values:
+                        segments.append((values, provenance))
+                        values, provenance = {}, {}
+                    segments.append((layer.load(), layer.name))
+            if values:
+                segments.append((values, provenance))
+            segments.reverse()
+            self._snapshot = SourceSnapshot(segments, fingerprint)
+            return self._snapshot
+
+    def provenance(self, key) -> Optional[str]:
+        return self.snapshot().provenance(key)
+
+    def __call__(self, option, default=undefined, cast=undefined):
+        return self.snapshot()(option, default, cast)
+
+    def __repr__(self) -> str:
+        return f"SourceStack({', '.join(layer.name for layer in self.layers)})"
+
+
+class MappingSource:
+    """Values from a mapping of raw strings or already typed values (e.g. a
+    database row), without touching env-vars, files or decouple.
+
+    Callable like decouple's `config`; keys are the same as env-var keys
+    (i.e. including the prefix, if any).
+    """
+
+    def __init__(self, mapping) -> None:
+        self.mapping = mapping
+
+    def get_raw(self, key):
+        return self.mapping[key]
+
+    def provenance(self, key) -> Optional[str]:
+        return "mapping" if key in self.mapping else None
+
+    def keys(self):
+        return self.mapping.keys()
+
+    def __contains__(self, key) -> bool:
+        return key in self.mapping
+
+    def __call__(self, option, default=undefined, cast=undefined):
+        return _lookup_config(self.get_raw, option, default, cast)
+
+
+_MISSING = object()
+# the keys found under a prefix are recorded as a read of this marker followed by the prefix
+_KEYS_MARKER = "\0keys:"
+
+
+class RecordingSource:
+    """Wraps a decouple `config` compatible source, recording the raw value
+    (or absence) of every key read through it."""
+
+    def __init__(self, config) -> None:
+        self.config = config
+        self.reads: Dict[str, Any] = {}
+
+    def get_raw(self, key):
+        try:
+            raw = self.config(key)
+        except UndefinedValueError:
+            raw = _MISSING
+        self.reads[key] = raw
+        if raw is _MISSING:
+            raise KeyError(key)
+        return raw
+
+    def record_keys(self, prefix: str, keys):
+        """Record the keys found starting with prefix (by a scan of the
+        source's keys - see source_keys)."""
+        self.reads[_KEYS_MARKER + prefix] = tuple(sorted(keys))
+
+    def __call__(self, option, default=undefined, cast=undefined):
+        return _lookup_config(self.get_raw, option, default, cast)
+
+
+def raw_getter(config) -> Callable[[str], Any]:
+    """A function returning the raw value of a key in a decouple `config`
+    compatible source (raising KeyError for missing keys)."""
+    get_raw = getattr(config, "get_raw", None)
+    if get_raw is not None:
+        return get_raw
+
+    def get_raw_from_config(key):
+        try:
+            return config(key)
+        except UndefinedValueError:
+            raise KeyError(key) from None
+
+    return get_raw_from_config
+
+
+def source_keys(config) -> Set[str]:
+    """All the keys available in a decouple `config` compatible source (as
+    far as they can be listed - decouple's config lists env-vars and .env
+    keys)."""
+    if isinstance(config, RecordingSource):
+        config = config.config
+    keys = getattr(config, "keys", None)
+    if callable(keys):
+        return set(keys())
+    result = set(os.environ)
+    repository = getattr(getattr(config, "config", None), "repository", None)
+    if isinstance(getattr(repository, "data", None), dict):
+        result.update(repository.data)
+    return result
+
+
+def read_raw_values(config, keys) -> Dict[str, Any]:
+    """The current raw values (or absence) of keys in a source - and the
+    current keys under the prefixes recorded by RecordingSource.record_keys."""
+    reads = {}
+    available = None
+    for key in keys:
+        if key.startswith(_KEYS_MARKER):
+            if available is None:
+                available = source_keys(config)
+            prefix = key[len(_KEYS_MARKER):]
+            reads[key] = tuple(sorted(name for name in available if name.startswith(prefix)))
+            continue
+        try:
+            reads[key] = config(key)
+        except UndefinedValueError:
+            reads[key] = _MISSING
+    return reads
+
+
+_default_sources = None
+# sources for instances created in the current context (see use_sources)
+_context_sources: ContextVar = ContextVar("configence_sources", default=None)
+# recorders of the sources resolved in the current context (see record_reads)
+_context_recorders: ContextVar = ContextVar("configence_recorders", default=None)
+
+
+@contextmanager
+def use_sources(sources):
+    """Use sources for all Configence instances created (without their own
+    sources) inside the block - in the current thread / async context
+    only."""
+    token = _context_sources.set(sources)
+    try:
+        yield sources
+    finally:
+        _context_sources.reset(token)
+
+
+@contextmanager
+def record_reads():
+    """Record the raw values read by all Configence instances created inside
+    the block (yields the list of their RecordingSources)."""
+    recorders = []
+    token = _context_recorders.set(recorders)
+    try:
+        yield recorders
+    finally:
+        _context_recorders.reset(token)
+
+
+def set_default_sources(sources):
+    """Set the sources used by Configence instances which are not given
+    their own (None restores decouple's `config`)."""
+    global _default_sources
+    _default_sources = sources
+
+
+def get_default_sources():
+    return _default_sources
+
+
+def resolve_config(sources=None):
+    """Get the decouple `config` compatible callable to read values from.
+
+    SourceStacks are resolved into a snapshot, so all the values of an
+    instance are read from the same merged index.
+    """
+    if sources is None:
+        sources = _context_sources.get()
+    if sources is None:
+        sources = _default_sources
+    if sources is None:
+        resolved = config
+    elif isinstance(sources, SourceStack):
+        resolved = sources.snapshot()
+    else:
+        resolved = sources
+    recorders = _context_recorders.get()
+    if recorders is not None:
+        resolved = RecordingSource(resolved)
+        recorders.append(resolved)
+    return resolved
@@ -0,0 +1,44 @@
+"""Opt-in access tracking of config values (see Configence.TRACK_ACCESS).
+
+The entries of a tracked class are replaced (once, when its first instance
+is loaded) by data descriptors counting the reads of their values - so
+reading a value costs a dict increment, untracked classes pay nothing, and
+instances keep their class.
+"""
+
+
+class TrackedValue:
+    """Counts the reads of an entry's value (stored in the instance's
+    __dict__, as usual) - for instances which have access counts."""
+
+    __slots__ = ("name", "entry")
+
+    def __init__(self, name: str, entry) -> None:
+        self.name = name
+        # the class-level entry (returned on class access - e.g. to collect the schema)
+        self.entry = entry
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self.entry
+        instance_dict = instance.__dict__
+        counts = instance_dict.get("_access_counts")
+        if counts is not None:
+            counts[self.name] += 1
+        try:
+            return instance_dict[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+
+
+def track_access(cls):
+    """Replace the entries of a Configence class by read counting
+    descriptors (once per class)."""
+    if cls.__dict__.get("_configence_tracked"):
+        return
+    for name, entry in cls._schema():
+        setattr(cls, name, TrackedValue(name, entry))
+    cls._configence_tracked = True
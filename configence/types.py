@@ -1,8 +1,12 @@
 import inspect
-from typing import Any, Callable, List, Type
+import string
+from functools import cached_property
+from typing import Any, Callable, FrozenSet, List, Optional, Type
 
 from decouple import text_type, undefined
 
+from .sources import _to_source_value, use_sources
+
 
 class FromStr:
     """Placeholder for values parsed from strings into more complex objects."""
@@ -12,10 +16,12 @@ class FromStr:
         self.cast = cast
 
     def __call__(self, arg) -> Any:
-        if arg is not undefined:
-            return self.cast(arg)
-        else:
+        if arg is undefined:
             return undefined
+        # already cast values (e.g. the loaded value used as the CLI default) are passed through
+        if isinstance(self._type, type) and isinstance(arg, self._type):
+            return arg
+        return self.cast(arg)
 
     @property
     def __name__(self) -> str:
@@ -38,6 +44,12 @@ class ConfigenceEntry:
     cast_from_json: Callable
     kwargs: dict
     flags: List[str]
+    document: Any
+    pointer: str
+    serialize: Callable
+    async_cast: Any
+    expiry: Any
+    nested_delimiter: str
     value: Any
 
     def __init__(
@@ -51,6 +63,12 @@ class ConfigenceEntry:
         type=str,
         index=-1,
         flags: List[str] = None,
+        document=None,
+        pointer: str = None,
+        serialize: Callable = None,
+        async_cast=None,
+        expiry=None,
+        nested_delimiter: str = None,
         **kwargs,
     ) -> None:
         self.key = key
@@ -63,8 +81,36 @@ class ConfigenceEntry:
         self.type = type
         self.kwargs = kwargs
         self.flags = flags
+        # shared parsed document to take the value from (see ConfigDocument)
+        self.document = document
+        self.pointer = pointer if pointer is not None else f"/{key}"
+        # value -> the string its cast parses (see Configence.to_environ)
+        self.serialize = serialize
+        # coroutine cast, awaited after the (sync) cast (see configence.aio.AsyncCast)
+        self.async_cast = async_cast
+        # fetching and refreshing of expiring values (see configence.expiring.Expiry)
+        self.expiry = expiry
+        # keys under the entry's key set single fields of its model (see configence.nested)
+        self.nested_delimiter = nested_delimiter
         self.value = undefined
 
+    def copy(self) -> "ConfigenceEntry":
+        """A shallow copy (sharing the entry's metadata)."""
+        entry = object.__new__(self.__class__)
+        entry.__dict__.update(self.__dict__)
+        return entry
+
+    def get_default(self, source=None):
+        """The default value - taken from the entry's document (read from
+        source, the instance's resolved config) if it has one."""
+        if self.document is None:
+            return self.default
+        value = self.document.resolve(self.pointer, None, source)
+        if value is None:
+            return self.default
+        # scalars as strings - so they are cast like env-vars
+        return _to_source_value(value)
+
     def get_cli_type(self):
         if self.type in {str, int, float, list, dict, bool}:
             return self.type
@@ -95,8 +141,28 @@ class ConfigenceDelay:
     def value(self):
         return self._value
 
+    @cached_property
+    def dependencies(self) -> FrozenSet[str]:
+        """The names of the entries this delayed value is evaluated from."""
+        if isinstance(self._value, str):
+            names = set()
+            try:
+                fields = [field for _, field, _, _ in string.Formatter().parse(self._value)]
+            except ValueError:
+                # not a valid format string - evaluated as is
+                fields = []
+            for field in fields:
+                if field:
+                    # "{A.b}" / "{A[0]}" depend on A
+                    names.add(field.split(".", 1)[0].split("[", 1)[0])
+            return frozenset(names)
+        if callable(self._value):
+            return frozenset(inspect.signature(self._value).parameters)
+        return frozenset()
+
     def eval(self, config=None):
-        values = {k: v.value for k, v in config.entries.items()} if config else {}
+        # the config's own entries (without loading its groups)
+        values = {k: v.value for k, v in config._entries.items()} if config else {}
         if isinstance(self._value, str):
             try:
                 return self._value.format(**values)
@@ -113,3 +179,45 @@ class ConfigenceDelay:
             return f"<Delayed {self.eval()}>"
         except:
             return f"<Delayed {self._value}>"
+
+
+class ConfigenceGroup:
+    """A nested config class, loaded on first access (per instance of the
+    class declaring it).
+
+    The child reads from the same (already resolved) sources as its parent,
+    with the parent's prefix followed by the group's prefix.
+    """
+
+    def __init__(self, config_cls: Type, prefix: Optional[str] = None, description: str = None, index=-1) -> None:
+        self.config_cls = config_cls
+        self.prefix = prefix
+        self.description = description
+        # sorting index
+        self.index = index
+        self.name: Optional[str] = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def child_prefix(self, parent_prefix: Optional[str]) -> Optional[str]:
+        if parent_prefix is None and self.prefix is None:
+            return None
+        return f"{parent_prefix or ''}{self.prefix or ''}"
+
+    def load(self, parent):
+        """Load the child of parent (with the parent's sources as the
+        context's sources - so classes with their own __init__ work as
+        well)."""
+        with use_sources(parent._config):
+            return self.config_cls(prefix=self.child_prefix(parent._prefix))
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        # cached in the instance's __dict__ - later reads don't reach the descriptor
+        child = instance.__dict__[self.name] = self.load(instance)
+        return child
+
+    def __repr__(self) -> str:
+        return f"<Group {self.config_cls.__name__} prefix={self.prefix!r}>"
@@ -0,0 +1,98 @@
+"""Validating a Configence model against many environment definitions.
+
+Each environment (a .env / .ini / .toml / .json / .yaml file) is loaded in
+isolation - from a SourceStack of just that file, without env-vars, the
+default sources or decouple's process-wide `config` - so nothing global is
+mutated, and environments can be validated in parallel in a process pool.
+"""
+
+import importlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, Optional, Type, Union
+
+from .sources import EnvFile, IniFile, JsonFile, SourceStack, TomlFile, YamlFile, use_sources
+
+LAYERS_BY_SUFFIX = {
+    ".env": EnvFile,
+    ".ini": IniFile,
+    ".toml": TomlFile,
+    ".json": JsonFile,
+    ".yaml": YamlFile,
+    ".yml": YamlFile,
+}
+
+
+def import_model(reference: str):
+    """Import a class by a "package.module:ClassName" reference."""
+    module_name, _, class_name = reference.partition(":")
+    if not class_name:
+        raise ValueError(f"expected a 'package.module:ClassName' reference, got '{reference}'")
+    model = importlib.import_module(module_name)
+    for name in class_name.split("."):
+        model = getattr(model, name)
+    return model
+
+
+def environment_sources(env_file: str) -> SourceStack:
+    """An isolated source of a single environment file (.env by default)."""
+    suffix = os.path.splitext(env_file)[1].lower()
+    layer = LAYERS_BY_SUFFIX.get(suffix, EnvFile)
+    return SourceStack(layer(env_file, required=True))
+
+
+def validate_one(model_cls: Union[Type, str], env_file: str, prefix: Optional[str] = None) -> Dict[str, Any]:
+    """Load model_cls from env_file alone - returning a JSON serializable
+    result (never raising on invalid configs)."""
+    if isinstance(model_cls, str):
+        model_cls = import_model(model_cls)
+    kwargs = {} if prefix is None else {"prefix": prefix}
+    try:
+        # the context's sources (and not a constructor argument) - for classes with their own __init__
+        with use_sources(environment_sources(env_file)):
+            instance = model_cls(**kwargs)
+    except Exception as err:
+        return {
+            "env": env_file,
+            "valid": False,
+            "error_type": type(err).__name__,
+            "error": str(err),
+        }
+    return {"env": env_file, "valid": True, "fingerprint": instance.fingerprint()}
+
+
+def _validate_args(args):
+    return validate_one(*args)
+
+
+def validate_many(
+    model_cls: Union[Type, str],
+    env_files: Iterable[str],
+    prefix: Optional[str] = None,
+    processes: Optional[int] = None,
+    chunksize: int = 8,
+) -> Iterator[Dict[str, Any]]:
+    """Validate model_cls against each of env_files, yielding the results
+    (see validate_one) in order, as they are ready.
+
+    Args:
+        model_cls (Type | str): the Configence class - or a "package.module:ClassName" reference to it (the class must be importable by the worker processes).
+        env_files (Iterable[str]): the environment files.
+        prefix (str, optional): the prefix to load the model with.
+        processes (int, optional): number of worker processes. Defaults to the number of CPUs; 1 validates in this process.
+        chunksize (int, optional): environments sent to a worker at once. Defaults to 8.
+    """
+    if isinstance(model_cls, str):
+        # fail fast on bad references (workers import the class again by reference)
+        import_model(model_cls)
+    tasks = ((model_cls, env_file, prefix) for env_file in env_files)
+    if processes == 1:
+        yield from map(_validate_args, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        yield from executor.map(_validate_args, tasks, chunksize=chunksize)
+
+
+def to_json_line(result: Dict[str, Any]) -> str:
+    return json.dumps(result, sort_keys=True)
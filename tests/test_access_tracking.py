@@ -0,0 +1,99 @@
+import os
+import pickle
+import pytest
+from configence import Configence, configence, trace_allocations
+
+
+class MyModel(Configence):
+    TRACK_ACCESS = True
+
+    MY_HERO = configence.str("MY_HERO", "Son Goku")
+    POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+    IS_STRONG = configence.bool("IS_STRONG", True)
+    SHOUT = configence.delay("{MY_HERO} is over {POWER_LEVEL}")
+
+
+class TestAccessTracking:
+    """Test counting reads of config values."""
+
+    def test_counts(self):
+        """Test counting reads after the load."""
+        my_config = MyModel()
+        assert type(my_config) is MyModel
+        assert my_config.access_counts() == {
+            "MY_HERO": 0, "POWER_LEVEL": 0, "IS_STRONG": 0, "SHOUT": 0,
+        }
+        for _ in range(3):
+            assert my_config.POWER_LEVEL == 9001
+        assert my_config.SHOUT == "Son Goku is over 9001"
+        assert my_config.access_counts()["POWER_LEVEL"] == 3
+        assert my_config.unused_entries() == ["MY_HERO", "IS_STRONG"]
+        assert my_config.hot_keys() == ["POWER_LEVEL", "SHOUT"]
+        assert my_config.hot_keys(min_reads=2) == ["POWER_LEVEL"]
+
+    def test_setting_values(self):
+        """Test that tracked values can still be set."""
+        my_config = MyModel()
+        my_config.MY_HERO = "Vegeta"
+        assert my_config.MY_HERO == "Vegeta"
+        assert my_config.entries["MY_HERO"].value == "Vegeta"
+        assert my_config.access_counts()["MY_HERO"] == 1
+        clone = my_config.replace(POWER_LEVEL="1")
+        assert clone.POWER_LEVEL == 1
+        assert clone.access_counts()["POWER_LEVEL"] == 1
+        assert my_config.access_counts()["POWER_LEVEL"] == 0
+
+    def test_on_load_reads(self):
+        """Test that values can be read by on_load(), and by instances loaded from the instance's class."""
+
+        class LoadingModel(Configence):
+            TRACK_ACCESS = True
+            POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+
+            def on_load(self):
+                self.doubled = self.POWER_LEVEL * 2
+
+        my_config = LoadingModel()
+        assert my_config.doubled == 18002
+        assert my_config.access_counts() == {"POWER_LEVEL": 1}
+        assert type(my_config)().doubled == 18002
+        assert LoadingModel.cached().POWER_LEVEL == 9001
+        with trace_allocations():
+            assert type(my_config)().memory_report().traced
+
+    def test_pickle(self):
+        """Test that tracked instances can be pickled."""
+        my_config = MyModel()
+        assert my_config.POWER_LEVEL == 9001
+        loaded = pickle.loads(pickle.dumps(my_config))
+        assert type(loaded) is MyModel
+        assert loaded.POWER_LEVEL == 9001
+        assert loaded.access_counts()["POWER_LEVEL"] == 2
+
+    def test_disabled_by_default(self):
+        """Test that tracking is opt-in."""
+
+        class UntrackedModel(Configence):
+            MY_HERO = configence.str("MY_HERO", "Son Goku")
+
+        my_config = UntrackedModel()
+        assert type(my_config) is UntrackedModel
+        with pytest.raises(RuntimeError):
+            my_config.unused_entries()
+
+    def test_unknown_keys(self):
+        """Test listing keys under the prefix which match no entry."""
+        os.environ["DBZ_MY_HERO"] = "Vegeta"
+        os.environ["DBZ_POWER_LVL"] = "8000"
+        my_config = MyModel(prefix="DBZ_")
+        assert my_config.MY_HERO == "Vegeta"
+        assert my_config.unknown_keys() == ["DBZ_POWER_LVL"]
+
+        mapped = MyModel.from_mapping({"DBZ_IS_STRONG": "false", "DBZ_SPEED": "1"}, prefix="DBZ_")
+        assert mapped.unknown_keys() == ["DBZ_SPEED"]
+        with pytest.raises(ValueError):
+            MyModel().unknown_keys()
+
+        # Cleanup
+        del os.environ["DBZ_MY_HERO"]
+        del os.environ["DBZ_POWER_LVL"]
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import time
+import pytest
+from configence import Configence, EnvFile, SourceStack, configence
+
+
+async def resolve_secret(reference):
+    await asyncio.sleep(0.05)
+    return f"secret-of-{reference}"
+
+
+async def resolve_port(value):
+    await asyncio.sleep(0.05)
+    return int(value) + 1
+
+
+class Host:
+    def __init__(self, ip) -> None:
+        self.ip = ip
+
+
+async def resolve_host(value):
+    await asyncio.sleep(0.01)
+    return Host(f"10.0.0.{value}")
+
+
+class HostModel(Configence):
+    HOST = configence.async_value("HOST", resolve_host, "1", type=Host)
+    URL = configence.delay(lambda HOST=None: f"http://{HOST.ip}/")
+    HEALTH = configence.delay("{URL}health")
+    NAME = configence.str("NAME", "app")
+
+
+class SecretModel(Configence):
+    DB_PASSWORD = configence.async_value("DB_PASSWORD", resolve_secret, "vault:db")
+    API_KEY = configence.async_value("API_KEY", resolve_secret, "vault:api")
+    PORT = configence.async_value("PORT", resolve_port, "8000", type=int)
+    DSN = configence.delay("postgres://user:{DB_PASSWORD}@db:{PORT}")
+
+
+class TestAsyncCasts:
+    """Test entries with coroutine casts."""
+
+    def test_acreate(self):
+        """Test that async casts are resolved before delays are evaluated."""
+        my_config = asyncio.run(SecretModel.acreate())
+        assert my_config.DB_PASSWORD == "secret-of-vault:db"
+        assert my_config.API_KEY == "secret-of-vault:api"
+        assert my_config.PORT == 8001
+        assert my_config.entries["PORT"].value == 8001
+        assert my_config.DSN == "postgres://user:secret-of-vault:db@db:8001"
+
+    def test_delays_see_resolved_objects(self):
+        """Test that delays reading attributes of resolved values are evaluated once resolved."""
+        my_config = HostModel()
+        assert my_config.URL == "http://10.0.0.1/"
+        assert my_config.HEALTH == "http://10.0.0.1/health"
+        assert list(my_config.entries) == ["HOST", "URL", "HEALTH", "NAME"]
+        assert asyncio.run(HostModel.acreate()).URL == "http://10.0.0.1/"
+        assert my_config.replace(HOST="2").HEALTH == "http://10.0.0.2/health"
+
+    def test_concurrent(self):
+        """Test that the casts are awaited concurrently."""
+        started = time.perf_counter()
+        asyncio.run(SecretModel.acreate())
+        assert time.perf_counter() - started < 0.14
+
+    def test_bounded_concurrency(self):
+        """Test that at most `concurrency` casts run at once."""
+        running, peak = 0, 0
+
+        async def tracked(value):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return value
+
+        class ManyModel(Configence):
+            A = configence.async_value("A", tracked, "a")
+            B = configence.async_value("B", tracked, "b")
+            C = configence.async_value("C", tracked, "c")
+            D = configence.async_value("D", tracked, "d")
+
+        my_config = asyncio.run(ManyModel.acreate(concurrency=2))
+        assert my_config.D == "d"
+        assert peak == 2
+
+    def test_timeout(self):
+        """Test the per-entry timeout."""
+
+        async def hang(value):
+            await asyncio.sleep(10)
+
+        class SlowModel(Configence):
+            FAST = configence.async_value("FAST", resolve_secret, "x")
+            SLOW = configence.async_value("SLOW", hang, "x", timeout=0.05)
+
+        with pytest.raises(TimeoutError, match="SLOW"):
+            asyncio.run(SlowModel.acreate())
+
+    def test_failures(self):
+        """Test that cast errors propagate."""
+
+        async def fail(value):
+            raise ValueError(f"unknown reference {value}")
+
+        class FailingModel(Configence):
+            SECRET = configence.async_value("SECRET", fail, "vault:nope")
+
+        with pytest.raises(ValueError, match="vault:nope"):
+            asyncio.run(FailingModel.acreate())
+
+    def test_sync_load(self):
+        """Test that loading synchronously runs the casts in a new event loop."""
+        os.environ["APP_DB_PASSWORD"] = "vault:env"
+        my_config = SecretModel(prefix="APP_")
+        assert my_config.DB_PASSWORD == "secret-of-vault:env"
+
+        # Cleanup
+        del os.environ["APP_DB_PASSWORD"]
+
+    def test_sync_load_in_event_loop(self):
+        """Test that loading synchronously inside an event loop is rejected."""
+
+        async def load():
+            return SecretModel()
+
+        with pytest.raises(RuntimeError, match="acreate"):
+            asyncio.run(load())
+
+    def test_typed_values(self):
+        """Test that values already of the entry's type are not cast."""
+        my_config = SecretModel.from_mapping({"PORT": 1234})
+        assert my_config.PORT == 1234
+
+    def test_replace(self):
+        """Test that replaced values are cast as well."""
+        my_config = SecretModel.from_mapping({})
+        changed = my_config.replace(DB_PASSWORD="vault:other", PORT="1")
+        assert changed.DB_PASSWORD == "secret-of-vault:other"
+        assert changed.PORT == 2
+        assert changed.DSN == "postgres://user:secret-of-vault:other@db:2"
+
+    def test_to_environ(self, tmp_path):
+        """Test that the raw values are serialized - and not the resolved ones."""
+        my_config = SecretModel.from_mapping({"API_KEY": "vault:key"})
+        environ = my_config.to_environ()
+        assert environ["DB_PASSWORD"] == "vault:db"
+        assert environ["API_KEY"] == "vault:key"
+        assert environ["PORT"] == "8000"
+        assert my_config.replace(PORT="1").to_environ()["PORT"] == "1"
+
+        path = tmp_path / ".env"
+        my_config.write_env_file(str(path))
+        loaded = SecretModel(sources=SourceStack(EnvFile(str(path), required=True)))
+        assert loaded.API_KEY == my_config.API_KEY == "secret-of-vault:key"
+        assert loaded.PORT == my_config.PORT
+
+        # values set otherwise (e.g. from the CLI) are left out
+        my_config.API_KEY = "secret"
+        assert "API_KEY" not in my_config.to_environ()
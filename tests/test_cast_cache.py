@@ -0,0 +1,128 @@
+import os
+import pytest
+from enum import Enum
+from configence import (
+    Configence,
+    cast_cache_info,
+    configence,
+    disable_cast_cache,
+    enable_cast_cache,
+)
+
+
+class Color(Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+class TestCastCache:
+    """Test the cross-instance cast cache."""
+
+    def setup_method(self):
+        enable_cast_cache(maxsize=128).clear()
+
+    def teardown_method(self):
+        disable_cast_cache()
+
+    def test_disabled_by_default(self):
+        """Test that the cache is opt-in."""
+        disable_cast_cache()
+        assert cast_cache_info() is None
+
+    def test_scalar_casts_are_shared(self):
+        """Test that identical raw values are cast once across instances."""
+        class MyModel(Configence):
+            POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+            SPEED = configence.float("SPEED", 1.5)
+            IS_STRONG = configence.bool("IS_STRONG", False)
+            COLOR = configence.enum("COLOR", Color, Color.RED)
+
+        os.environ["POWER_LEVEL"] = "8000"
+        os.environ["SPEED"] = "2.5"
+        os.environ["IS_STRONG"] = "true"
+        os.environ["COLOR"] = "blue"
+
+        configs = [MyModel() for _ in range(10)]
+        assert all(c.POWER_LEVEL == 8000 for c in configs)
+        assert all(c.SPEED == 2.5 for c in configs)
+        assert all(c.IS_STRONG is True for c in configs)
+        assert all(c.COLOR is Color.BLUE for c in configs)
+        assert configs[0].SPEED is configs[-1].SPEED
+
+        info = cast_cache_info()
+        assert info.misses == 4
+        assert info.hits == 36
+        assert info.currsize == 4
+
+        # Cleanup
+        del os.environ["POWER_LEVEL"]
+        del os.environ["SPEED"]
+        del os.environ["IS_STRONG"]
+        del os.environ["COLOR"]
+
+    def test_lists_are_not_shared(self):
+        """Test that cached lists are returned as fresh copies."""
+        class MyModel(Configence):
+            EVENTS = configence.list("EVENTS", [])
+
+        os.environ["EVENTS"] = "a,b,c"
+        first = MyModel()
+        second = MyModel()
+        assert first.EVENTS == second.EVENTS == ["a", "b", "c"]
+        first.EVENTS.append("d")
+        assert second.EVENTS == ["a", "b", "c"]
+        assert cast_cache_info().hits == 1
+
+        # Cleanup
+        del os.environ["EVENTS"]
+
+    def test_unhashable_results_are_not_cached(self):
+        """Test that mutable results (e.g. pydantic models) are not cached."""
+        from pydantic import BaseModel
+
+        class Character(BaseModel):
+            name: str
+
+        class MyModel(Configence):
+            CHARACTER = configence.model("CHARACTER", Character, {"name": "Goku"})
+
+        os.environ["CHARACTER"] = '{"name": "Vegeta"}'
+        first = MyModel()
+        second = MyModel()
+        assert first.CHARACTER == second.CHARACTER
+        assert first.CHARACTER is not second.CHARACTER
+        assert cast_cache_info().currsize == 0
+
+        # Cleanup
+        del os.environ["CHARACTER"]
+
+    def test_failed_casts_are_not_cached(self):
+        """Test that cast errors propagate and are not cached."""
+        configence = Configence(is_model=False)
+
+        os.environ["POWER_LEVEL"] = "not a number"
+        with pytest.raises(ValueError):
+            configence.int("POWER_LEVEL", 9001)
+        with pytest.raises(ValueError):
+            configence.int("POWER_LEVEL", 9001)
+        assert cast_cache_info().currsize == 0
+
+        # Cleanup
+        del os.environ["POWER_LEVEL"]
+
+    def test_bounded_size(self):
+        """Test LRU eviction."""
+        cache = enable_cast_cache(maxsize=2)
+        configence = Configence(is_model=False)
+
+        for value in ("1", "2", "3", "1"):
+            os.environ["POWER_LEVEL"] = value
+            assert configence.int("POWER_LEVEL") == int(value)
+
+        info = cast_cache_info()
+        assert info.currsize == 2
+        assert info.misses == 4
+        assert cache.hit_rate == 0.0
+
+        # Cleanup
+        del os.environ["POWER_LEVEL"]
@@ -1,6 +1,9 @@
 import pytest
 from unittest.mock import patch, MagicMock
+from click.testing import CliRunner
+from pydantic import BaseModel
 from configence import Configence, configence
+from configence.cli import CLI_OVERRIDES_META_KEY
 from typer import Typer
 
 
@@ -157,4 +160,63 @@ class TestCLIIntegration:
         
         assert hero_entry.get_cli_type() == str
         assert power_entry.get_cli_type() == int
-        assert bool_entry.get_cli_type() == bool 
\ No newline at end of file
+        assert bool_entry.get_cli_type() == bool
+
+    def test_cli_applies_only_explicit_options(self):
+        """Test that options the user didn't pass don't override values."""
+        class MyModel(Configence):
+            MY_HERO = configence.str("MY_HERO", 'Son Goku')
+            POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+
+        my_config = MyModel()
+        # changed after load (e.g. in on_load) - must not be reset to the CLI default
+        my_config.MY_HERO = "Vegeta"
+
+        seen = {}
+
+        def on_start(ctx, **kwargs):
+            seen["ctx"] = ctx
+
+        cli_object = my_config.get_cli_object(on_start=on_start)
+        result = CliRunner().invoke(cli_object, ["--power-level", "8000"])
+        assert result.exit_code == 0, result.output
+        assert my_config.POWER_LEVEL == 8000
+        assert my_config.MY_HERO == "Vegeta"
+        assert my_config.cli_overrides == {"POWER_LEVEL": 8000}
+        assert seen["ctx"].meta[CLI_OVERRIDES_META_KEY] == {"POWER_LEVEL": 8000}
+
+    def test_cli_env_overrides(self):
+        """Test that env-var parameter sources are applied."""
+        class MyModel(Configence):
+            POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+
+        my_config = MyModel()
+        cli_object = my_config.get_cli_object()
+        result = CliRunner().invoke(
+            cli_object, [], env={"CLI_POWER_LEVEL": "42"}, auto_envvar_prefix="CLI"
+        )
+        assert result.exit_code == 0, result.output
+        assert my_config.POWER_LEVEL == 42
+        assert my_config.cli_overrides == {"POWER_LEVEL": 42}
+
+    def test_cli_passes_cast_defaults_through(self):
+        """Test that already cast defaults are not cast again."""
+        class Character(BaseModel):
+            name: str
+
+        class MyModel(Configence):
+            CHARACTER = configence.model("CHARACTER", Character, {"name": "Goku"})
+
+        my_config = MyModel()
+        loaded = my_config.CHARACTER
+        with patch.object(Character, "model_validate") as validate:
+            cli_object = my_config.get_cli_object()
+            result = CliRunner().invoke(cli_object, [])
+        assert result.exit_code == 0, result.output
+        validate.assert_not_called()
+        assert my_config.CHARACTER is loaded
+        assert my_config.cli_overrides == {}
+
+        result = CliRunner().invoke(my_config.get_cli_object(), ["--character", '{"name": "Gohan"}'])
+        assert result.exit_code == 0, result.output
+        assert my_config.CHARACTER == Character(name="Gohan")
@@ -0,0 +1,125 @@
+import importlib.util
+import os
+import time
+import pytest
+from enum import Enum
+from pydantic import BaseModel
+from typer.testing import CliRunner
+from configence import Configence, MappingSource, configence
+from configence.__main__ import app
+from configence.compiler import compile_model
+
+
+class Color(Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+class Character(BaseModel):
+    name: str
+
+
+class CompiledSourceModel(Configence):
+    MY_HERO = configence.str("MY_HERO", "Son Goku")
+    POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+    SPEED = configence.float("SPEED", "1.5")
+    IS_STRONG = configence.bool("IS_STRONG", True)
+    COLOR = configence.enum("COLOR", Color, Color.RED)
+    CHARACTER = configence.model("CHARACTER", Character, {"name": "Goku"})
+    EVENTS = configence.list("EVENTS", "a,b")
+    SHOUT = configence.delay("{MY_HERO} is over {POWER_LEVEL}")
+    UPPER = configence.delay(lambda MY_HERO=None: MY_HERO.upper())
+    LATER = configence.str("LATER", configence.delay("{SHOUT}!"))
+
+
+class RequiredModel(Configence):
+    POWER_LEVEL = configence.int("POWER_LEVEL")
+
+
+def load_compiled(tmp_path, model_cls, name="compiled_settings"):
+    path = tmp_path / f"{name}.py"
+    path.write_text(compile_model(model_cls))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, model_cls.__name__)
+
+
+def values_of(instance):
+    return {name: getattr(instance, name) for name, _ in CompiledSourceModel._schema()}
+
+
+class TestCompiler:
+    """Test compiled config classes."""
+
+    @pytest.mark.parametrize(
+        "mapping",
+        [
+            {},
+            {"MY_HERO": "Vegeta", "POWER_LEVEL": "8000", "IS_STRONG": "false", "COLOR": "BLUE"},
+            {"CHARACTER": '{"name": "Gohan"}', "EVENTS": "x, y", "SPEED": 2.5, "LATER": "now"},
+            {"SHOUT": "kamehameha", "POWER_LEVEL": 1},
+        ],
+    )
+    def test_identical_values(self, tmp_path, mapping):
+        """Test that compiled classes load the same values as the dynamic path."""
+        Compiled = load_compiled(tmp_path, CompiledSourceModel)
+        compiled = Compiled(sources=MappingSource(mapping))
+        assert values_of(compiled) == values_of(CompiledSourceModel.from_mapping(mapping))
+        assert not hasattr(compiled, "__dict__")
+
+    def test_env_vars_and_prefix(self, tmp_path):
+        """Test reading env-vars with a prefix."""
+        Compiled = load_compiled(tmp_path, CompiledSourceModel, "compiled_prefixed")
+        os.environ["DBZ_MY_HERO"] = "Vegeta"
+        assert values_of(Compiled(prefix="DBZ_")) == values_of(CompiledSourceModel(prefix="DBZ_"))
+        assert Compiled(prefix="DBZ_").SHOUT == "Vegeta is over 9001"
+
+        # Cleanup
+        del os.environ["DBZ_MY_HERO"]
+
+    def test_required(self, tmp_path):
+        """Test missing required values."""
+        Compiled = load_compiled(tmp_path, RequiredModel, "compiled_required")
+        with pytest.raises(Exception) as err:
+            Compiled(sources=MappingSource({}))
+        assert type(err.value).__name__ == "UndefinedValueError"
+        assert Compiled(sources=MappingSource({"POWER_LEVEL": "3"})).POWER_LEVEL == 3
+
+    def test_not_compilable(self):
+        """Test classes which can't be compiled."""
+
+        class LocalModel(Configence):
+            MY_HERO = configence.str("MY_HERO", "Son Goku")
+
+        with pytest.raises(ValueError):
+            compile_model(LocalModel)
+
+    def test_cli(self, tmp_path):
+        """Test the compile command."""
+        output = tmp_path / "out.py"
+        result = CliRunner().invoke(
+            app, ["compile", "tests.test_compiler:CompiledSourceModel", "-o", str(output)]
+        )
+        assert result.exit_code == 0, result.output
+        assert "__slots__" in output.read_text()
+
+    @pytest.mark.slow
+    def test_construction_benchmark(self, tmp_path):
+        """Benchmark constructing compiled vs dynamic instances."""
+        Compiled = load_compiled(tmp_path, CompiledSourceModel, "compiled_benchmark")
+        sources = MappingSource({"MY_HERO": "Vegeta", "POWER_LEVEL": "8000"})
+        count = 10_000
+
+        start = time.perf_counter()
+        for _ in range(count):
+            CompiledSourceModel(sources=sources)
+        dynamic = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(count):
+            Compiled(sources=sources)
+        compiled = time.perf_counter() - start
+
+        print(f"\ndynamic: {dynamic / count * 1e6:.1f}us, compiled: {compiled / count * 1e6:.1f}us")
+        assert compiled < dynamic
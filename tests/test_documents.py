@@ -0,0 +1,198 @@
+import json
+import os
+import pytest
+from enum import IntEnum
+from pydantic import BaseModel
+from typing import List
+from configence import ConfigDocument, Configence, configence
+from configence.sources import resolve_pointer
+
+
+class Database(BaseModel):
+    host: str
+    port: int
+
+
+class Cache(BaseModel):
+    urls: List[str]
+
+
+class Priority(IntEnum):
+    LOW = 1
+    HIGH = 2
+
+
+DOCUMENT = {
+    "db": {"host": "db.local", "port": 5432},
+    "cache": {"urls": ["redis://a", "redis://b"]},
+    "workers": 4,
+    "a/b": {"~tilde": "escaped"},
+}
+
+
+def counting(document: ConfigDocument):
+    """Wrap the document parser with a call counter."""
+    calls = []
+    parse = document._parse
+
+    def counted_parse(raw):
+        calls.append(raw)
+        return parse(raw)
+
+    document._parse = counted_parse
+    return calls
+
+
+class TestDocuments:
+    """Test shared parsed-document sources."""
+
+    def test_resolve_pointer(self):
+        """Test JSON pointer resolution."""
+        assert resolve_pointer(DOCUMENT, "") is DOCUMENT
+        assert resolve_pointer(DOCUMENT, "/db/port") == 5432
+        assert resolve_pointer(DOCUMENT, "/cache/urls/1") == "redis://b"
+        assert resolve_pointer(DOCUMENT, "/a~1b/~0tilde") == "escaped"
+        assert resolve_pointer(DOCUMENT, "/missing", None) is None
+        with pytest.raises(KeyError):
+            resolve_pointer(DOCUMENT, "/db/missing")
+        with pytest.raises(ValueError):
+            resolve_pointer(DOCUMENT, "db")
+
+    def test_document_parsed_once(self):
+        """Test that many entries share a single parse of the document."""
+        document = ConfigDocument(text=json.dumps(DOCUMENT))
+        calls = counting(document)
+
+        class MyModel(Configence):
+            DB = configence.model("DB", Database, document=document, pointer="/db")
+            CACHE = configence.model("CACHE", Cache, document=document, pointer="/cache")
+            WORKERS = configence.int("WORKERS", 1, document=document, pointer="/workers")
+
+        first = MyModel()
+        second = MyModel()
+        assert first.DB == Database(host="db.local", port=5432)
+        assert first.CACHE.urls == ["redis://a", "redis://b"]
+        assert first.WORKERS == 4
+        assert second.DB == first.DB
+        assert len(calls) == 1
+
+    def test_document_from_env(self):
+        """Test a document read from an env-var, reparsed only on change."""
+        document = ConfigDocument(env="APP_DOCUMENT")
+        calls = counting(document)
+
+        class MyModel(Configence):
+            DB = configence.model(
+                "DB",
+                Database,
+                {"host": "localhost", "port": 1},
+                document=document,
+                pointer="/db",
+            )
+
+        # missing document - fall back to the default
+        assert MyModel().DB.host == "localhost"
+
+        os.environ["APP_DOCUMENT"] = json.dumps(DOCUMENT)
+        assert MyModel().DB.host == "db.local"
+        assert MyModel().DB.port == 5432
+        assert len(calls) == 1
+
+        os.environ["APP_DOCUMENT"] = json.dumps({"db": {"host": "other", "port": 2}})
+        assert MyModel().DB.host == "other"
+        assert len(calls) == 2
+
+        # Cleanup
+        del os.environ["APP_DOCUMENT"]
+
+    def test_document_from_instance_sources(self):
+        """Test that env-var documents are read from the instance's sources."""
+        document = ConfigDocument(env="APP_DOCUMENT")
+
+        class MyModel(Configence):
+            DB = configence.model(
+                "DB",
+                Database,
+                {"host": "localhost", "port": 1},
+                document=document,
+                pointer="/db",
+            )
+
+        os.environ["APP_DOCUMENT"] = json.dumps({"db": {"host": "env.local", "port": 2}})
+        my_config = MyModel.from_mapping({"APP_DOCUMENT": json.dumps(DOCUMENT)})
+        assert my_config.DB.host == "db.local"
+        assert MyModel.from_mapping({}).DB.host == "localhost"
+        assert MyModel().DB.host == "env.local"
+
+        # Cleanup
+        del os.environ["APP_DOCUMENT"]
+
+    def test_scalar_values_are_cast(self):
+        """Test that non-string document values are cast by their entries."""
+        document = ConfigDocument(text='{"pri": 2, "name": 42, "ratio": 1, "flag": 1, "workers": "4", "none": null}')
+
+        class MyModel(Configence):
+            PRI = configence.enum("PRI", Priority, Priority.LOW, document=document, pointer="/pri")
+            NAME = configence.str("NAME", document=document, pointer="/name")
+            RATIO = configence.float("RATIO", document=document, pointer="/ratio")
+            FLAG = configence.bool("FLAG", False, document=document, pointer="/flag")
+            WORKERS = configence.int("WORKERS", document=document, pointer="/workers")
+            NONE = configence.int("NONE", 3, document=document, pointer="/none")
+
+        my_config = MyModel()
+        assert my_config.PRI is Priority.HIGH
+        assert my_config.NAME == "42"
+        assert my_config.RATIO == 1.0 and isinstance(my_config.RATIO, float)
+        assert my_config.FLAG is True
+        assert my_config.WORKERS == 4
+        # null falls back to the entry's default
+        assert my_config.NONE == 3
+
+    def test_env_var_overrides_document(self):
+        """Test that the entry's own env-var still takes precedence."""
+        document = ConfigDocument(text=json.dumps(DOCUMENT))
+
+        class MyModel(Configence):
+            DB = configence.model("DB", Database, document=document, pointer="/db")
+            WORKERS = configence.int("WORKERS", document=document, pointer="/workers")
+
+        os.environ["DB"] = '{"host": "env.local", "port": 1}'
+        my_config = MyModel()
+        assert my_config.DB.host == "env.local"
+        assert my_config.WORKERS == 4
+
+        # Cleanup
+        del os.environ["DB"]
+
+    def test_document_file(self, tmp_path):
+        """Test YAML and JSON document files, reparsed when changed."""
+        yaml_path = tmp_path / "config.yaml"
+        yaml_path.write_text("db:\n  host: yaml.local\n  port: 3306\n")
+        document = ConfigDocument(path=str(yaml_path))
+        calls = counting(document)
+
+        configence = Configence(is_model=False)
+        result = configence.model("DB", Database, document=document, pointer="/db")
+        assert result == Database(host="yaml.local", port=3306)
+        configence.model("DB", Database, document=document, pointer="/db")
+        assert len(calls) == 1
+
+        yaml_path.write_text("db:\n  host: changed.local\n  port: 3307\n")
+        result = configence.model("DB", Database, document=document, pointer="/db")
+        assert result.host == "changed.local"
+
+        json_path = tmp_path / "config.json"
+        json_path.write_text(json.dumps(DOCUMENT))
+        document = ConfigDocument(path=str(json_path))
+        assert document.format == "json"
+        # the pointer defaults to the entry's key
+        assert configence.int("workers", document=document) == 4
+
+    def test_document_requires_single_source(self):
+        """Test document argument validation."""
+        with pytest.raises(ValueError):
+            ConfigDocument()
+        with pytest.raises(ValueError):
+            ConfigDocument(env="A", text="{}")
+        with pytest.raises(ValueError):
+            ConfigDocument(text="{}", format="xml")
@@ -0,0 +1,102 @@
+import os
+import timeit
+import pytest
+from enum import Enum, IntEnum
+from click.testing import CliRunner
+from configence import Configence, configence
+from configence.configence import cast_enum
+
+
+class PowerLevel(Enum):
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+
+
+class Priority(IntEnum):
+    MINOR = 1
+    MAJOR = 2
+
+
+class TestEnums:
+    """Test enum parsing via precomputed lookup tables."""
+
+    def test_enum_by_value_and_name(self):
+        """Test parsing enums by value or by name."""
+        configence = Configence(is_model=False)
+
+        os.environ["POWER"] = "high"
+        assert configence.enum("POWER", PowerLevel) is PowerLevel.HIGH
+        os.environ["POWER"] = "HIGH"
+        assert configence.enum("POWER", PowerLevel) is PowerLevel.HIGH
+
+        os.environ["PRIORITY"] = "2"
+        assert configence.enum("PRIORITY", Priority) is Priority.MAJOR
+        os.environ["PRIORITY"] = "MINOR"
+        assert configence.enum("PRIORITY", Priority) is Priority.MINOR
+
+        # Cleanup
+        del os.environ["POWER"]
+        del os.environ["PRIORITY"]
+
+    def test_enum_default(self):
+        """Test enum members and raw values as defaults."""
+        configence = Configence(is_model=False)
+
+        assert configence.enum("POWER", PowerLevel, PowerLevel.LOW) is PowerLevel.LOW
+        assert configence.enum("POWER", PowerLevel, "medium") is PowerLevel.MEDIUM
+
+    def test_enum_case_insensitive(self):
+        """Test optional case insensitive parsing."""
+        configence = Configence(is_model=False)
+
+        os.environ["POWER"] = "Medium"
+        with pytest.raises(ValueError):
+            configence.enum("POWER", PowerLevel)
+        result = configence.enum("POWER", PowerLevel, case_sensitive=False)
+        assert result is PowerLevel.MEDIUM
+
+        # Cleanup
+        del os.environ["POWER"]
+
+    def test_enum_error_lists_choices(self):
+        """Test that invalid values report the valid choices."""
+        cast = cast_enum(PowerLevel)
+        with pytest.raises(ValueError) as err:
+            cast("over 9000")
+        message = str(err.value)
+        assert "PowerLevel" in message
+        for choice in ("'low' (LOW)", "'medium' (MEDIUM)", "'high' (HIGH)"):
+            assert choice in message
+
+    def test_lookup_table_is_cached(self):
+        """Test that the lookup table is built once per enum."""
+        assert cast_enum(PowerLevel) is cast_enum(PowerLevel)
+        assert cast_enum(PowerLevel) is not cast_enum(PowerLevel, False)
+
+    def test_enum_cli(self):
+        """Test that the CLI parses enums the same way."""
+        class MyModel(Configence):
+            POWER = configence.enum("POWER", PowerLevel, PowerLevel.LOW)
+
+        my_config = MyModel()
+        assert my_config._entries["POWER"].get_cli_type()("HIGH") is PowerLevel.HIGH
+
+        result = CliRunner().invoke(my_config.get_cli_object(), ["--power", "medium"])
+        assert result.exit_code == 0, result.output
+        assert my_config.POWER is PowerLevel.MEDIUM
+
+    @pytest.mark.slow
+    def test_enum_benchmark(self):
+        """Micro-benchmark the lookup table against EnumMeta.__call__."""
+        cast = cast_enum(PowerLevel)
+        number = 200_000
+        table_time = min(timeit.repeat(lambda: cast("high"), number=number, repeat=3))
+        enum_time = min(
+            timeit.repeat(lambda: PowerLevel("high"), number=number, repeat=3)
+        )
+        print(
+            f"\nenum lookup table: {table_time / number * 1e9:.0f}ns/parse, "
+            f"EnumMeta.__call__: {enum_time / number * 1e9:.0f}ns/parse"
+        )
+        assert table_time < enum_time * 1.5
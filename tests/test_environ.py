@@ -0,0 +1,146 @@
+import os
+import pytest
+from enum import Enum
+from pydantic import BaseModel
+from configence import Configence, EnvFile, SourceStack, configence
+
+
+class PowerLevel(Enum):
+    LOW = "low"
+    HIGH = "high"
+
+
+class Character(BaseModel):
+    name: str
+    friends: list = []
+
+
+class MyModel(Configence):
+    MY_HERO = configence.str("MY_HERO", "Son Goku")
+    POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+    RATIO = configence.float("RATIO", 0.5)
+    FLYING = configence.bool("FLYING", True)
+    POWER = configence.enum("POWER", PowerLevel, PowerLevel.LOW)
+    EVENTS = configence.list("EVENTS", ["a", "b"])
+    CHARACTER = configence.model("CHARACTER", Character, {"name": "Goku"})
+    HOSTS = configence.globs("HOSTS", "*.example.com,localhost")
+    NETWORKS = configence.cidrs("NETWORKS", "10.0.0.0/8,192.168.0.0/16")
+    ROUTES = configence.regex("ROUTES", [r"^/api/v\d+/", r"^/health$"], delimiter=";")
+
+
+def load_env_file(path, **kwargs):
+    return MyModel(sources=SourceStack(EnvFile(path, required=True)), **kwargs)
+
+
+class TestToEnviron:
+    """Test serializing values back into env-vars."""
+
+    def test_serialized_values(self):
+        """Test that each value is serialized into the format its entry parses."""
+        environ = MyModel().to_environ()
+        assert environ["MY_HERO"] == "Son Goku"
+        assert environ["POWER_LEVEL"] == "9001"
+        assert environ["RATIO"] == "0.5"
+        assert environ["FLYING"] == "true"
+        assert environ["POWER"] == "low"
+        assert environ["EVENTS"] == "a,b"
+        assert environ["CHARACTER"] == '{"name":"Goku","friends":[]}'
+        assert environ["HOSTS"] == "*.example.com,localhost"
+        assert environ["NETWORKS"] == "10.0.0.0/8,192.168.0.0/16"
+        assert environ["ROUTES"] == r"^/api/v\d+/;^/health$"
+
+    def test_prefix(self):
+        """Test that keys take the instance's prefix, or the given one."""
+        os.environ["APP_MY_HERO"] = "Vegeta"
+        my_config = MyModel(prefix="APP_")
+        assert my_config.to_environ()["APP_MY_HERO"] == "Vegeta"
+        assert my_config.to_environ(prefix="OTHER_")["OTHER_MY_HERO"] == "Vegeta"
+        assert "MY_HERO" not in my_config.to_environ()
+
+        # Cleanup
+        del os.environ["APP_MY_HERO"]
+
+    def test_serialized_once(self):
+        """Test that only changed values are serialized again."""
+        my_config = MyModel()
+        my_config.to_environ()
+        serialized = dict(my_config._environ_values)
+        my_config.POWER_LEVEL = 42
+        assert "POWER_LEVEL" not in my_config._environ_values
+        assert my_config._environ_values["CHARACTER"] is serialized["CHARACTER"]
+        assert my_config.to_environ()["POWER_LEVEL"] == "42"
+        assert my_config._environ_values["CHARACTER"] is serialized["CHARACTER"]
+
+    def test_returns_copies(self):
+        """Test that changing a returned dict doesn't affect the cache."""
+        my_config = MyModel()
+        my_config.to_environ()["MY_HERO"] = "Vegeta"
+        assert my_config.to_environ()["MY_HERO"] == "Son Goku"
+
+    def test_replace(self):
+        """Test that replaced copies serialize their own values."""
+        my_config = MyModel()
+        my_config.to_environ()
+        changed = my_config.replace(MY_HERO="Vegeta")
+        assert changed.to_environ()["MY_HERO"] == "Vegeta"
+        assert my_config.to_environ()["MY_HERO"] == "Son Goku"
+
+
+class TestEnvFile:
+    """Test writing .env files which load back into the same values."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that a written .env file loads into equal values."""
+        my_config = MyModel.from_mapping(
+            {
+                "MY_HERO": "  'Vegeta'  ",
+                "POWER_LEVEL": "-3",
+                "FLYING": "false",
+                "POWER": "high",
+                "EVENTS": ["a,b", 'say "hi"', "#1", "back\\slash"],
+                "CHARACTER": {"name": "Gohan", "friends": ["Videl", "Piccolo"]},
+                "HOSTS": "*.dragon.ball",
+                "NETWORKS": "::1/128",
+            }
+        )
+        path = str(tmp_path / ".env")
+        my_config.write_env_file(path)
+        loaded = load_env_file(path)
+        for name, entry in my_config.entries.items():
+            value = getattr(loaded, name)
+            if name in ("HOSTS", "NETWORKS"):
+                assert str(value) == str(entry.value)
+            else:
+                assert value == entry.value
+
+    def test_round_trip_patterns(self, tmp_path):
+        """Test round-tripping regex entries with one or several patterns."""
+        path = str(tmp_path / ".env")
+        for patterns in ([r"^/a,b\d$"], [r"^/api/v\d+/", r"(?i)^/health$"], [r"[\"']"], []):
+            my_config = MyModel().replace(ROUTES=patterns)
+            my_config.write_env_file(path)
+            assert load_env_file(path).ROUTES == my_config.ROUTES
+        # patterns which wouldn't load back into the same patterns
+        with pytest.raises(ValueError, match="delimiter"):
+            MyModel().replace(ROUTES=["a;b"]).to_environ()
+
+        class SingleModel(Configence):
+            ROUTE = configence.regex("ROUTE", r'["a"]')
+
+        assert SingleModel().to_environ() == {"ROUTE": '["a"]'}
+        assert SingleModel.from_mapping(SingleModel().to_environ()).ROUTE.patterns == ('["a"]',)
+        with pytest.raises(ValueError, match="set a delimiter"):
+            SingleModel().replace(ROUTE=["a", "b"]).to_environ()
+
+    def test_round_trip_with_prefix(self, tmp_path):
+        """Test round-tripping a prefixed config."""
+        my_config = MyModel(prefix="APP_").replace(MY_HERO="Trunks")
+        path = str(tmp_path / ".env")
+        my_config.write_env_file(path)
+        assert load_env_file(path, prefix="APP_").MY_HERO == "Trunks"
+
+    def test_multi_line_values(self, tmp_path):
+        """Test that values which can't be written are rejected."""
+        my_config = MyModel().replace(MY_HERO="Son\nGoku")
+        with pytest.raises(ValueError, match="MY_HERO"):
+            my_config.write_env_file(str(tmp_path / ".env"))
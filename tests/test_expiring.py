@@ -0,0 +1,183 @@
+import gc
+import time
+import pytest
+from configence import Configence, EnvFile, SourceStack, configence
+from configence.expiring import get_refresh_scheduler
+
+
+class TokenService:
+    """A stub issuing numbered tokens (failing on demand)."""
+
+    def __init__(self) -> None:
+        self.issued = 0
+        self.failing = False
+
+    def fetch(self, reference):
+        if self.failing:
+            raise ConnectionError("token service is down")
+        self.issued += 1
+        return f"{reference}-token-{self.issued}"
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture(autouse=True)
+def clear_refreshers():
+    yield
+    get_refresh_scheduler().clear()
+
+
+class TestExpiring:
+    """Test expiring entries refreshed in the background."""
+
+    def test_fetched_on_load(self):
+        """Test that the value is fetched from the raw value."""
+        service = TokenService()
+
+        class MyModel(Configence):
+            TOKEN = configence.expiring("TOKEN", service.fetch, ttl=60, default="api")
+            HEADER = configence.delay("Bearer {TOKEN}")
+
+        my_config = MyModel()
+        assert my_config.TOKEN == "api-token-1"
+        assert my_config.HEADER == "Bearer api-token-1"
+        assert MyModel.from_mapping({"TOKEN": "db"}).TOKEN == "db-token-2"
+
+    def test_delays_see_fetched_objects(self):
+        """Test that delays reading attributes of fetched values are evaluated once fetched."""
+
+        class Token:
+            def __init__(self, reference) -> None:
+                self.header = f"Bearer {reference}"
+
+        class MyModel(Configence):
+            TOKEN = configence.expiring("TOKEN", Token, ttl=60, default="api")
+            AUTH = configence.delay(lambda TOKEN=None: {"Authorization": TOKEN.header})
+
+        assert MyModel().AUTH == {"Authorization": "Bearer api"}
+
+    def test_background_refresh(self):
+        """Test that values are refreshed before they expire."""
+        service = TokenService()
+
+        class MyModel(Configence):
+            HISTORY_SIZE = 5
+            TOKEN = configence.expiring("TOKEN", service.fetch, ttl=0.1, default="api")
+
+        my_config = MyModel()
+        assert wait_for(lambda: my_config.TOKEN != "api-token-1")
+        assert my_config.entries["TOKEN"].value == my_config.TOKEN
+        assert my_config.history[-1].reason == "refresh"
+
+    def test_coalesced(self):
+        """Test that instances reading the same raw value share its fetches."""
+        service = TokenService()
+
+        class MyModel(Configence):
+            TOKEN = configence.expiring("TOKEN", service.fetch, ttl=60, default="api")
+
+        first, second = MyModel(), MyModel()
+        assert service.issued == 1
+        assert first.TOKEN == second.TOKEN == "api-token-1"
+        assert first.refresh() == {"TOKEN": True}
+        assert service.issued == 2
+        assert first.TOKEN == second.TOKEN == "api-token-2"
+
+    def test_failures_keep_last_good_value(self):
+        """Test that failed refreshes keep the last good value."""
+        service = TokenService()
+
+        class MyModel(Configence):
+            TOKEN = configence.expiring("TOKEN", service.fetch, ttl=60, default="api")
+
+        my_config = MyModel()
+        service.failing = True
+        assert my_config.refresh("TOKEN") == {"TOKEN": False}
+        assert my_config.TOKEN == "api-token-1"
+        assert isinstance(my_config._refreshers["TOKEN"].last_error, ConnectionError)
+        service.failing = False
+        assert my_config.refresh("TOKEN") == {"TOKEN": True}
+        assert my_config.TOKEN == "api-token-2"
+
+    def test_first_fetch_failure(self):
+        """Test that failing to fetch the first value fails the load."""
+        service = TokenService()
+        service.failing = True
+
+        class MyModel(Configence):
+            TOKEN = configence.expiring("TOKEN", service.fetch, ttl=60, default="api")
+
+        with pytest.raises(ConnectionError):
+            MyModel()
+
+    def test_set_values_are_kept(self):
+        """Test that refreshes don't override values set since."""
+        service = TokenService()
+
+        class MyModel(Configence):
+            TOKEN = configence.expiring("TOKEN", service.fetch, ttl=60, default="api")
+
+        my_config = MyModel()
+        my_config.TOKEN = "manual"
+        my_config.refresh()
+        assert my_config.TOKEN == "manual"
+
+    def test_replace(self):
+        """Test that replaced copies subscribe to the shared values."""
+        service = TokenService()
+
+        class MyModel(Configence):
+            TOKEN = configence.expiring("TOKEN", service.fetch, ttl=60, default="api")
+
+        my_config = MyModel()
+        clone = my_config.replace()
+        other = my_config.replace(TOKEN="db")
+        assert other.TOKEN == "db-token-2"
+        my_config.refresh()
+        assert clone.TOKEN == "api-token-3"
+        assert other.TOKEN == "db-token-2"
+
+    def test_to_environ(self, tmp_path):
+        """Test that the raw values are serialized - and not the fetched ones."""
+        service = TokenService()
+
+        class MyModel(Configence):
+            TOKEN = configence.expiring("TOKEN", service.fetch, ttl=60, default="api")
+
+        my_config = MyModel.from_mapping({"TOKEN": "ref"})
+        assert my_config.to_environ() == {"TOKEN": "ref"}
+        my_config.refresh()
+        assert my_config.TOKEN == "ref-token-2"
+        assert my_config.to_environ() == {"TOKEN": "ref"}
+
+        path = tmp_path / ".env"
+        my_config.write_env_file(str(path))
+        loaded = MyModel(sources=SourceStack(EnvFile(str(path), required=True)))
+        # the shared value of the same reference
+        assert loaded.TOKEN == "ref-token-2"
+        assert service.issued == 2
+
+        # values set otherwise are left out
+        my_config.TOKEN = "manual"
+        assert my_config.to_environ() == {}
+
+    def test_dropped_with_instances(self):
+        """Test that values are not refreshed once no instance reads them."""
+        service = TokenService()
+
+        class MyModel(Configence):
+            TOKEN = configence.expiring("TOKEN", service.fetch, ttl=0.05, default="api")
+
+        MyModel()
+        gc.collect()
+        assert wait_for(lambda: len(get_refresh_scheduler()) == 0)
+        issued = service.issued
+        time.sleep(0.1)
+        assert service.issued == issued
@@ -0,0 +1,83 @@
+import os
+from enum import Enum
+from click.testing import CliRunner
+from pydantic import BaseModel
+from configence import Configence, configence
+from configence.fingerprint import combine, entry_digest, stable_repr
+
+
+class PowerLevel(Enum):
+    LOW = "low"
+    HIGH = "high"
+
+
+class Character(BaseModel):
+    name: str
+
+
+class MyModel(Configence):
+    MY_HERO = configence.str("MY_HERO", "Son Goku")
+    POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+    POWER = configence.enum("POWER", PowerLevel, PowerLevel.LOW)
+    EVENTS = configence.list("EVENTS", ["a", "b"])
+    CHARACTER = configence.model("CHARACTER", Character, {"name": "Goku"})
+
+
+class TestFingerprint:
+    """Test incremental config fingerprints."""
+
+    def test_stable_across_instances(self):
+        """Test that equal configs have equal fingerprints."""
+        assert MyModel().fingerprint() == MyModel().fingerprint()
+        assert len(MyModel().fingerprint()) == 32
+
+        os.environ["MY_HERO"] = "Vegeta"
+        assert MyModel().fingerprint() != MyModel.from_mapping({}).fingerprint()
+
+        # Cleanup
+        del os.environ["MY_HERO"]
+
+    def test_incremental_updates(self):
+        """Test that the fingerprint follows attribute changes."""
+        my_config = MyModel()
+        original = my_config.fingerprint()
+        my_config.POWER = PowerLevel.HIGH
+        changed = my_config.fingerprint()
+        assert changed != original
+        assert changed == MyModel.from_mapping({"POWER": "high"}).fingerprint()
+        my_config.POWER = PowerLevel.LOW
+        assert my_config.fingerprint() == original
+
+    def test_matches_full_computation(self):
+        """Test the incremental digest against a full recomputation."""
+        my_config = MyModel()
+        my_config.fingerprint()
+        my_config.CHARACTER = Character(name="Gohan")
+        my_config.EVENTS = ["c"]
+        expected = combine(
+            entry_digest(name, entry.value) for name, entry in my_config.entries.items()
+        )
+        assert my_config.fingerprint() == f"{expected:032x}"
+
+    def test_order_independent(self):
+        """Test that the combination doesn't depend on entry order."""
+        digests = [entry_digest(f"K{i}", i) for i in range(10)]
+        assert combine(digests) == combine(reversed(digests))
+
+    def test_sets_sorted(self):
+        """Test that sets are serialized in sorted (hash seed independent) order."""
+        assert stable_repr({"b", "c", "a"}) == 'j:["s:a", "s:b", "s:c"]'
+        assert stable_repr(frozenset({2, 1})) == stable_repr({1, 2})
+        assert entry_digest("TAGS", {"x", "y"}) == entry_digest("TAGS", frozenset({"y", "x"}))
+
+    def test_cli_and_replace(self):
+        """Test fingerprints after CLI overrides and replace()."""
+        my_config = MyModel()
+        original = my_config.fingerprint()
+        clone = my_config.replace(POWER_LEVEL="1")
+        assert clone.fingerprint() == MyModel.from_mapping({"POWER_LEVEL": 1}).fingerprint()
+        assert my_config.fingerprint() == original
+
+        result = CliRunner().invoke(my_config.get_cli_object(), ["--power-level", "1"])
+        assert result.exit_code == 0, result.output
+        assert my_config.fingerprint() == clone.fingerprint()
@@ -0,0 +1,113 @@
+import os
+import time
+import pytest
+from configence import Configence, FeatureFlag, configence
+
+
+class FlagModel(Configence):
+    NEW_CHECKOUT = configence.flag("NEW_CHECKOUT")
+    DARK_MODE = configence.flag("DARK_MODE", "true")
+    ROLLOUT = configence.flag("ROLLOUT", "25%")
+    BETA = configence.flag(
+        "BETA",
+        '{"percentage": 10, "by": "user_id", "allow": {"tenant": ["acme"]}, "deny": {"country": ["xx"]}}',
+    )
+    PILOT = configence.flag("PILOT", {"allow": {"tenant": ["acme", 42]}})
+
+
+class TestFlags:
+    """Test feature-flag entries."""
+
+    def test_constant_flags(self):
+        """Test on / off flags."""
+        my_config = FlagModel()
+        assert isinstance(my_config.NEW_CHECKOUT, FeatureFlag)
+        assert not my_config.NEW_CHECKOUT.enabled({"user_id": "1"})
+        assert my_config.DARK_MODE.enabled()
+        assert my_config.DARK_MODE
+
+    def test_percentage(self):
+        """Test that percentages bucket contexts stably."""
+        flag = FlagModel().ROLLOUT
+        enabled = [flag.enabled({"id": str(user)}) for user in range(10000)]
+        assert 2200 < sum(enabled) < 2800
+        # stable across instances (and processes - crc32 isn't salted per process)
+        assert enabled == [FlagModel().ROLLOUT.enabled(str(user)) for user in range(10000)]
+        assert flag.enabled("7") == (flag.bucket("7") < 2500)
+        assert not flag.enabled({})
+
+    def test_salted_by_key(self):
+        """Test that flags roll out to different contexts."""
+        first = FeatureFlag("50%", salt="FIRST")
+        second = FeatureFlag("50%", salt="SECOND")
+        users = [str(user) for user in range(1000)]
+        assert [first.enabled(user) for user in users] != [second.enabled(user) for user in users]
+
+    def test_raising_percentage_keeps_users(self):
+        """Test that raising the percentage only adds contexts."""
+        low = FeatureFlag("10%", salt="FLAG")
+        high = FeatureFlag("30%", salt="FLAG")
+        for user in range(2000):
+            if low.enabled(user):
+                assert high.enabled(user)
+
+    def test_allow_and_deny(self):
+        """Test allow / deny lists."""
+        flag = FlagModel().BETA
+        assert flag.enabled({"tenant": "acme", "user_id": "1"})
+        assert not flag.enabled({"tenant": "acme", "country": "xx"})
+        in_rollout = next(user for user in range(1000) if flag.bucket(user) < 1000)
+        assert flag.enabled({"tenant": "other", "user_id": in_rollout})
+        assert not flag.enabled({"tenant": "other", "user_id": in_rollout, "country": "xx"})
+
+        pilot = FlagModel().PILOT
+        assert pilot.enabled({"tenant": "acme"})
+        assert pilot.enabled({"tenant": "42"})
+        assert pilot.enabled({"tenant": 42})
+        assert not pilot.enabled({"tenant": "other"})
+
+    def test_from_env(self):
+        """Test flags from env-vars."""
+        os.environ["NEW_CHECKOUT"] = "on"
+        os.environ["ROLLOUT"] = '{"enabled": false, "percentage": 100}'
+        my_config = FlagModel()
+        assert my_config.NEW_CHECKOUT.enabled({})
+        assert not my_config.ROLLOUT.enabled("1")
+
+        # Cleanup
+        del os.environ["NEW_CHECKOUT"]
+        del os.environ["ROLLOUT"]
+
+    def test_invalid_definitions(self):
+        """Test that invalid definitions fail loading."""
+        for definition in ["maybe", "150%", '{"percent": 5}']:
+            with pytest.raises(ValueError):
+                FlagModel.from_mapping({"ROLLOUT": definition})
+
+    def test_round_trip(self):
+        """Test that definitions serialize back into equal flags."""
+        my_config = FlagModel()
+        environ = my_config.to_environ()
+        assert environ["ROLLOUT"] == '{"percentage":25.0}'
+        loaded = FlagModel.from_mapping(environ)
+        for name in ["NEW_CHECKOUT", "DARK_MODE", "ROLLOUT", "BETA", "PILOT"]:
+            assert getattr(loaded, name) == getattr(my_config, name)
+
+    @pytest.mark.slow
+    def test_evaluation_benchmark(self):
+        """Benchmark flag evaluations."""
+        my_config = FlagModel()
+        contexts = [{"tenant": "other", "id": str(user), "user_id": str(user)} for user in range(1000)]
+        rounds = 1000
+
+        rates = {}
+        for name in ["DARK_MODE", "ROLLOUT", "BETA"]:
+            enabled = getattr(my_config, name).enabled
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for context in contexts:
+                    enabled(context)
+            rates[name] = rounds * len(contexts) / (time.perf_counter() - start)
+
+        print("\n" + ", ".join(f"{name}: {rate / 1e6:.2f}M/s" for name, rate in rates.items()))
+        assert rates["BETA"] > 200_000
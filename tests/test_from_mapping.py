@@ -0,0 +1,123 @@
+import os
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from pydantic import BaseModel
+from configence import Configence, configence
+
+
+class PowerLevel(Enum):
+    LOW = "low"
+    HIGH = "high"
+
+
+class Character(BaseModel):
+    name: str
+
+
+class MyModel(Configence):
+    MY_HERO = configence.str("MY_HERO", "Son Goku")
+    POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+    IS_STRONG = configence.bool("IS_STRONG", False)
+    EVENTS = configence.list("EVENTS", [])
+    POWER = configence.enum("POWER", PowerLevel, PowerLevel.LOW)
+    CHARACTER = configence.model("CHARACTER", Character, {"name": "Goku"})
+    SHOUT = configence.delay("{MY_HERO} is over {POWER_LEVEL}")
+
+
+class TestFromMapping:
+    """Test constructing instances from mappings."""
+
+    def test_raw_strings(self):
+        """Test a mapping of raw strings."""
+        my_config = MyModel.from_mapping(
+            {
+                "MY_HERO": "Vegeta",
+                "POWER_LEVEL": "8000",
+                "IS_STRONG": "true",
+                "EVENTS": "a,b",
+                "POWER": "high",
+                "CHARACTER": '{"name": "Gohan"}',
+            }
+        )
+        assert my_config.MY_HERO == "Vegeta"
+        assert my_config.POWER_LEVEL == 8000
+        assert my_config.IS_STRONG is True
+        assert my_config.EVENTS == ["a", "b"]
+        assert my_config.POWER is PowerLevel.HIGH
+        assert my_config.CHARACTER == Character(name="Gohan")
+        assert my_config.SHOUT == "Vegeta is over 8000"
+
+    def test_typed_values(self):
+        """Test a mapping of already typed values."""
+        character = Character(name="Piccolo")
+        my_config = MyModel.from_mapping(
+            {
+                "POWER_LEVEL": 42,
+                "IS_STRONG": True,
+                "EVENTS": ["x", "y"],
+                "POWER": PowerLevel.HIGH,
+                "CHARACTER": character,
+            }
+        )
+        assert my_config.POWER_LEVEL == 42
+        assert my_config.IS_STRONG is True
+        assert my_config.EVENTS == ["x", "y"]
+        assert my_config.POWER is PowerLevel.HIGH
+        assert my_config.CHARACTER is character
+        # missing keys fall back to defaults
+        assert my_config.MY_HERO == "Son Goku"
+
+    def test_ignores_environment(self):
+        """Test that env-vars are not read."""
+        os.environ["MY_HERO"] = "Vegeta"
+        assert MyModel.from_mapping({}).MY_HERO == "Son Goku"
+        assert MyModel().MY_HERO == "Vegeta"
+
+        # Cleanup
+        del os.environ["MY_HERO"]
+
+    def test_prefix_and_custom_init(self):
+        """Test mapping keys with a prefix set by a custom __init__."""
+        class PrefixedModel(Configence):
+            def __init__(self):
+                super().__init__(prefix="NEW_")
+
+            MY_HERO = configence.str("MY_HERO", "Son Goku")
+
+        assert PrefixedModel.from_mapping({"NEW_MY_HERO": "Gohan"}).MY_HERO == "Gohan"
+
+    def test_instances_do_not_share_values(self):
+        """Test that entries hold per-instance values."""
+        first = MyModel.from_mapping({"MY_HERO": "Vegeta"})
+        second = MyModel.from_mapping({"MY_HERO": "Krillin"})
+        assert first.entries["MY_HERO"].value == "Vegeta"
+        assert second.entries["MY_HERO"].value == "Krillin"
+        assert "Vegeta" in repr(first)
+
+    def test_thread_safety(self):
+        """Test concurrent constructions from different mappings."""
+        def build(i):
+            my_config = MyModel.from_mapping({"MY_HERO": f"hero-{i}", "POWER_LEVEL": str(i)})
+            return my_config.SHOUT
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(build, range(200)))
+        assert results == [f"hero-{i} is over {i}" for i in range(200)]
+
+    def test_use_sources_is_scoped(self):
+        """Test that mapping sources don't leak out of their block."""
+        MyModel.from_mapping({"MY_HERO": "Vegeta"})
+        assert MyModel().MY_HERO == "Son Goku"
+
+    @pytest.mark.slow
+    def test_from_mapping_benchmark(self):
+        """Benchmark 100k from_mapping constructions."""
+        row = {"MY_HERO": "Vegeta", "POWER_LEVEL": "8000", "IS_STRONG": "1"}
+        count = 100_000
+        start = time.perf_counter()
+        for _ in range(count):
+            MyModel.from_mapping(row)
+        elapsed = time.perf_counter() - start
+        print(f"\n{count} from_mapping constructions: {elapsed:.2f}s ({elapsed / count * 1e6:.1f}us each)")
@@ -0,0 +1,153 @@
+import os
+import pytest
+from click.testing import CliRunner
+from configence import Configence, MappingSource, SourceStack, clear_instance_cache, configence, prefork_warmup
+from configence.compiler import compile_model
+from configence.types import ConfigenceGroup
+
+
+class DbConfig(Configence):
+    HOST = configence.str("HOST", "localhost")
+    PORT = configence.int("PORT", 5432)
+
+
+class CacheConfig(Configence):
+    URL = configence.str("URL", "redis://localhost")
+
+
+class AppConfig(Configence):
+    NAME = configence.str("NAME", "app")
+    db = configence.group(DbConfig, prefix="DB_")
+    cache = configence.group(CacheConfig, prefix="CACHE_", description="The cache")
+
+
+class TestGroups:
+    """Test lazily loaded nested config groups."""
+
+    def test_declared_group(self):
+        """Test that the class holds the group declaration."""
+        assert isinstance(AppConfig.db, ConfigenceGroup)
+        assert AppConfig.db.config_cls is DbConfig
+        assert [name for name, _ in AppConfig._groups()] == ["db", "cache"]
+
+    def test_loaded_on_first_access(self):
+        """Test that groups are loaded on first access, and cached."""
+        os.environ["DB_HOST"] = "db.example.com"
+        my_config = AppConfig()
+        assert "db" not in my_config.__dict__
+        assert isinstance(my_config.db, DbConfig)
+        assert my_config.db.HOST == "db.example.com"
+        assert my_config.db.PORT == 5432
+        assert my_config.db is my_config.db
+        assert "cache" not in my_config.__dict__
+
+        # Cleanup
+        del os.environ["DB_HOST"]
+
+    def test_parent_prefix(self):
+        """Test that the child's keys start with the parent's prefix."""
+        my_config = AppConfig.from_mapping({"APP_DB_PORT": "6543", "APP_NAME": "api"}, prefix="APP_")
+        assert my_config.NAME == "api"
+        assert my_config.db.PORT == 6543
+
+    def test_shares_parent_sources(self):
+        """Test that the child reads the parent's resolved sources."""
+        mapping = {"DB_HOST": "first"}
+        stack = SourceStack()
+        my_config = AppConfig(sources=MappingSource(mapping))
+        mapping["DB_HOST"] = "second"
+        assert my_config.db.HOST == "second"
+        assert my_config.db._config is my_config._config
+
+        # SourceStacks are resolved into one snapshot for the parent and its groups
+        my_config = AppConfig(sources=stack)
+        assert my_config.db._config is my_config._config
+
+    def test_entries_and_repr(self):
+        """Test that group entries are listed by "<group>.<name>"."""
+        my_config = AppConfig()
+        assert list(my_config.entries) == ["NAME", "db.HOST", "db.PORT", "cache.URL"]
+        assert my_config.entries["db.PORT"].value == 5432
+        assert "db.HOST: 'localhost'" in my_config.debug_repr()
+        assert list(my_config._entries) == ["NAME"]
+
+    def test_custom_init(self):
+        """Test groups of classes with their own __init__ (taking a prefix)."""
+
+        class PoolConfig(Configence):
+            def __init__(self, prefix=None):
+                super().__init__(prefix=prefix)
+
+            SIZE = configence.int("SIZE", 5)
+
+        class Root(Configence):
+            pool = configence.group(PoolConfig, prefix="POOL_")
+
+        assert Root.from_mapping({"APP_POOL_SIZE": "10"}, prefix="APP_").pool.SIZE == 10
+
+    def test_nested_groups(self):
+        """Test groups of groups."""
+
+        class Root(Configence):
+            app = configence.group(AppConfig, prefix="APP_")
+
+        my_config = Root.from_mapping({"APP_DB_HOST": "nested"})
+        assert my_config.app.db.HOST == "nested"
+        assert "app.db.HOST" in my_config.entries
+
+    def test_cli(self):
+        """Test that group entries are CLI options (with the group's prefix)."""
+        my_config = AppConfig()
+        result = CliRunner().invoke(my_config.get_cli_object(), ["--db-port", "1234", "--name", "cli"])
+        assert result.exit_code == 0, result.output
+        assert my_config.db.PORT == 1234
+        assert my_config.db.cli_overrides == {"PORT": 1234}
+        assert my_config.NAME == "cli"
+
+    def test_replace(self):
+        """Test that replaced copies don't share loaded groups."""
+        my_config = AppConfig()
+        my_config.db.PORT = 1
+        clone = my_config.replace(NAME="clone")
+        assert clone.db.PORT == 1
+        clone.db.PORT = 2
+        assert my_config.db.PORT == 1
+
+    def test_cached(self):
+        """Test that cached instances are reloaded when a group's input changes."""
+        clear_instance_cache()
+        os.environ["DB_HOST"] = "h"
+        first = AppConfig.cached()
+        assert first.db.HOST == "h"
+        assert AppConfig.cached() is first
+
+        os.environ["DB_HOST"] = "changed"
+        second = AppConfig.cached()
+        assert second is not first
+        assert second.db.HOST == "changed"
+
+        # Cleanup
+        del os.environ["DB_HOST"]
+        clear_instance_cache()
+
+    def test_to_environ(self):
+        """Test that the groups' entries are serialized under their prefixes."""
+        my_config = AppConfig.from_mapping({"APP_DB_PORT": "1"}, prefix="APP_")
+        environ = my_config.to_environ()
+        assert environ["APP_NAME"] == "app"
+        assert environ["APP_DB_HOST"] == "localhost"
+        assert environ["APP_DB_PORT"] == "1"
+        assert environ["APP_CACHE_URL"] == "redis://localhost"
+        assert my_config.to_environ(prefix="")["DB_PORT"] == "1"
+
+    def test_warmup(self):
+        """Test that warming up loads the groups."""
+        my_config = AppConfig()
+        prefork_warmup(my_config, freeze=False)
+        assert "db" in my_config.__dict__
+        assert "cache" in my_config.__dict__
+
+    def test_not_compilable(self):
+        """Test that classes with groups can't be compiled."""
+        with pytest.raises(ValueError, match="groups"):
+            compile_model(AppConfig)
@@ -0,0 +1,138 @@
+import pytest
+from click.testing import CliRunner
+from pydantic import BaseModel
+from configence import Configence, configence
+from configence.history import History, PersistentMap
+
+
+class Character(BaseModel):
+    name: str
+    moves: list
+
+
+class MyModel(Configence):
+    HISTORY_SIZE = 3
+
+    MY_HERO = configence.str("MY_HERO", "Son Goku")
+    POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+    CHARACTER = configence.model("CHARACTER", Character, {"name": "Goku", "moves": ["kamehameha"]})
+
+
+class TestPersistentMap:
+    """Test the structurally shared map."""
+
+    def test_set_and_get(self):
+        """Test that set() returns an updated copy."""
+        original = PersistentMap((f"KEY_{i}", i) for i in range(1000))
+        updated = original.set("KEY_7", "seven").set("NEW", 1)
+        assert len(original) == 1000 and len(updated) == 1001
+        assert original["KEY_7"] == 7 and updated["KEY_7"] == "seven"
+        assert "NEW" in updated and "NEW" not in original
+        assert dict(updated.items())["KEY_999"] == 999
+        assert original.set("KEY_1", original["KEY_1"]) is original
+
+    def test_diff(self):
+        """Test diffs between maps."""
+        original = PersistentMap((f"KEY_{i}", i) for i in range(1000))
+        updated = original.set("KEY_7", "seven").set("NEW", 1)
+        assert original.diff(updated) == {"KEY_7": (7, "seven"), "NEW": (None, 1)}
+        assert updated.diff(updated) == {}
+
+    def test_hash_collisions(self):
+        """Test keys with identical hashes."""
+
+        class Key(str):
+            def __hash__(self):
+                return 42
+
+        first, second = Key("a"), Key("b")
+        values = PersistentMap([(first, 1), (second, 2)]).set(first, 3)
+        assert values[first] == 3 and values[second] == 2
+        assert len(values) == 2
+
+
+class TestHistory:
+    """Test value generations and rollback."""
+
+    def test_disabled_by_default(self):
+        """Test that no history is kept by default."""
+
+        class NoHistoryModel(Configence):
+            MY_HERO = configence.str("MY_HERO", "Son Goku")
+
+        my_config = NoHistoryModel()
+        assert my_config.history is None
+        with pytest.raises(RuntimeError):
+            my_config.rollback()
+
+    def test_generations_and_rollback(self):
+        """Test recording and restoring generations."""
+        my_config = MyModel()
+        character = my_config.CHARACTER
+        my_config.MY_HERO = "Vegeta"
+        my_config.POWER_LEVEL = 8000
+        assert [generation.reason for generation in my_config.history] == ["load", "set", "set"]
+        assert my_config.history.current.changes == {"POWER_LEVEL": (9001, 8000)}
+        assert my_config.history.diff(0, -1) == {
+            "MY_HERO": ("Son Goku", "Vegeta"),
+            "POWER_LEVEL": (9001, 8000),
+        }
+        # unchanged (large) values are shared by all generations
+        assert all(generation.values["CHARACTER"] is character for generation in my_config.history)
+
+        assert my_config.rollback(2) == {
+            "MY_HERO": ("Vegeta", "Son Goku"),
+            "POWER_LEVEL": (8000, 9001),
+        }
+        assert my_config.MY_HERO == "Son Goku" and my_config.POWER_LEVEL == 9001
+        assert my_config.entries["POWER_LEVEL"].value == 9001
+        assert len(my_config.history) == 1
+        with pytest.raises(IndexError):
+            my_config.rollback()
+
+    def test_bounded(self):
+        """Test that only the last HISTORY_SIZE generations are kept."""
+        my_config = MyModel()
+        for level in range(10):
+            my_config.POWER_LEVEL = level
+        assert len(my_config.history) == 3
+        assert [generation.number for generation in my_config.history] == [8, 9, 10]
+        my_config.rollback(2)
+        assert my_config.POWER_LEVEL == 7
+
+    def test_cli_generation(self):
+        """Test that CLI overrides are recorded (and rolled back) together."""
+        my_config = MyModel()
+        original_fingerprint = my_config.fingerprint()
+        result = CliRunner().invoke(
+            my_config.get_cli_object(), ["--my-hero", "Vegeta", "--power-level", "8000"]
+        )
+        assert result.exit_code == 0, result.output
+        assert len(my_config.history) == 2
+        assert my_config.history.current.reason == "cli"
+        assert set(my_config.history.current.changes) == {"MY_HERO", "POWER_LEVEL"}
+
+        my_config.rollback()
+        assert my_config.MY_HERO == "Son Goku"
+        assert my_config.cli_overrides == {}
+        assert my_config.fingerprint() == original_fingerprint
+
+    def test_replace(self):
+        """Test that replace() clones keep their own history."""
+        my_config = MyModel()
+        clone = my_config.replace(MY_HERO="Vegeta")
+        assert len(my_config.history) == 1
+        assert clone.history.current.reason == "replace"
+        clone.rollback()
+        assert clone.MY_HERO == "Son Goku"
+        assert my_config.MY_HERO == "Son Goku"
+
+    def test_batch(self):
+        """Test batching changes into a single generation."""
+        history = History(2, PersistentMap([("A", 1), ("B", 2)]))
+        with history.batch("reload"):
+            history.record("A", 1, 10)
+            history.record("A", 10, 100)
+            history.record("B", 2, 20)
+        assert history.current.changes == {"A": (1, 100), "B": (2, 20)}
+        assert history.current.values["A"] == 100
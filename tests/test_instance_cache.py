@@ -0,0 +1,102 @@
+import json
+import os
+from configence import (
+    ConfigDocument,
+    Configence,
+    SourceStack,
+    TomlFile,
+    clear_instance_cache,
+    configence,
+    instance_cache_info,
+)
+
+
+class MyModel(Configence):
+    MY_HERO = configence.str("MY_HERO", "Son Goku")
+    POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+    SHOUT = configence.delay("{MY_HERO} is over {POWER_LEVEL}")
+
+
+class TestInstanceCache:
+    """Test the cached instance factory."""
+
+    def setup_method(self):
+        clear_instance_cache(maxsize=128)
+
+    def test_shared_instance(self):
+        """Test that repeated calls return the same instance."""
+        first = MyModel.cached()
+        assert MyModel.cached() is first
+        assert MyModel.cached() is first
+        info = instance_cache_info()
+        assert info.hits == 2
+        assert info.misses == 1
+        assert info.currsize == 1
+
+    def test_invalidated_by_env_changes(self):
+        """Test that changing a read env-var loads a new instance."""
+        first = MyModel.cached()
+        os.environ["MY_HERO"] = "Vegeta"
+        second = MyModel.cached()
+        assert second is not first
+        assert second.SHOUT == "Vegeta is over 9001"
+        assert MyModel.cached() is second
+
+        # back to the previous inputs - the previous instance is still cached
+        del os.environ["MY_HERO"]
+        assert MyModel.cached() is first
+
+    def test_keyed_by_prefix_and_class(self):
+        """Test separate instances per class and prefix."""
+        class OtherModel(Configence):
+            MY_HERO = configence.str("MY_HERO", "Krillin")
+
+        os.environ["NEW_MY_HERO"] = "Gohan"
+        assert MyModel.cached().MY_HERO == "Son Goku"
+        assert MyModel.cached(prefix="NEW_").MY_HERO == "Gohan"
+        assert OtherModel.cached().MY_HERO == "Krillin"
+        assert instance_cache_info().currsize == 3
+
+        # Cleanup
+        del os.environ["NEW_MY_HERO"]
+
+    def test_invalidated_by_file_changes(self, tmp_path):
+        """Test invalidation by changes in source files and documents."""
+        path = tmp_path / "defaults.toml"
+        path.write_text('my_hero = "Piccolo"\n')
+        sources = SourceStack(TomlFile(str(path)))
+
+        class FileModel(Configence):
+            def __init__(self):
+                super().__init__(sources=sources)
+
+            MY_HERO = configence.str("MY_HERO")
+
+        first = FileModel.cached()
+        assert first.MY_HERO == "Piccolo"
+        assert FileModel.cached() is first
+        path.write_text('my_hero = "Trunks"\n')
+        assert FileModel.cached().MY_HERO == "Trunks"
+
+        document = ConfigDocument(env="HERO_DOCUMENT")
+
+        class DocumentModel(Configence):
+            MY_HERO = configence.str("MY_HERO", "Son Goku", document=document, pointer="/hero")
+
+        assert DocumentModel.cached().MY_HERO == "Son Goku"
+        os.environ["HERO_DOCUMENT"] = json.dumps({"hero": "Bulma"})
+        assert DocumentModel.cached().MY_HERO == "Bulma"
+
+        # Cleanup
+        del os.environ["HERO_DOCUMENT"]
+
+    def test_bounded_size(self):
+        """Test LRU eviction."""
+        clear_instance_cache(maxsize=2)
+        for hero in ("a", "b", "c"):
+            os.environ["MY_HERO"] = hero
+            MyModel.cached()
+        assert instance_cache_info().currsize == 2
+
+        # Cleanup
+        del os.environ["MY_HERO"]
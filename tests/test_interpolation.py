@@ -0,0 +1,108 @@
+import os
+import sys
+import pytest
+from configence import Configence, Environ, SourceStack, configence
+from configence.interpolation import CircularReferenceError, Interpolator
+
+
+def mapping_sources(mapping):
+    return SourceStack(Environ(mapping))
+
+
+class TestInterpolation:
+    """Test ${KEY} interpolation of raw values."""
+
+    def test_env_values_reference_other_keys(self):
+        """Test references to env-vars and entry defaults."""
+        class MyModel(Configence):
+            INTERPOLATE = True
+
+            DB_HOST = configence.str("DB_HOST", "localhost")
+            DB_PORT = configence.int("DB_PORT", 5432)
+            DB_URL = configence.str("DB_URL", "postgres://${DB_HOST}:${DB_PORT}")
+
+        my_config = MyModel()
+        assert my_config.DB_URL == "postgres://localhost:5432"
+
+        os.environ["DB_HOST"] = "db.local"
+        os.environ["DB_URL"] = "postgresql://${DB_HOST}:${DB_PORT}/app"
+        my_config = MyModel()
+        assert my_config.DB_URL == "postgresql://db.local:5432/app"
+
+        # Cleanup
+        del os.environ["DB_HOST"]
+        del os.environ["DB_URL"]
+
+    def test_disabled_by_default(self):
+        """Test that interpolation is opt-in."""
+        configence = Configence(is_model=False, sources=mapping_sources({"A": "${B}", "B": "b"}))
+        assert configence.str("A") == "${B}"
+
+    def test_forward_references_and_casts(self):
+        """Test references to later entries, and casting the result."""
+        class MyModel(Configence):
+            PORT = configence.int("PORT")
+            BASE_PORT = configence.int("BASE_PORT")
+
+        sources = mapping_sources({"PORT": "${BASE_PORT}0", "BASE_PORT": "808"})
+        my_config = MyModel(sources=sources, interpolate=True)
+        assert my_config.PORT == 8080
+
+    def test_prefixed_keys(self):
+        """Test that references resolve prefixed keys first."""
+        sources = mapping_sources({"APP_HOST": "app.local", "HOST": "global", "OTHER": "other"})
+        configence = Configence(prefix="APP_", is_model=False, sources=sources, interpolate=True)
+        assert configence.str("URL", "http://${HOST}/${OTHER}") == "http://app.local/other"
+
+    def test_escapes_and_missing_references(self):
+        """Test $${ escapes, and that missing references are kept."""
+        sources = mapping_sources({"A": "$${B} ${MISSING} ${B}", "B": "b"})
+        configence = Configence(is_model=False, sources=sources, interpolate=True)
+        assert configence.str("A") == "${B} ${MISSING} b"
+
+    def test_cycles(self):
+        """Test cycle detection."""
+        sources = mapping_sources({"A": "${B}", "B": "x${C}", "C": "${A}", "SELF": "${SELF}"})
+        configence = Configence(is_model=False, sources=sources, interpolate=True)
+        with pytest.raises(CircularReferenceError) as err:
+            configence.str("A")
+        assert "B -> C -> A -> B" in str(err.value)
+        with pytest.raises(CircularReferenceError):
+            configence.str("SELF")
+
+    def test_deep_chain(self):
+        """Test a chain of thousands of references (deeper than the recursion limit)."""
+        depth = sys.getrecursionlimit() * 3
+        mapping = {f"K{i}": f"${{K{i + 1}}}" for i in range(depth)}
+        mapping[f"K{depth}"] = "end"
+        configence = Configence(is_model=False, sources=mapping_sources(mapping), interpolate=True)
+        assert configence.str("K0") == "end"
+
+    def test_memoized_resolution(self):
+        """Test that each key is looked up once per load."""
+        width = 2000
+        mapping = {f"K{i}": f"x${{K{i + 1}}}" for i in range(width)}
+        mapping[f"K{width}"] = "end"
+        lookups = []
+
+        def lookup(name):
+            lookups.append(name)
+            return mapping[name]
+
+        interpolator = Interpolator(lookup)
+        # every key references the next one; resolving all keys is linear
+        for i in reversed(range(width)):
+            assert interpolator.interpolate(f"${{K{i}}}").endswith("end")
+        assert len(lookups) == width + 1
+
+    def test_model_with_thousands_of_references(self):
+        """Test a model whose entries form a long reference chain."""
+        count = 2000
+        members = {
+            f"K{i}": configence.str(f"K{i}", f"${{K{i + 1}}}" if i < count - 1 else "end")
+            for i in range(count)
+        }
+        BigModel = type("BigModel", (Configence,), dict(members, INTERPOLATE=True))
+        my_config = BigModel()
+        assert my_config.K0 == "end"
+        assert my_config.K1999 == "end"
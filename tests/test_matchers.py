@@ -0,0 +1,122 @@
+import os
+import re
+from click.testing import CliRunner
+from configence import Configence, configence
+from configence.matchers import CidrMatcher, GlobMatcher, RegexMatcher
+
+
+class TestMatchers:
+    """Test precompiled regex, glob and CIDR entries."""
+
+    def test_regex_default(self):
+        """Test a regex entry compiled from a list of patterns."""
+        configence = Configence(is_model=False)
+
+        result = configence.regex("ROUTES", [r"^/api/v\d+/", r"^/health$"])
+        assert isinstance(result, RegexMatcher)
+        assert result.match("/api/v2/users")
+        assert result.match("/health")
+        assert not result.match("/admin")
+        assert "/api/v1/" in result
+
+    def test_regex_from_env(self):
+        """Test a delimited regex list read from environment variable."""
+        configence = Configence(is_model=False)
+
+        os.environ["ROUTES"] = r"^/a\d$;^/b$"
+        result = configence.regex("ROUTES", delimiter=";")
+        assert result.patterns == (r"^/a\d$", "^/b$")
+        assert result.match("/a1")
+        assert result.match("/b")
+        assert not result.match("/a")
+
+        # without a delimiter the whole value is a single pattern
+        os.environ["ROUTES"] = r"^(a|b),c$"
+        result = configence.regex("ROUTES", regex_flags=re.IGNORECASE)
+        assert result.fullmatch("A,c")
+
+        # Cleanup
+        del os.environ["ROUTES"]
+
+    def test_globs(self):
+        """Test glob entries."""
+        configence = Configence(is_model=False)
+
+        result = configence.globs("PATHS", "*.py, docs/*")
+        assert isinstance(result, GlobMatcher)
+        assert result.match("setup.py")
+        assert result.match("docs/index.md")
+        assert not result.match("README.md")
+
+        insensitive = configence.globs("PATHS", ["*.PY"], case_sensitive=False)
+        assert "main.py" in insensitive
+
+    def test_cidrs(self):
+        """Test CIDR entries with mixed ip versions."""
+        configence = Configence(is_model=False)
+
+        os.environ["TRUSTED"] = "10.0.0.0/8,192.168.1.0/24,192.168.0.0/24,2001:db8::/32"
+        result = configence.cidrs("TRUSTED")
+        assert isinstance(result, CidrMatcher)
+        assert "10.1.2.3" in result
+        assert "192.168.0.77" in result
+        assert "192.168.1.1" in result
+        assert "192.168.2.1" not in result
+        assert "2001:db8::1" in result
+        assert "2001:db9::1" not in result
+        assert "not-an-ip" not in result
+
+        # Cleanup
+        del os.environ["TRUSTED"]
+
+    def test_empty_matchers(self):
+        """Test that empty pattern sets never match."""
+        configence = Configence(is_model=False)
+
+        assert not configence.regex("NO_ROUTES", []).search("anything")
+        assert not configence.globs("NO_PATHS", "").match("anything")
+        assert "10.0.0.1" not in configence.cidrs("NO_NETS", [])
+
+    def test_matchers_compiled_once(self):
+        """Test that defaults are compiled once and shared by instances."""
+        class MyModel(Configence):
+            ROUTES = configence.regex("ROUTES", ["^/a$", "^/b$"])
+            TRUSTED = configence.cidrs("TRUSTED", ["127.0.0.0/8"])
+
+        first = MyModel()
+        second = MyModel()
+        assert first.ROUTES is second.ROUTES
+        assert first.TRUSTED is second.TRUSTED
+
+    def test_matchers_cli_type(self):
+        """Test that CLI overrides are compiled the same way."""
+        class MyModel(Configence):
+            TRUSTED = configence.cidrs("TRUSTED", ["127.0.0.0/8"])
+            PATHS = configence.globs("PATHS", ["*.py"])
+
+        my_config = MyModel()
+        cli_type = my_config._entries["TRUSTED"].get_cli_type()
+        assert cli_type("10.0.0.0/8") == CidrMatcher(["10.0.0.0/8"])
+        # already compiled values (e.g. CLI defaults) are passed through
+        assert cli_type(my_config.TRUSTED) is my_config.TRUSTED
+
+        cli_object = my_config.get_cli_object()
+        result = CliRunner().invoke(cli_object, ["--trusted", "10.0.0.0/8,::1/128"])
+        assert result.exit_code == 0, result.output
+        assert "10.2.3.4" in my_config.TRUSTED
+        assert "::1" in my_config.TRUSTED
+        assert "127.0.0.1" not in my_config.TRUSTED
+        assert my_config.PATHS.match("main.py")
+
+    def test_regex_inline_flags(self):
+        """Test patterns starting with inline flags."""
+        configence = Configence(is_model=False)
+
+        result = configence.regex("ROUTES", r"(?i)^/api/")
+        assert result.match("/API/users")
+
+        result = configence.regex("ROUTES", [r"(?i)^/api/", r"^/health$"])
+        assert result.match("/Api/users")
+        # the flags of a pattern only apply to it
+        assert result.match("/health")
+        assert not result.match("/HEALTH")
@@ -0,0 +1,94 @@
+from pydantic import BaseModel
+from configence import Configence, configence, trace_allocations
+from configence.memory import deep_sizeof
+
+
+class Node(BaseModel):
+    name: str
+    children: list = []
+
+
+class MyModel(Configence):
+    MY_HERO = configence.str("MY_HERO", "Son Goku")
+    EVENTS = configence.list("EVENTS", ",".join(f"event-{index}" for index in range(500)))
+    TREE = configence.model(
+        "TREE", Node, {"name": "root", "children": [{"name": f"leaf-{index}"} for index in range(50)]}
+    )
+
+
+class TestMemoryReport:
+    """Test memory reports of config values."""
+
+    def test_deep_sizes(self):
+        """Test that entries are measured by their deep size, largest first."""
+        my_config = MyModel()
+        report = my_config.memory_report()
+        assert [entry.name for entry in report.entries] == ["EVENTS", "TREE", "MY_HERO"]
+        events = report.entries[0]
+        assert events.size == deep_sizeof(my_config.EVENTS)
+        assert events.size > 500 * len("event-000")
+        assert events.exclusive == events.size
+        assert report.total == sum(entry.size for entry in report.entries)
+        assert not report.traced
+
+    def test_shared_objects(self):
+        """Test that objects shared by entries are counted once."""
+        my_config = MyModel()
+        my_config.MY_HERO = my_config.EVENTS
+        report = my_config.memory_report()
+        by_name = {entry.name: entry for entry in report.entries}
+        assert by_name["MY_HERO"].size == by_name["EVENTS"].size
+        assert by_name["MY_HERO"].exclusive == 0
+        assert report.total == by_name["EVENTS"].size + by_name["TREE"].size
+
+    def test_structured_data(self):
+        """Test the report as structured data."""
+        data = MyModel().memory_report().to_dict()
+        assert data["entries"][0]["name"] == "EVENTS"
+        assert data["entries"][0]["type"] == "list"
+        assert data["entries"][1]["type"] == "Node"
+        assert data["entries"][0]["allocated"] is None
+
+    def test_table(self):
+        """Test the printable table."""
+        table = str(MyModel().memory_report())
+        lines = table.splitlines()
+        assert lines[0].split() == ["entry", "type", "size", "exclusive"]
+        assert lines[1].startswith("EVENTS")
+        assert lines[-1].startswith("total")
+
+    def test_traced_allocations(self):
+        """Test attributing the allocations of loading to entries."""
+        assert not MyModel().memory_report().traced
+        with trace_allocations():
+            my_config = MyModel()
+        report = my_config.memory_report()
+        assert report.traced
+        by_name = {entry.name: entry for entry in report.entries}
+        assert by_name["EVENTS"].allocated > by_name["MY_HERO"].allocated
+        assert by_name["TREE"].peak >= by_name["TREE"].allocated
+        assert "allocated" in str(report)
+        assert set(report.by_type()) == {"list", "Node", "str"}
+
+    def test_traces_own_load(self):
+        """Test that the traced load is the instance's own (no reload, no on_load() side effects)."""
+        loads = []
+
+        class LoadingModel(Configence):
+            def __init__(self):
+                super().__init__(prefix="APP_")
+
+            MY_HERO = configence.str("MY_HERO", "Son Goku")
+
+            def on_load(self):
+                loads.append(self)
+
+        with trace_allocations():
+            my_config = LoadingModel()
+            # each instance loaded in the block gets its own allocations
+            other = MyModel()
+        report = my_config.memory_report()
+        assert [entry.name for entry in report.entries] == ["MY_HERO"]
+        assert report.traced
+        assert loads == [my_config]
+        assert set(other._allocations) == {"MY_HERO", "EVENTS", "TREE"}
@@ -0,0 +1,117 @@
+import os
+import pytest
+from click.testing import CliRunner
+from configence import (
+    Configence,
+    clear_instance_cache,
+    configence,
+    disable_metrics,
+    enable_metrics,
+    export_metrics,
+    get_metrics,
+)
+from configence.metrics import Counter, Histogram, render_prometheus
+
+
+class MyModel(Configence):
+    MY_HERO = configence.str("MY_HERO", "Son Goku")
+    POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+
+
+class TestMetrics:
+    """Test the instrumentation of config loading."""
+
+    def setup_method(self):
+        enable_metrics().clear()
+
+    def teardown_method(self):
+        disable_metrics()
+
+    def test_disabled_by_default(self):
+        """Test that no metrics are collected unless enabled."""
+        disable_metrics()
+        MyModel()
+        assert get_metrics() is None
+        assert export_metrics() is None
+
+    def test_load_metrics(self):
+        """Test instance, load duration and cast metrics."""
+        MyModel()
+        MyModel()
+        metrics = get_metrics()
+        assert metrics.instances_created.get(**{"class": "MyModel"}) == 2
+        assert metrics.load_duration.count(**{"class": "MyModel"}) == 2
+        assert metrics.cast_duration.count(type="int") == 2
+        assert metrics.cast_duration.count(type="str") == 2
+
+    def test_validation_failures(self):
+        """Test counting values failing to cast."""
+        os.environ["POWER_LEVEL"] = "over 9000"
+        with pytest.raises(ValueError):
+            MyModel()
+        assert get_metrics().validation_failures.get(
+            **{"class": "MyModel", "key": "POWER_LEVEL"}
+        ) == 1
+
+        # Cleanup
+        del os.environ["POWER_LEVEL"]
+
+    def test_cli_overrides(self):
+        """Test counting CLI overrides."""
+        my_config = MyModel()
+        result = CliRunner().invoke(my_config.get_cli_object(), ["--power-level", "1"])
+        assert result.exit_code == 0, result.output
+        assert get_metrics().cli_overrides.get(**{"class": "MyModel"}) == 1
+
+    def test_reloads_and_cache_rates(self):
+        """Test the instance cache statistics."""
+        clear_instance_cache()
+
+        class CachedModel(Configence):
+            MY_HERO = configence.str("MY_HERO", "Son Goku")
+
+        CachedModel.cached()
+        CachedModel.cached()
+        os.environ["MY_HERO"] = "Vegeta"
+        CachedModel.cached()
+        text = export_metrics()
+        assert 'configence_reloads_total{class="TestMetrics.test_reloads_and_cache_rates.<locals>.CachedModel"} 1' in text
+        assert 'configence_cache_hits{cache="instance"} 1' in text
+        assert 'configence_cache_misses{cache="instance"} 2' in text
+
+        # Cleanup
+        del os.environ["MY_HERO"]
+        clear_instance_cache()
+
+    def test_custom_exporter(self):
+        """Test plugging in an exporter."""
+        exported = []
+        enable_metrics(exporter=lambda metrics: exported.extend(metric.name for metric in metrics))
+        export_metrics()
+        assert "configence_instances_created_total" in exported
+
+
+class TestPrometheusRenderer:
+    """Test the Prometheus text format."""
+
+    def test_render(self):
+        """Test rendering counters and histograms."""
+        counter = Counter("requests_total", "Requests.", ["path"])
+        counter.inc(path='/a"b')
+        counter.inc(2, path='/a"b')
+        histogram = Histogram("latency_seconds", "Latency.", buckets=[0.1, 1])
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+        assert render_prometheus([counter, histogram]) == "\n".join([
+            "# HELP requests_total Requests.",
+            "# TYPE requests_total counter",
+            'requests_total{path="/a\\"b"} 3',
+            "# HELP latency_seconds Latency.",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{le="0.1"} 1',
+            'latency_seconds_bucket{le="1"} 2',
+            'latency_seconds_bucket{le="+Inf"} 3',
+            "latency_seconds_sum 5.55",
+            "latency_seconds_count 3",
+        ]) + "\n"
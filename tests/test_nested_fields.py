@@ -0,0 +1,147 @@
+import os
+import pytest
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, ValidationError
+from configence import Configence, MappingSource, clear_instance_cache, configence
+from configence.nested import scan_prefixes
+
+
+class Pool(BaseModel):
+    size: int = 5
+    timeout: float = 1.0
+    max_size: int = Field(10, alias="maxSize")
+
+
+class Database(BaseModel):
+    host: str = "localhost"
+    port: int = 5432
+    pool: Pool = Pool()
+    replica: Optional[Pool] = None
+    hosts: List[str] = []
+    labels: Dict[str, str] = {}
+    user_name: str = Field("app", alias="userName")
+    note: Optional[str] = None
+
+
+class MyModel(Configence):
+    DB = configence.model("DB", Database, {"host": "db"}, nested_delimiter="__")
+    PLAIN = configence.model("PLAIN", Pool, {"size": 1})
+
+
+class TestNestedFields:
+    """Test setting single fields of model() entries by nested keys."""
+
+    def test_fields(self):
+        """Test that nested keys set (nested) fields, on top of the default."""
+        my_config = MyModel.from_mapping(
+            {
+                "APP__DB__PORT": "6543",
+                "APP__DB__POOL__SIZE": "20",
+                "APP__DB__REPLICA__TIMEOUT": "2.5",
+                "APP__DB__HOSTS": '["a", "b"]',
+                "APP__DB__LABELS__TEAM": "core",
+                "APP__DB__USERNAME": "admin",
+            },
+            prefix="APP__",
+        )
+        db = my_config.DB
+        assert db.host == "db"
+        assert db.port == 6543
+        assert db.pool == Pool(size=20)
+        assert db.replica == Pool(timeout=2.5)
+        assert db.hosts == ["a", "b"]
+        assert db.labels == {"TEAM": "core"}
+        assert db.user_name == "admin"
+
+    def test_aliased_fields(self):
+        """Test that aliased fields are set by their name or alias."""
+        my_config = MyModel.from_mapping({"DB__POOL__MAX_SIZE": "20"})
+        assert my_config.DB.pool.max_size == 20
+        my_config = MyModel.from_mapping({"DB": '{"pool": {"maxSize": 3}}', "DB__POOL__MAXSIZE": "30"})
+        assert my_config.DB.pool.max_size == 30
+
+    def test_str_fields(self):
+        """Test that values of (optional) str fields are not parsed as JSON."""
+        my_config = MyModel.from_mapping({"DB__NOTE": '["x"]', "DB__HOST": "{h}"})
+        assert my_config.DB.note == '["x"]'
+        assert my_config.DB.host == "{h}"
+
+    def test_json_base(self):
+        """Test that nested keys override fields of the JSON base value."""
+        my_config = MyModel.from_mapping(
+            {
+                "DB": '{"host": "primary", "pool": {"size": 3, "timeout": 9}}',
+                "DB__POOL__SIZE": "30",
+            }
+        )
+        assert my_config.DB.host == "primary"
+        assert my_config.DB.pool == Pool(size=30, timeout=9)
+
+    def test_nested_json_objects(self):
+        """Test that deeper keys override nested JSON objects."""
+        my_config = MyModel.from_mapping(
+            {"DB__POOL": '{"size": 3, "timeout": 9}', "DB__POOL__TIMEOUT": "4"}
+        )
+        assert my_config.DB.pool == Pool(size=3, timeout=4)
+
+    def test_without_nested_keys(self):
+        """Test that the JSON value is used as usual without nested keys."""
+        my_config = MyModel.from_mapping({"DB": '{"host": "primary"}', "PLAIN__SIZE": "7"})
+        assert my_config.DB == Database(host="primary")
+        assert my_config.PLAIN == Pool(size=1)
+        assert MyModel.from_mapping({}).DB == Database(host="db")
+
+    def test_env_vars(self):
+        """Test nested env-vars."""
+        os.environ["DB__POOL__SIZE"] = "12"
+        assert MyModel().DB.pool.size == 12
+
+        # Cleanup
+        del os.environ["DB__POOL__SIZE"]
+
+    def test_cached(self):
+        """Test that cached instances are reloaded when nested keys are added or removed."""
+        clear_instance_cache()
+        os.environ["DB"] = '{"host": "x"}'
+        first = MyModel.cached()
+        assert first.DB.host == "x"
+        assert MyModel.cached() is first
+
+        os.environ["DB__HOST"] = "new"
+        second = MyModel.cached()
+        assert second.DB.host == "new"
+        assert MyModel.cached() is second
+
+        del os.environ["DB__HOST"]
+        assert MyModel.cached().DB.host == "x"
+
+        # Cleanup
+        del os.environ["DB"]
+        clear_instance_cache()
+
+    def test_validation(self):
+        """Test that the assembled model is validated."""
+        with pytest.raises(ValidationError):
+            MyModel.from_mapping({"DB__PORT": "not-a-port"})
+
+    def test_single_scan(self):
+        """Test that the source's keys are scanned once per load."""
+        scans = []
+
+        class CountingSource(MappingSource):
+            def keys(self):
+                scans.append(1)
+                return super().keys()
+
+        class TwoModel(Configence):
+            FIRST = configence.model("FIRST", Pool, {}, nested_delimiter="__")
+            SECOND = configence.model("SECOND", Pool, {}, nested_delimiter="__")
+
+        my_config = TwoModel(sources=CountingSource({"FIRST__SIZE": "1", "SECOND__SIZE": "2"}))
+        assert (my_config.FIRST.size, my_config.SECOND.size) == (1, 2)
+        assert len(scans) == 1
+
+    def test_scan_prefixes(self):
+        """Test matching keys to prefixes."""
+        found = scan_prefixes(["A__X", "A__X__Y", "AB__X", "B"], ["A__", "AB__"])
+        assert found == {"A__": ["A__X", "A__X__Y"], "AB__": ["AB__X"]}
@@ -0,0 +1,114 @@
+import gc
+import json
+import os
+import pytest
+from pydantic import BaseModel
+from typing import List
+from configence import ConfigDocument, Configence, configence, prefork_warmup
+
+HAS_SMAPS_ROLLUP = os.path.exists("/proc/self/smaps_rollup")
+
+
+class Item(BaseModel):
+    name: str
+    tags: List[str]
+
+
+class Catalog(BaseModel):
+    items: List[Item]
+
+
+def read_smaps_rollup(pid="self"):
+    """Read /proc/<pid>/smaps_rollup into a dict of kB values."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values
+
+
+def measure_forked_child(config):
+    """Fork a worker which reads the config and runs the GC; returns the
+    worker's smaps_rollup (kB values)."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - runs in the child
+        try:
+            os.close(read_fd)
+            sum(len(item.tags) for item in config.CATALOG.items)
+            gc.collect()
+            os.write(write_fd, json.dumps(read_smaps_rollup()).encode())
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as reader:
+        result = json.loads(reader.read())
+    os.waitpid(pid, 0)
+    return result
+
+
+class TestPrefork:
+    """Test pre-fork warmup."""
+
+    def test_warmup_loads_documents_and_compacts(self):
+        """Test that warmup parses documents and compacts entries."""
+        document = ConfigDocument(text='{"hero": "Goku"}')
+
+        class MyModel(Configence):
+            HERO = configence.str("HERO", document=document, pointer="/hero")
+
+        my_config = MyModel()
+        document._parsed_from = object()  # e.g. the document changed after load
+        try:
+            prefork_warmup(my_config)
+            assert document.data == {"hero": "Goku"}
+            assert type(my_config._entries) is dict
+            assert my_config.HERO == "Goku"
+            assert gc.get_freeze_count() > 0
+        finally:
+            gc.unfreeze()
+
+    def test_warmup_without_freeze(self):
+        """Test warmup without freezing the GC."""
+        class MyModel(Configence):
+            HERO = configence.str("HERO", "Goku")
+
+        my_config = MyModel()
+        gc.unfreeze()
+        prefork_warmup(my_config, freeze=False)
+        assert gc.get_freeze_count() == 0
+
+    @pytest.mark.slow
+    @pytest.mark.skipif(
+        not HAS_SMAPS_ROLLUP or not hasattr(os, "fork"),
+        reason="requires fork() and /proc/<pid>/smaps_rollup",
+    )
+    def test_forked_children_memory(self):
+        """Benchmark private (copied) memory of forked workers with and
+        without warmup."""
+        class MyModel(Configence):
+            CATALOG = configence.model("CATALOG", Catalog, {"items": []})
+
+        catalog = {
+            "items": [{"name": f"item-{i}", "tags": ["a", "b"]} for i in range(50_000)]
+        }
+        os.environ["CATALOG"] = json.dumps(catalog)
+        my_config = MyModel()
+        del os.environ["CATALOG"]
+
+        gc.collect()
+        without = measure_forked_child(my_config)
+        prefork_warmup(my_config)
+        try:
+            with_warmup = measure_forked_child(my_config)
+        finally:
+            gc.unfreeze()
+
+        print(
+            "\nforked worker Private_Dirty / Pss: "
+            f"without warmup {without['Private_Dirty']}kB / {without['Pss']}kB, "
+            f"with warmup {with_warmup['Private_Dirty']}kB / {with_warmup['Pss']}kB"
+        )
+        assert with_warmup["Private_Dirty"] < without["Private_Dirty"]
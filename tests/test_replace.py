@@ -0,0 +1,112 @@
+import os
+import time
+import pytest
+from pydantic import BaseModel
+from configence import Configence, configence
+
+
+class Character(BaseModel):
+    name: str
+
+
+class MyModel(Configence):
+    MY_HERO = configence.str("MY_HERO", "Son Goku")
+    POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+    CHARACTER = configence.model("CHARACTER", Character, {"name": "Goku"})
+    SHOUT = configence.delay("{MY_HERO} is over {POWER_LEVEL}")
+    EVENTS = configence.delay(lambda SHOUT="": [SHOUT])
+    CONSTANT = configence.delay(lambda: "constant")
+    GREETING = configence.str("GREETING", configence.delay("hello {MY_HERO}"))
+
+
+class TestReplace:
+    """Test copy-on-write clones with overrides."""
+
+    def test_overrides_are_cast(self):
+        """Test that raw and typed overrides are cast like loaded values."""
+        my_config = MyModel()
+        clone = my_config.replace(POWER_LEVEL="8000", CHARACTER='{"name": "Vegeta"}')
+        assert clone.POWER_LEVEL == 8000
+        assert clone.CHARACTER == Character(name="Vegeta")
+        assert clone.entries["POWER_LEVEL"].value == 8000
+        # the original is untouched
+        assert my_config.POWER_LEVEL == 9001
+        assert my_config.entries["POWER_LEVEL"].value == 9001
+        assert clone.replace(POWER_LEVEL=1).POWER_LEVEL == 1
+
+    def test_unchanged_values_are_shared(self):
+        """Test that unchanged values and metadata are shared."""
+        my_config = MyModel()
+        clone = my_config.replace(POWER_LEVEL=1)
+        assert clone.CHARACTER is my_config.CHARACTER
+        assert clone.CONSTANT is my_config.CONSTANT
+        assert clone.entries["CHARACTER"].cast is my_config.entries["CHARACTER"].cast
+
+    def test_entries_are_copied_on_write(self):
+        """Test that writes after replace() don't leak between instances."""
+        my_config = MyModel()
+        clone = my_config.replace(POWER_LEVEL=1)
+        my_config.MY_HERO = "Krillin"
+        clone.CHARACTER = Character(name="Gohan")
+        assert clone.entries["MY_HERO"].value == "Son Goku"
+        assert my_config.entries["MY_HERO"].value == "Krillin"
+        assert my_config.entries["CHARACTER"].value == Character(name="Goku")
+        assert clone.entries["CHARACTER"].value == Character(name="Gohan")
+
+    def test_dependent_delays_are_reevaluated(self):
+        """Test that delayed values depending on overrides are re-evaluated."""
+        my_config = MyModel()
+        clone = my_config.replace(MY_HERO="Vegeta")
+        assert clone.SHOUT == "Vegeta is over 9001"
+        # transitive dependency
+        assert clone.EVENTS == ["Vegeta is over 9001"]
+        # delayed default
+        assert clone.GREETING == "hello Vegeta"
+        assert my_config.SHOUT == "Son Goku is over 9001"
+        # dependent delays get new values
+        assert clone.EVENTS is not my_config.EVENTS
+        # unrelated delays are not re-evaluated
+        assert clone.entries["CONSTANT"] is my_config.entries["CONSTANT"]
+        assert clone.replace(POWER_LEVEL=1).GREETING == "hello Vegeta"
+
+    def test_overridden_delays_are_kept(self):
+        """Test that explicitly set values are not replaced by delays."""
+        clone = MyModel().replace(SHOUT="quiet", MY_HERO="Vegeta")
+        assert clone.SHOUT == "quiet"
+        assert clone.EVENTS == ["quiet"]
+
+        os.environ["GREETING"] = "hi"
+        clone = MyModel().replace(MY_HERO="Vegeta")
+        assert clone.GREETING == "hi"
+
+        # Cleanup
+        del os.environ["GREETING"]
+
+    def test_unknown_keys(self):
+        """Test overriding keys which are not entries."""
+        with pytest.raises(AttributeError):
+            MyModel().replace(NOT_A_KEY=1)
+
+    @pytest.mark.slow
+    def test_replace_benchmark(self):
+        """Benchmark replace() against full reconstruction for 500 keys."""
+        members = {f"KEY_{i}": configence.int(f"KEY_{i}", i) for i in range(500)}
+        members["TOTAL"] = configence.delay(lambda KEY_0=0, KEY_1=0: KEY_0 + KEY_1)
+        BigModel = type("BigModel", (Configence,), members)
+        my_config = BigModel()
+
+        count = 200
+        start = time.perf_counter()
+        for i in range(count):
+            BigModel.from_mapping({"KEY_0": i, "KEY_1": i})
+        rebuild = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(count):
+            clone = my_config.replace(KEY_0=i, KEY_1=i)
+        replace = time.perf_counter() - start
+        assert clone.TOTAL == 2 * (count - 1)
+        print(
+            f"\n500 keys: full reconstruction {rebuild / count * 1e3:.2f}ms, "
+            f"replace() {replace / count * 1e3:.2f}ms"
+        )
+        assert replace < rebuild
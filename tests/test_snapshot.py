@@ -0,0 +1,215 @@
+import os
+import time
+import pytest
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional
+from pydantic import BaseModel, field_validator, model_validator
+from configence import Configence, MappingSource, SnapshotIntegrityError, configence
+from configence.snapshot import construct_model
+
+
+class Color(Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+class Side(Enum):
+    LEFT = "RIGHT"
+    RIGHT = "LEFT"
+
+
+class Move(BaseModel):
+    name: str
+    power: int = 1
+    learned: Optional[datetime] = None
+
+
+class Character(BaseModel):
+    name: str
+    moves: List[Move] = []
+    friends: Dict[str, Move] = {}
+    best_move: Optional[Move] = None
+
+
+class MyModel(Configence):
+    MY_HERO = configence.str("MY_HERO", "Son Goku")
+    POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+    COLOR = configence.enum("COLOR", Color, Color.RED)
+    EVENTS = configence.list("EVENTS", ["a", "b"])
+    ALLOWED = configence.globs("ALLOWED", "*.dbz")
+    CHARACTER = configence.model("CHARACTER", Character, {"name": "Goku"})
+    SHOUT = configence.delay("{MY_HERO} is over {POWER_LEVEL}")
+
+
+CHARACTER = (
+    '{"name": "Gohan", "moves": [{"name": "masenko", "power": 3, "learned": "2020-01-01T00:00:00"}],'
+    ' "friends": {"piccolo": {"name": "makankosappo"}}, "best_move": {"name": "kamehameha"}}'
+)
+
+
+def values_of(instance):
+    return {name: entry.value for name, entry in instance.entries.items() if name != "ALLOWED"}
+
+
+class TestSnapshot:
+    """Test verified snapshots and trusted loading."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that snapshots load the same values."""
+        path = str(tmp_path / "config.snapshot")
+        original = MyModel.from_mapping(
+            {"MY_HERO": "Gohan", "COLOR": "blue", "CHARACTER": CHARACTER, "EVENTS": "x,y"}
+        )
+        original.save_snapshot(path)
+        loaded = MyModel.from_snapshot(path, sources=MappingSource({}))
+        assert values_of(loaded) == values_of(original)
+        # trusted models are built without validation - but are equal to validated ones
+        assert loaded.CHARACTER.moves[0].learned == datetime(2020, 1, 1)
+        assert loaded.CHARACTER.friends["piccolo"].power == 1
+        assert loaded.CHARACTER.model_fields_set == original.CHARACTER.model_fields_set
+        # matchers aren't stored - they are loaded from the sources
+        assert loaded.ALLOWED.match("goku.dbz")
+
+    def test_enum_values(self, tmp_path):
+        """Test that enums are stored by value (which takes precedence over names)."""
+
+        class SideModel(Configence):
+            SIDE = configence.enum("SIDE", Side, Side.RIGHT)
+
+        path = str(tmp_path / "config.snapshot")
+        SideModel.from_mapping({"SIDE": "RIGHT"}).save_snapshot(path)
+        assert SideModel.from_snapshot(path, sources=MappingSource({})).SIDE is Side.LEFT
+
+    def test_custom_init(self, tmp_path):
+        """Test loading classes with their own __init__."""
+
+        class InitModel(Configence):
+            def __init__(self):
+                super().__init__()
+
+            POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+
+        path = str(tmp_path / "config.snapshot")
+        InitModel.from_mapping({"POWER_LEVEL": "1"}).save_snapshot(path)
+        assert InitModel.from_snapshot(path).POWER_LEVEL == 1
+
+    def test_prefix(self, tmp_path):
+        """Test loading snapshots with a prefix."""
+        path = str(tmp_path / "config.snapshot")
+        MyModel.from_mapping({"DBZ_POWER_LEVEL": "1"}, prefix="DBZ_").save_snapshot(path)
+        assert MyModel.from_snapshot(path, prefix="DBZ_").POWER_LEVEL == 1
+
+    def test_integrity(self, tmp_path):
+        """Test that modified snapshots are rejected."""
+        path = tmp_path / "config.snapshot"
+        MyModel.from_mapping({}).save_snapshot(str(path), secret="s3cr3t")
+        assert MyModel.from_snapshot(str(path), secret="s3cr3t").POWER_LEVEL == 9001
+        with pytest.raises(SnapshotIntegrityError):
+            MyModel.from_snapshot(str(path), secret="wrong")
+
+        path.write_bytes(path.read_bytes().replace(b"9001", b"9002"))
+        with pytest.raises(SnapshotIntegrityError):
+            MyModel.from_snapshot(str(path), secret="s3cr3t")
+
+        path.write_bytes(b"not a snapshot")
+        with pytest.raises(SnapshotIntegrityError):
+            MyModel.from_snapshot(str(path))
+
+    def test_schema_change(self, tmp_path):
+        """Test that snapshots of another schema are validated."""
+        path = str(tmp_path / "config.snapshot")
+        MyModel.from_mapping({"CHARACTER": CHARACTER}).save_snapshot(path)
+
+        class Strict(BaseModel):
+            name: str
+            moves: List[Move] = []
+
+            @field_validator("name")
+            @classmethod
+            def upper(cls, value):
+                return value.upper()
+
+        class ChangedModel(Configence):
+            CHARACTER = configence.model("CHARACTER", Strict)
+
+        assert ChangedModel.from_snapshot(path).CHARACTER.name == "GOHAN"
+
+    def test_construct_model(self):
+        """Test building nested models without validation."""
+        character = construct_model(Character, {"name": "Goku", "best_move": {"name": "kamehameha"}})
+        assert character == Character(name="Goku", best_move=Move(name="kamehameha"))
+        assert character.model_dump() == Character.model_validate(character.model_dump()).model_dump()
+
+    @pytest.mark.slow
+    def test_trusted_load_benchmark(self, tmp_path):
+        """Benchmark loading a deeply nested model from a trusted snapshot."""
+
+        class Leaf(BaseModel):
+            key: str
+            weight: float
+            tags: List[str]
+
+            @field_validator("key")
+            @classmethod
+            def normalize(cls, value):
+                return value.strip().lower()
+
+            @field_validator("weight")
+            @classmethod
+            def check_weight(cls, value):
+                if value < 0:
+                    raise ValueError("negative weight")
+                return value
+
+            @field_validator("tags")
+            @classmethod
+            def check_tags(cls, value):
+                return sorted(set(value))
+
+            @model_validator(mode="after")
+            def check_leaf(self):
+                if not self.tags and not self.key:
+                    raise ValueError("empty leaf")
+                return self
+
+        class Branch(BaseModel):
+            name: str
+            leaves: List[Leaf]
+
+        class Tree(BaseModel):
+            name: str
+            branches: List[Branch]
+
+        class Forest(BaseModel):
+            trees: List[Tree]
+
+        class ForestModel(Configence):
+            FOREST = configence.model("FOREST", Forest)
+
+        forest = Forest(trees=[
+            Tree(name=f"tree{t}", branches=[
+                Branch(name=f"branch{b}", leaves=[
+                    Leaf(key=f"leaf{leaf}", weight=leaf / 3, tags=["a", "b"]) for leaf in range(20)
+                ]) for b in range(10)
+            ]) for t in range(10)
+        ])
+        raw = {"FOREST": forest.model_dump_json()}
+        path = str(tmp_path / "forest.snapshot")
+        ForestModel.from_mapping(raw).save_snapshot(path)
+        count = 20
+
+        start = time.perf_counter()
+        for _ in range(count):
+            validated = ForestModel.from_mapping(raw)
+        validating = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(count):
+            trusted = ForestModel.from_snapshot(path)
+        trusting = time.perf_counter() - start
+
+        print(f"\nvalidated: {validating / count * 1e3:.2f}ms, trusted snapshot: {trusting / count * 1e3:.2f}ms")
+        assert trusted.FOREST == validated.FOREST
+        # loose - the gain depends on the validators skipped
+        assert trusting < validating * 2
@@ -0,0 +1,196 @@
+import os
+import time
+import pytest
+from unittest.mock import patch
+from configence import (
+    Configence,
+    EnvFile,
+    Environ,
+    IniFile,
+    JsonFile,
+    SourceStack,
+    TomlFile,
+    YamlFile,
+    configence,
+    set_default_sources,
+)
+from configence import sources as sources_module
+from pydantic import BaseModel
+
+
+class Database(BaseModel):
+    host: str
+    port: int
+
+
+class MyModel(Configence):
+    MY_HERO = configence.str("MY_HERO", "Son Goku")
+    POWER_LEVEL = configence.int("POWER_LEVEL", 9001)
+    IS_STRONG = configence.bool("IS_STRONG", False)
+    EVENTS = configence.list("EVENTS", [])
+    DB = configence.model("DB", Database, {"host": "localhost", "port": 1})
+    DB_HOST = configence.str("DB_HOST", "none")
+
+
+def write_layers(tmp_path):
+    defaults = tmp_path / "defaults.toml"
+    defaults.write_text(
+        'my_hero = "Krillin"\n'
+        "power_level = 100\n"
+        "is_strong = true\n"
+        'events = ["a", "b,c"]\n'
+        "[db]\n"
+        'host = "db.local"\n'
+        "port = 5432\n"
+    )
+    production = tmp_path / "production.toml"
+    production.write_text("power_level = 8000\n")
+    dotenv = tmp_path / ".env"
+    dotenv.write_text("MY_HERO=Vegeta\n")
+    return defaults, production, dotenv
+
+
+def counting_parsers():
+    calls = []
+
+    def counted(parser):
+        def parse(text):
+            calls.append(parser)
+            return parser(text)
+
+        return parse
+
+    parsers = {kind: counted(parser) for kind, parser in sources_module.PARSERS.items()}
+    return calls, patch.dict(sources_module.PARSERS, parsers)
+
+
+class TestSources:
+    """Test layered sources."""
+
+    def test_layer_precedence(self, tmp_path):
+        """Test that higher layers override lower ones."""
+        defaults, production, dotenv = write_layers(tmp_path)
+        stack = SourceStack(
+            TomlFile(str(defaults)),
+            TomlFile(str(production)),
+            EnvFile(str(dotenv)),
+            Environ(),
+        )
+
+        os.environ["IS_STRONG"] = "false"
+        my_config = MyModel(sources=stack)
+        assert my_config.MY_HERO == "Vegeta"
+        assert my_config.POWER_LEVEL == 8000
+        assert my_config.IS_STRONG is False
+        assert my_config.EVENTS == ["a", "b,c"]
+        assert my_config.DB == Database(host="db.local", port=5432)
+        assert my_config.DB_HOST == "db.local"
+
+        assert stack.provenance("MY_HERO") == f"env:{dotenv}"
+        assert stack.provenance("POWER_LEVEL") == f"toml:{production}"
+        assert stack.provenance("DB_PORT") == f"toml:{defaults}"
+        assert stack.provenance("IS_STRONG") == "env-vars"
+        assert stack.provenance("NOT_A_KEY") is None
+
+        # Cleanup
+        del os.environ["IS_STRONG"]
+
+    def test_defaults_and_missing_files(self, tmp_path):
+        """Test missing optional files and entry defaults."""
+        stack = SourceStack(TomlFile(str(tmp_path / "missing.toml")))
+        my_config = MyModel(sources=stack)
+        assert my_config.MY_HERO == "Son Goku"
+        assert my_config.DB.host == "localhost"
+
+        with pytest.raises(FileNotFoundError):
+            SourceStack(TomlFile(str(tmp_path / "missing.toml"), required=True)).snapshot()
+
+    def test_json_yaml_ini(self, tmp_path):
+        """Test the other structured file formats."""
+        json_path = tmp_path / "config.json"
+        json_path.write_text('{"power_level": 1, "db": {"host": "json.local", "port": 2}}')
+        yaml_path = tmp_path / "config.yaml"
+        yaml_path.write_text("power_level: 2\nis_strong: yes\n")
+        ini_path = tmp_path / "settings.ini"
+        ini_path.write_text("[settings]\nMY_HERO=Piccolo\n")
+
+        stack = SourceStack(JsonFile(str(json_path)), YamlFile(str(yaml_path)), IniFile(str(ini_path)))
+        my_config = MyModel(sources=stack)
+        assert my_config.POWER_LEVEL == 2
+        assert my_config.IS_STRONG is True
+        assert my_config.DB.host == "json.local"
+        assert my_config.MY_HERO == "Piccolo"
+
+    def test_ini_interpolation(self, tmp_path):
+        """Test that ini values are interpolated as decouple reads them."""
+        ini_path = tmp_path / "settings.ini"
+        ini_path.write_text("[settings]\nPCT=100%%\nMY_HERO=%(pct)s Goku\n")
+        snapshot = SourceStack(IniFile(str(ini_path))).snapshot()
+        assert snapshot.get_raw("PCT") == "100%"
+        assert snapshot.get_raw("MY_HERO") == "100% Goku"
+
+    def test_abstract_layers(self):
+        """Test that layers must implement their abstract methods."""
+        with pytest.raises(TypeError):
+            sources_module.FileLayer("settings.json")
+
+    def test_layers_parsed_once(self, tmp_path):
+        """Test that layers are parsed once and reparsed only on change."""
+        defaults, production, dotenv = write_layers(tmp_path)
+        calls, patched = counting_parsers()
+        with patched:
+            stack = SourceStack(TomlFile(str(defaults)), TomlFile(str(production)))
+            other_stack = SourceStack(TomlFile(str(defaults)))
+            configs = [MyModel(sources=stack) for _ in range(20)]
+            MyModel(sources=other_stack)
+            assert len(calls) == 2
+            assert all(c.POWER_LEVEL == 8000 for c in configs)
+
+            production.write_text("power_level = 7000\n\n")
+            assert MyModel(sources=stack).POWER_LEVEL == 7000
+            assert len(calls) == 3
+
+    def test_layers_cached_by_parse_options(self, tmp_path):
+        """Test that the same file parsed with other options isn't shared."""
+        path = tmp_path / "config.json"
+        path.write_text('{"power_level": 1, "db": {"host": "json.local", "port": 2}}')
+
+        upper = SourceStack(JsonFile(str(path))).snapshot()
+        lower = SourceStack(JsonFile(str(path), uppercase=False)).snapshot()
+        assert upper.get_raw("POWER_LEVEL") == "1"
+        assert lower.get_raw("power_level") == "1"
+        assert lower.get_raw("db_host") == "json.local"
+        assert JsonFile(str(path)).cache_key() != JsonFile(str(path), uppercase=False).cache_key()
+
+    def test_default_sources(self, tmp_path):
+        """Test process-wide default sources."""
+        defaults, _, _ = write_layers(tmp_path)
+        set_default_sources(SourceStack(TomlFile(str(defaults))))
+        try:
+            assert MyModel().MY_HERO == "Krillin"
+        finally:
+            set_default_sources(None)
+        assert MyModel().MY_HERO == "Son Goku"
+
+    def test_non_model_usage(self, tmp_path):
+        """Test sources for a simple (non model) parser."""
+        defaults, _, _ = write_layers(tmp_path)
+        configence = Configence(is_model=False, sources=SourceStack(TomlFile(str(defaults))))
+        assert configence.int("DB_PORT") == 5432
+        assert configence.model("DB", Database).host == "db.local"
+
+    @pytest.mark.slow
+    def test_multi_instance_benchmark(self, tmp_path):
+        """Benchmark many instances loading from the same layers."""
+        defaults = tmp_path / "defaults.toml"
+        defaults.write_text("\n".join(f"key_{i} = {i}" for i in range(500)))
+        stack = SourceStack(TomlFile(str(defaults)), Environ())
+
+        calls, patched = counting_parsers()
+        with patched:
+            start = time.perf_counter()
+            for _ in range(200):
+                MyModel(sources=stack)
+            elapsed = time.perf_counter() - start
+        print(f"\n200 instances over a 500 keys layer: {elapsed * 1000:.1f}ms, {len(calls)} parse(s)")
+        assert len(calls) == 1
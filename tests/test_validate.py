@@ -0,0 +1,79 @@
+import json
+import os
+import pytest
+from typer.testing import CliRunner
+from configence import Configence, configence, validate_many
+from configence.__main__ import app
+
+
+class ValidatedModel(Configence):
+    MY_HERO = configence.str("MY_HERO", "Son Goku")
+    POWER_LEVEL = configence.int("POWER_LEVEL")
+
+
+class InitModel(Configence):
+    def __init__(self):
+        super().__init__()
+
+    POWER_LEVEL = configence.int("POWER_LEVEL")
+
+
+@pytest.fixture
+def env_files(tmp_path):
+    files = {
+        "valid.env": "POWER_LEVEL=9001\n",
+        "invalid.env": "POWER_LEVEL=over 9000\n",
+        "missing.env": "MY_HERO=Vegeta\n",
+        "valid.ini": "[settings]\nPOWER_LEVEL=1\n",
+    }
+    for name, content in files.items():
+        (tmp_path / name).write_text(content)
+    return [str(tmp_path / name) for name in files]
+
+
+class TestValidateMany:
+    """Test validating a model against many environments."""
+
+    def test_isolated_environments(self, env_files):
+        """Test that each environment is loaded alone (without env-vars)."""
+        os.environ["POWER_LEVEL"] = "8000"
+        results = list(validate_many(ValidatedModel, env_files, processes=1))
+        assert [result["env"] for result in results] == env_files
+        assert [result["valid"] for result in results] == [True, False, False, True]
+        assert results[1]["error_type"] == "ValueError"
+        assert results[2]["error_type"] == "UndefinedValueError"
+        assert results[0]["fingerprint"] == ValidatedModel.from_mapping({"POWER_LEVEL": "9001"}).fingerprint()
+
+        # Cleanup
+        del os.environ["POWER_LEVEL"]
+
+    def test_custom_init(self, env_files):
+        """Test validating classes with their own __init__."""
+        results = list(validate_many(InitModel, env_files, processes=1))
+        assert [result["valid"] for result in results] == [True, False, False, True]
+
+    def test_process_pool(self, env_files):
+        """Test fanning out to worker processes (by class reference)."""
+        results = list(validate_many(
+            "tests.test_validate:ValidatedModel", env_files * 5, processes=2, chunksize=2
+        ))
+        assert [result["valid"] for result in results] == [True, False, False, True] * 5
+
+    def test_bad_reference(self):
+        """Test that bad class references fail fast."""
+        with pytest.raises(ValueError):
+            list(validate_many("tests.test_validate", []))
+
+    def test_cli(self, env_files):
+        """Test the validate command's JSON lines."""
+        result = CliRunner().invoke(
+            app, ["validate", "tests.test_validate:ValidatedModel", *env_files, "--processes", "1"]
+        )
+        assert result.exit_code == 1
+        lines = [json.loads(line) for line in result.output.splitlines()]
+        assert [line["valid"] for line in lines] == [True, False, False, True]
+
+        result = CliRunner().invoke(
+            app, ["validate", "tests.test_validate:ValidatedModel", env_files[0], "--processes", "1"]
+        )
+        assert result.exit_code == 0